@@ -35,11 +35,6 @@ OpenstackName = str
 OpenstackIdentifier = Union[OpenstackID, OpenstackName]
 
 
-def _quote(mystr: str) -> str:
-    """Wraps the given string in single quotes."""
-    return f"'{mystr}'"
-
-
 class NFSServiceMigrateVolume(CookbookBase):
     """WMCS Toolforge cookbook to move nfs service from one VM to another
 
@@ -26,7 +26,7 @@ from wmcs_libs.common import (
     with_common_opts,
 )
 from wmcs_libs.inventory.libs import get_openstack_internal_network_name
-from wmcs_libs.openstack.common import OpenstackAPI, OpenstackClusterName, OpenstackName, get_control_nodes
+from wmcs_libs.openstack.common import OpenstackAPI, OpenstackClusterName, OpenstackName
 
 LOGGER = logging.getLogger(__name__)
 
@@ -246,7 +246,6 @@ class EnsureCanaryVMRunner(WMCSCookbookRunnerBase):
         self.deployment = deployment
         self.hostname_list = hostname_list
         self.recreate = recreate
-        self.control_node_fqdn = get_control_nodes(cluster_name=self.deployment)[0]
         self.existing_canary_vms: list[dict[str, Any]] = []
         super().__init__(spicerack=spicerack, common_opts=common_opts)
 
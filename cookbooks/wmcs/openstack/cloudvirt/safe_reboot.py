@@ -5,6 +5,10 @@ This includes putting in maintenance, draining, and unsetting maintenance.
 Usage example: wmcs.openstack.cloudvirt.safe_reboot \
     --fqdn cloudvirt1013.eqiad.wmnet
 
+Or for a whole cluster, rebooting two nodes at a time:
+    wmcs.openstack.cloudvirt.safe_reboot \
+    --cluster-name eqiad1 --ceph-only --batch-size 2
+
 """
 
 from __future__ import annotations
@@ -13,13 +17,12 @@ import argparse
 import logging
 from datetime import datetime
 
-from spicerack import RemoteHosts, Spicerack
+from spicerack import RemoteHosts
 
 from cookbooks.wmcs.openstack.cloudvirt.drain import Drain
 from cookbooks.wmcs.openstack.cloudvirt.unset_maintenance import UnsetMaintenance
-from wmcs_libs.common import CommonOpts, WMCSCookbookRunnerBase, with_common_opts
+from wmcs_libs.common import WMCSCookbookRunnerBase, with_common_opts
 from wmcs_libs.openstack.batch import CloudvirtBatchBase, CloudvirtBatchRunnerBase
-from wmcs_libs.openstack.common import get_control_nodes
 
 LOGGER = logging.getLogger(__name__)
 
@@ -46,39 +49,35 @@ class SafeRebootRunner(CloudvirtBatchRunnerBase):
 
     downtime_reason = "host reboot"
 
-    def __init__(self, common_opts: CommonOpts, args: argparse.Namespace, spicerack: Spicerack):
-        super().__init__(common_opts, args, spicerack)
-        self.control_node_fqdn = get_control_nodes(cluster_name=self.cluster)[0]
-
     def run_on_hosts(self, hosts: RemoteHosts) -> None:
-        if len(hosts) != 1:
-            raise ValueError("safe_reboot does not support on operating on multiple nodes at once")
-        fqdn = str(hosts)
-
+        """Drain the nodes one by one, then reboot them all at the same time."""
+        fqdns = list(hosts.hosts)
         drain_cookbook = Drain(spicerack=self.spicerack)
-        drain_cookbook.get_runner(
-            args=drain_cookbook.argument_parser().parse_args(
-                args=[
-                    "--fqdn",
-                    fqdn,
-                ]
-                + self.common_opts.to_cli_args(),
-            )
-        ).run()
-
-        remote_host = self.spicerack.remote().query(f"D{{{fqdn}}}", use_sudo=True)
+        for fqdn in fqdns:
+            drain_cookbook.get_runner(
+                args=drain_cookbook.argument_parser().parse_args(
+                    args=[
+                        "--fqdn",
+                        fqdn,
+                    ]
+                    + self.common_opts.to_cli_args(),
+                )
+            ).run()
+
+        remote_hosts = self.spicerack.remote().query(f"D{{{','.join(fqdns)}}}", use_sudo=True)
         reboot_time = datetime.utcnow()
-        LOGGER.info("Rebooting and waiting for %s up", remote_host)
-        remote_host.reboot()
-        remote_host.wait_reboot_since(reboot_time)
+        LOGGER.info("Rebooting and waiting for %s up", remote_hosts)
+        remote_hosts.reboot(batch_size=len(fqdns))
+        remote_hosts.wait_reboot_since(reboot_time)
 
         unset_maintenance_cookbook = UnsetMaintenance(spicerack=self.spicerack)
-        unset_maintenance_cookbook.get_runner(
-            args=unset_maintenance_cookbook.argument_parser().parse_args(
-                args=[
-                    "--fqdn",
-                    fqdn,
-                ]
-                + self.common_opts.to_cli_args(),
-            )
-        ).run()
+        for fqdn in fqdns:
+            unset_maintenance_cookbook.get_runner(
+                args=unset_maintenance_cookbook.argument_parser().parse_args(
+                    args=[
+                        "--fqdn",
+                        fqdn,
+                    ]
+                    + self.common_opts.to_cli_args(),
+                )
+            ).run()
@@ -4,7 +4,6 @@ from __future__ import annotations
 
 import argparse
 import logging
-from typing import List
 
 from spicerack import Spicerack
 from spicerack.cookbook import ArgparseFormatter, CookbookBase, CookbookRunnerBase
@@ -82,7 +81,7 @@ class OpenstackRestartRunner(WMCSCookbookRunnerBase):
         cluster_name: OpenstackClusterName,
         args: argparse.Namespace,
         common_opts: CommonOpts,
-        filter_nodes: List[OpenstackNodeRoleName],
+        filter_nodes: list[OpenstackNodeRoleName],
     ):
         """Init"""
         self.common_opts = common_opts
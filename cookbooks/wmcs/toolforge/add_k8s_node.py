@@ -246,7 +246,7 @@ class ToolforgeAddK8sNodeRunner(WMCSCookbookRunnerBase):
         is_control = self.role == ToolforgeKubernetesNodeRoleName.CONTROL
 
         if is_control:
-            etcd_nodes = kubeadm.get_etcd_nodes(existing_control_node_fqdn=k8s_control_node_fqdn)
+            etcd_nodes = kubeadm.get_etcd_nodes(kubectl=kubectl)
             etcd_remote = self.spicerack.remote().query(f"D{{{','.join(etcd_nodes)}}}", use_sudo=True)
             LOGGER.info("Running Puppet on %s etcd nodes to pick up firewall changes", len(etcd_nodes))
             PuppetHosts(remote_hosts=etcd_remote).run()
@@ -26,6 +26,7 @@ from cookbooks.wmcs.vps.refresh_puppet_certs import RefreshPuppetCerts
 from wmcs_libs.common import (
     CommonOpts,
     OutputFormat,
+    SafeLoader,
     WMCSCookbookRunnerBase,
     natural_sort_key,
     run_one_as_dict,
@@ -121,7 +122,7 @@ def _add_node_to_kubeadm_configmap(k8s_control_node: RemoteHosts, new_etcd_membe
         try_format=OutputFormat.YAML,
     )
     # double yaml yep xd
-    cluster_config = yaml.safe_load(kubeadm_config["data"]["ClusterConfiguration"])
+    cluster_config = yaml.load(kubeadm_config["data"]["ClusterConfiguration"], Loader=SafeLoader)
 
     new_endpoint = f"https://{new_etcd_member_fqdn}:2379"
     if new_endpoint not in cluster_config["etcd"]["external"]["endpoints"]:
@@ -25,6 +25,7 @@ from cookbooks.wmcs.vps.remove_instance import RemoveInstance
 from wmcs_libs.common import (
     CommonOpts,
     OutputFormat,
+    SafeLoader,
     WMCSCookbookRunnerBase,
     natural_sort_key,
     run_one_as_dict,
@@ -122,7 +123,7 @@ def _remove_node_from_kubeadm_configmap(k8s_control_node: RemoteHosts, etcd_fqdn
         try_format=OutputFormat.YAML,
     )
     # double yaml yep xd
-    cluster_config = yaml.safe_load(kubeadm_config["data"]["ClusterConfiguration"])
+    cluster_config = yaml.load(kubeadm_config["data"]["ClusterConfiguration"], Loader=SafeLoader)
 
     old_endpoint = f"https://{etcd_fqdn_to_remove}:2379"
     if old_endpoint in cluster_config["etcd"]["external"]["endpoints"]:
@@ -18,7 +18,15 @@ import yaml
 from spicerack import Spicerack
 from spicerack.cookbook import ArgparseFormatter, CookbookBase
 
-from wmcs_libs.common import CommonOpts, CuminParams, OutputFormat, WMCSCookbookRunnerBase, run_one_as_dict, run_one_raw
+from wmcs_libs.common import (
+    CommonOpts,
+    CuminParams,
+    OutputFormat,
+    SafeLoader,
+    WMCSCookbookRunnerBase,
+    run_one_as_dict,
+    run_one_raw,
+)
 from wmcs_libs.inventory.toolsk8s import ToolforgeKubernetesClusterName, ToolforgeKubernetesNodeRoleName
 from wmcs_libs.k8s.clusters import (
     add_toolforge_kubernetes_cluster_opts,
@@ -93,7 +101,7 @@ class RemoveNodeFromHieraRunner(WMCSCookbookRunnerBase):
             cumin_params=CuminParams(is_safe=True),
         )
         # double yaml yep xd
-        current_hiera_config = yaml.safe_load(response["hiera"])
+        current_hiera_config = yaml.load(response["hiera"], Loader=SafeLoader)
         changed = False
 
         nodes = current_hiera_config.get("profile::toolforge::k8s::etcd_nodes", [])
@@ -123,7 +123,8 @@ class ToolforgeK8sPrepareUpgradeRunner(WMCSCookbookRunnerBase):
         self._check_component_exists()
 
         LOGGER.info("Querying node data")
-        node_fqdns = [f"{node}.{k8s_controller.get_nodes_domain()}" for node in k8s_controller.get_nodes_hostnames()]
+        nodes_domain = k8s_controller.get_nodes_domain()
+        node_fqdns = [f"{node}.{nodes_domain}" for node in k8s_controller.get_nodes_hostnames()]
         hosts = self.spicerack.remote().query(f"D{{{','.join(node_fqdns)}}}", use_sudo=True)
 
         LOGGER.info("Disabling Puppet on all Kubernetes nodes")
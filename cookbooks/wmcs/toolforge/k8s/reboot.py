@@ -70,6 +70,13 @@ class ToolforgeK8sReboot(CookbookBase):
             action="store_true",
             help="operate on all cluster worker nodes",
         )
+        parser.add_argument(
+            "--batch-size",
+            required=False,
+            default=1,
+            type=int,
+            help="Number of worker nodes to reboot at the same time, control nodes are always rebooted one by one.",
+        )
         return parser
 
     def get_runner(self, args: argparse.Namespace) -> WMCSCookbookRunnerBase:
@@ -84,6 +91,7 @@ class ToolforgeK8sReboot(CookbookBase):
             do_all=args.all,
             do_all_workers=args.all_workers,
             do_all_nfs_workers=args.all_nfs_workers,
+            batch_size=args.batch_size,
         )
 
 
@@ -99,6 +107,7 @@ class ToolforgeK8sRebootRunner(WMCSCookbookRunnerBase):
         do_all_workers: bool,
         do_all_nfs_workers: bool,
         spicerack: Spicerack,
+        batch_size: int = 1,
     ):  # pylint: disable=too-many-arguments
         """Init"""
         super().__init__(spicerack=spicerack, common_opts=common_opts)
@@ -108,6 +117,7 @@ class ToolforgeK8sRebootRunner(WMCSCookbookRunnerBase):
         self.do_all = do_all
         self.do_all_workers = do_all_workers
         self.do_all_nfs_workers = do_all_nfs_workers
+        self.batch_size = batch_size
         self.domain = f"{self.common_opts.project}.eqiad1.wikimedia.cloud"
         self.openstack_api = OpenstackAPI(
             remote=spicerack.remote(),
@@ -148,23 +158,39 @@ class ToolforgeK8sRebootRunner(WMCSCookbookRunnerBase):
         elif self.do_all_workers:
             self.hostname_list = [node for node in self.hostname_list if "-worker-" in node]
 
+        control_hostnames = [control_node.split(".", 1)[0] for control_node in control_nodes]
+        batches: list[list[str]] = []
         for node_hostname in self.hostname_list:
-            if control_node_fqdn.startswith(node_hostname):
-                if control_nodes[0].startswith(node_hostname):
+            if (
+                node_hostname in control_hostnames
+                or not batches
+                or batches[-1][0] in control_hostnames
+                or len(batches[-1]) >= self.batch_size
+            ):
+                batches.append([node_hostname])
+            else:
+                batches[-1].append(node_hostname)
+
+        for batch in batches:
+            if control_node_fqdn.startswith(batch[0]):
+                if control_nodes[0].startswith(batch[0]):
                     control_node_fqdn = control_nodes[1]
                 else:
                     control_node_fqdn = control_nodes[0]
                 LOGGER.info("INFO: swapping to control node %s", control_node_fqdn)
                 k8s_controller = KubernetesController(self.spicerack.remote(), control_node_fqdn)
 
+            batch_description = ", ".join(batch)
             try:
-                for phase in k8s_controller.reboot_node(node_hostname, self.domain):
-                    LOGGER.info("INFO: %s: reboot phase: %s", node_hostname, phase)
+                for phase in k8s_controller.reboot_nodes(batch, self.domain):
+                    LOGGER.info("INFO: %s: reboot phase: %s", batch_description, phase)
             except Exception:  # pylint: disable=broad-except
                 LOGGER.info(
-                    "Something happened while rebooting host %s, trying a hard rebooting the instance",
-                    node_hostname,
+                    "Something happened while rebooting hosts %s, trying a hard rebooting the instances",
+                    batch_description,
                 )
-                self.openstack_api.server_force_reboot(node_hostname)
-                k8s_controller.uncordon_node(node_hostname)
-                k8s_controller.wait_for_ready(node_hostname)
+                for node_hostname in batch:
+                    self.openstack_api.server_force_reboot(node_hostname)
+                for node_hostname in batch:
+                    k8s_controller.uncordon_node(node_hostname)
+                    k8s_controller.wait_for_ready(node_hostname)
@@ -278,30 +278,22 @@ class CreateInstanceWithPrefixRunner(WMCSCookbookRunnerBase):
         """Main entry point"""
         self.create_instance()
 
-    def _get_security_group_id(self, name: str) -> str:
-        maybe_security_group = self.openstack_api.security_group_by_name(
-            name=name, cumin_params=CuminParams(print_output=False)
-        )
-        if maybe_security_group is None:
-            raise Exception(
-                f"Unable to find a '{name}' security group for project {self.common_opts.project}, "
-                "though it should have been created before if not there."
-            )
-
-        return maybe_security_group["ID"]
-
     def create_instance(self) -> CreateServerResponse:  # pylint: disable=too-many-locals
         """We need this as `run` is an inherited function with a return type we should not override."""
+        no_output = CuminParams(print_output=False)
+        # the ensure calls return the groups, so they don't have to be looked up again before creating the server, and
+        # the security groups listing is reused between both security group lookups
+        security_group_ids = [self.openstack_api.security_group_by_name(name="default", cumin_params=no_output)["ID"]]
         if self.security_group:
-            self.openstack_api.security_group_ensure(
+            security_group = self.openstack_api.security_group_ensure(
                 security_group=self.security_group,
             )
+            security_group_ids.append(security_group["ID"])
 
-        self.openstack_api.server_group_ensure(
+        server_group = self.openstack_api.server_group_ensure(
             server_group=self.server_group,
             policy=self.server_group_policy,
         )
-        no_output = CuminParams(print_output=False)
 
         all_project_servers = self.openstack_api.server_list(cumin_params=no_output)
         other_prefix_members = list(
@@ -337,23 +329,10 @@ class CreateInstanceWithPrefixRunner(WMCSCookbookRunnerBase):
 
         new_prefix_member_name = f"{self.prefix}-{last_prefix_member_id + 1}"
 
-        security_groups = [self._get_security_group_id("default")]
-        if self.security_group:
-            security_groups.append(self._get_security_group_id(self.security_group))
-
-        maybe_server_group = self.openstack_api.server_group_by_name(name=self.server_group, cumin_params=no_output)
-        if maybe_server_group is None:
-            raise Exception(
-                f"Unable to find a server group with name {self.server_group} for project {self.common_opts.project}, "
-                "though it should have been created before if not there."
-            )
-
-        server_group_id: str = maybe_server_group["ID"]
-
         new_instance_id = self.openstack_api.server_create(
             flavor=self.flavor or other_prefix_members[-1]["Flavor"],
-            security_group_ids=security_groups,
-            server_group_id=server_group_id,
+            security_group_ids=security_group_ids,
+            server_group_id=server_group["ID"],
             image=self.image or other_prefix_members[-1]["Image"],
             network=self.network or list(other_prefix_members[-1]["Networks"].keys())[0],
             name=new_prefix_member_name,
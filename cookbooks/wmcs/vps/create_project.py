@@ -24,7 +24,7 @@ from wmflib.interactive import ask_confirmation, ask_input
 
 from cookbooks.wmcs.openstack.tofu import OpenstackTofuRunner
 from cookbooks.wmcs.vps.add_user_to_project import AddUserToProjectRunner
-from wmcs_libs.common import CommonOpts, WMCSCookbookRunnerBase, add_common_opts, with_common_opts
+from wmcs_libs.common import CommonOpts, SafeLoader, WMCSCookbookRunnerBase, add_common_opts, with_common_opts
 from wmcs_libs.inventory.openstack import OpenstackClusterName
 from wmcs_libs.openstack.common import OpenstackAPI, OpenstackQuotaEntry, OpenstackQuotaName
 from wmcs_libs.wm_gitlab import GitlabController
@@ -183,9 +183,10 @@ class CreateProjectRunner(WMCSCookbookRunnerBase):
                 f"(current name {self.common_opts.project})"
             )
 
-        recordsets = self.openstack_api.get_vm_proxy_recordsets()
+        proxy_name = f"{self.common_opts.project.lower()}.wmcloud.org."
+        recordsets = self.openstack_api.get_vm_proxy_recordsets(name=proxy_name)
         for recordset_data in recordsets:
-            if recordset_data["name"].lower() == f"{self.common_opts.project.lower()}.wmcloud.org.":
+            if recordset_data["name"].lower() == proxy_name:
                 message = (
                     f"There's already an old recordset matching the name '{recordset_data['name']}', maybe a "
                     "proxy with that name already exists? See T360294. Aborting."
@@ -242,7 +243,7 @@ class CreateProjectRunner(WMCSCookbookRunnerBase):
         projects_content = self.gitlab_controller.get_file_at_commit(
             project="tofu-infra", file_path=projects_file, commit_sha="main"
         )
-        projects_data = yaml.safe_load(projects_content)
+        projects_data = yaml.load(projects_content, Loader=SafeLoader)
         projects_data[self.common_opts.project] = self._get_tofu_project_data(task_id=self.common_opts.task_id)
 
         title = f"projects: added project {self.common_opts.project}"
@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import logging
+from unittest import mock
+
+import pytest
+from spicerack.remote import RemoteExecutionError
+
+from wmcs_libs.common import UtilsForTesting
+from wmcs_libs.k8s.kubeadm import (
+    KubeadmController,
+    KubeadmCreateTokenError,
+    KubeadmJoinError,
+    KubeadmJoinPreflightError,
+    KubeadmMalformedCACert,
+    KubeadmMalformedCertificatesArchive,
+)
+from wmcs_libs.k8s.kubernetes import KubernetesClusterInfo, KubernetesController
+
+# generated with: openssl x509 -pubkey -noout -in ca.crt
+CA_PUBLIC_KEY = """-----BEGIN PUBLIC KEY-----
+MIIBIjANBgkqhkiG9w0BAQEFAAOCAQ8AMIIBCgKCAQEArmhZkdFSsiB3oWrIqM2n
+3klUCdRoXQ/H5o+ZS1DdYzCnut2yZ6ikm+xRr/vRCUtMM/kmrL195XljltpX3vsj
+Ah/bCXdIhhx6xz6nP4HYvGlSMTJ18ZZWAKIcWUluhCCoQvyffdlO+w0X8+9btlHp
+1lgpUGEiMSXrSnHIEMXw51PjrwR0+UJcUNC/1E25kklygBEIbsPqSQQJOlFobK5G
+ruVFoNxS9ldbQa5KeqWpxAGEAQTIs5c8baR0NHQn59Dvx1EvQg8eLoA9Db7XzIca
+rFWnhGCyWRurlGT+62+eTQCYSJd/OEmglioCS8LlIInC692md0wmdmmwx+q8t61k
+IwIDAQAB
+-----END PUBLIC KEY-----
+"""
+# generated with:
+#   openssl x509 -pubkey -in ca.crt | openssl rsa -pubin -outform der | openssl dgst -sha256 -hex
+CA_PUBLIC_KEY_HASH = "22755605bbc87f7c94974646d73e090f77ae2f5cf4568b1824594ccfc93d1aa2"
+
+
+def test_KubeadmController_get_ca_cert_hash_happy_path():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[CA_PUBLIC_KEY])
+    controller = KubeadmController(remote=fake_remote, target_node_fqdn="fake.example")
+
+    assert controller.get_ca_cert_hash() == CA_PUBLIC_KEY_HASH
+
+
+def test_KubeadmController_get_ca_cert_hash_is_cached():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[CA_PUBLIC_KEY])
+    controller = KubeadmController(remote=fake_remote, target_node_fqdn="fake.example")
+
+    assert controller.get_ca_cert_hash() == CA_PUBLIC_KEY_HASH
+    assert controller.get_ca_cert_hash() == CA_PUBLIC_KEY_HASH
+    fake_remote.query.return_value.run_sync.assert_called_once()
+
+
+def test_KubeadmController_get_ca_cert_hash_raises_on_malformed_output():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=["unable to load certificate"])
+    controller = KubeadmController(remote=fake_remote, target_node_fqdn="fake.example")
+
+    with pytest.raises(KubeadmMalformedCACert):
+        controller.get_ca_cert_hash()
+
+
+def test_KubeadmController_create_token_and_get_ca_cert_hash_uses_one_call():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=["abcdef.0123456789abcdef\n" + CA_PUBLIC_KEY])
+    controller = KubeadmController(remote=fake_remote, target_node_fqdn="fake.example")
+
+    assert controller._create_token_and_get_ca_cert_hash() == ("abcdef.0123456789abcdef", CA_PUBLIC_KEY_HASH)
+    fake_remote.query.return_value.run_sync.assert_called_once()
+    assert controller.get_ca_cert_hash() == CA_PUBLIC_KEY_HASH
+
+
+def get_fake_kubernetes_controller() -> mock.MagicMock:
+    fake_controller = mock.create_autospec(spec=KubernetesController, instance=True)
+    fake_controller.controlling_node_fqdn = "control.example"
+    fake_controller.get_cluster_info.return_value = KubernetesClusterInfo(
+        master_url="https://k8s.example:6443", dns_url="https://dns.example", metrics_url="https://metrics.example"
+    )
+    return fake_controller
+
+
+def test_KubeadmController_join_retries_on_invalid_token():
+    fake_remote = UtilsForTesting.get_fake_remote(
+        responses=[
+            "ok",
+            "abcdef.0123456789abcdef\n" + CA_PUBLIC_KEY,
+            'error execution phase preflight: token id "abcdef" is invalid for this cluster or it has expired.',
+            "ghijkl.0123456789abcdef",
+            "This node has joined the cluster:",
+            "",
+        ]
+    )
+    controller = KubeadmController(remote=fake_remote, target_node_fqdn="worker.example")
+
+    controller.join(kubernetes_controller=get_fake_kubernetes_controller(), wait_for_ready=False)
+
+    commands = [call.args[0].command for call in fake_remote.query.return_value.run_sync.call_args_list]
+    assert commands[0] == "curl --silent --show-error --insecure --max-time 3 https://k8s.example:6443/healthz"
+    assert "--token ghijkl.0123456789abcdef" in commands[4]
+    assert commands[5] == "nohup kubeadm token delete ghijkl.0123456789abcdef </dev/null >/dev/null 2>&1 &"
+
+
+def test_KubeadmController_join_logs_step_timings(caplog: pytest.LogCaptureFixture):
+    fake_remote = UtilsForTesting.get_fake_remote(
+        responses=["ok", "abcdef.0123456789abcdef\n" + CA_PUBLIC_KEY, "This node has joined the cluster:", ""]
+    )
+    controller = KubeadmController(remote=fake_remote, target_node_fqdn="worker.example")
+
+    with caplog.at_level(logging.INFO, logger="wmcs_libs.k8s.kubeadm"):
+        controller.join(kubernetes_controller=get_fake_kubernetes_controller(), wait_for_ready=True)
+
+    steps = [record.args[0] for record in caplog.records if record.msg.startswith("kubeadm.join.step=")]
+    assert steps == ["get_cluster_info", "preflight", "get_token", "join_attempt_1", "wait_for_ready"]
+
+
+def test_KubeadmController_join_raises_on_other_errors():
+    fake_remote = UtilsForTesting.get_fake_remote(
+        responses=[
+            "ok",
+            "abcdef.0123456789abcdef\n" + CA_PUBLIC_KEY,
+            "error execution phase preflight: [preflight] Some fatal errors occurred",
+            "",
+        ]
+    )
+    controller = KubeadmController(remote=fake_remote, target_node_fqdn="worker.example")
+
+    with pytest.raises(KubeadmJoinError):
+        controller.join(kubernetes_controller=get_fake_kubernetes_controller(), wait_for_ready=False)
+
+
+def test_KubeadmController_get_etcd_nodes():
+    cluster_configuration = """
+etcd:
+  external:
+    endpoints:
+    - https://etcd-1.example:2379
+    - https://etcd-2.example:2379
+    - https://[fd00::1]:2379
+    - etcd-3.example:2379
+"""
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[cluster_configuration])
+    controller = KubeadmController(remote=fake_remote, target_node_fqdn="fake.example")
+
+    assert controller.get_etcd_nodes(existing_control_node_fqdn="control.example") == [
+        "etcd-1.example",
+        "etcd-2.example",
+        "fd00::1",
+        "etcd-3.example",
+    ]
+    fake_remote.query.assert_called_with("D{control.example}", use_sudo=True)
+    command = fake_remote.query.return_value.run_sync.call_args.args[0].command
+    assert command.startswith("kubectl --namespace=kube-system get configmap kubeadm-config")
+
+
+def test_KubeadmController_copy_certificates_from_uses_one_call_per_node():
+    tarball_base64 = "H4sIAAAAAAAAA+3BAQ0AAADCoPdPbQ8HFAAAAPBnAx6D6AAoAAA="
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[tarball_base64 + "\n", ""])
+    controller = KubeadmController(remote=fake_remote, target_node_fqdn="new-control.example")
+
+    controller.copy_certificates_from(existing_node_fqdn="control.example")
+
+    commands = [call.args[0].command for call in fake_remote.query.return_value.run_sync.call_args_list]
+    assert len(commands) == 2
+    assert commands[0].startswith("tar --create --gzip --directory=/etc/kubernetes/pki ca.crt ca.key")
+    assert commands[1].startswith(f"echo '{tarball_base64}' | base64 --decode | sudo -i tar")
+
+
+def test_KubeadmController_copy_certificates_from_raises_on_malformed_archive():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=["tar: ca.key: Cannot stat: No such file or directory"])
+    controller = KubeadmController(remote=fake_remote, target_node_fqdn="new-control.example")
+
+    with pytest.raises(KubeadmMalformedCertificatesArchive):
+        controller.copy_certificates_from(existing_node_fqdn="control.example")
+
+    fake_remote.query.return_value.run_sync.assert_called_once()
+
+
+def test_KubeadmController_join_many_workers_uses_a_single_token():
+    fake_remote = UtilsForTesting.get_fake_remote(
+        responses=[
+            "ok",
+            "abcdef.0123456789abcdef\n" + CA_PUBLIC_KEY,
+            {
+                "worker-1.example": "This node has joined the cluster:",
+                "worker-2.example": "This node has joined the cluster:",
+            },
+            "",
+        ]
+    )
+    fake_controller = get_fake_kubernetes_controller()
+
+    KubeadmController.join_many(
+        remote=fake_remote,
+        target_node_fqdns=["worker-1.example", "worker-2.example"],
+        kubernetes_controller=fake_controller,
+        concurrency=2,
+    )
+
+    fake_remote.query.assert_any_call("D{worker-1.example,worker-2.example}", use_sudo=True)
+    run_sync_calls = fake_remote.query.return_value.run_sync.call_args_list
+    assert len(run_sync_calls) == 4
+    assert run_sync_calls[1].args[0].command.startswith("kubeadm token create --ttl 30m")
+    assert run_sync_calls[2].args[0].command.startswith("kubeadm join k8s.example:6443 --token abcdef.0123456789abcdef")
+    assert run_sync_calls[2].kwargs["batch_size"] == 2
+    fake_controller.wait_for_nodes_ready.assert_called_once_with(
+        node_hostnames=["worker-1", "worker-2"], timeout_seconds=600
+    )
+
+
+def test_KubeadmController_join_many_workers_retries_the_nodes_with_an_invalid_token():
+    fake_remote = UtilsForTesting.get_fake_remote(
+        responses=[
+            "ok",
+            "abcdef.0123456789abcdef\n" + CA_PUBLIC_KEY,
+            {
+                "worker-1.example": "This node has joined the cluster:",
+                "worker-2.example": 'token id "abcdef" is invalid for this cluster or it has expired',
+            },
+            "ghijkl.0123456789abcdef",
+            {"worker-2.example": "This node has joined the cluster:"},
+            "",
+            "",
+        ]
+    )
+
+    KubeadmController.join_many(
+        remote=fake_remote,
+        target_node_fqdns=["worker-1.example", "worker-2.example"],
+        kubernetes_controller=get_fake_kubernetes_controller(),
+        wait_for_ready=False,
+    )
+
+    run_sync_calls = fake_remote.query.return_value.run_sync.call_args_list
+    assert len(run_sync_calls) == 7
+    fake_remote.query.assert_any_call("D{worker-2.example}", use_sudo=True)
+    assert "--token ghijkl.0123456789abcdef" in run_sync_calls[4].args[0].command
+    assert "kubeadm token delete ghijkl.0123456789abcdef" in run_sync_calls[5].args[0].command
+
+
+def test_KubeadmController_join_many_workers_raises_for_the_failed_nodes():
+    fake_remote = UtilsForTesting.get_fake_remote(
+        responses=[
+            "ok",
+            "abcdef.0123456789abcdef\n" + CA_PUBLIC_KEY,
+            # worker-2 did not output anything
+            {"worker-1.example": "error execution phase preflight: port 10250 is in use"},
+            "",
+        ]
+    )
+
+    with pytest.raises(KubeadmJoinError, match="Unable to join nodes worker-1.example,worker-2.example"):
+        KubeadmController.join_many(
+            remote=fake_remote,
+            target_node_fqdns=["worker-1.example", "worker-2.example"],
+            kubernetes_controller=get_fake_kubernetes_controller(),
+        )
+
+    # no retries, and the token is still deleted
+    assert len(fake_remote.query.return_value.run_sync.call_args_list) == 4
+
+
+def test_KubeadmController_join_fails_fast_if_control_plane_is_unreachable():
+    fake_remote = UtilsForTesting.get_fake_remote(
+        side_effect=[RemoteExecutionError(retcode=28, message="timed out", results=iter([]))]
+    )
+    controller = KubeadmController(remote=fake_remote, target_node_fqdn="worker.example")
+
+    with pytest.raises(KubeadmJoinPreflightError):
+        controller.join(kubernetes_controller=get_fake_kubernetes_controller(), wait_for_ready=False)
+
+    # no token was created
+    fake_remote.query.return_value.run_sync.assert_called_once()
+
+
+def test_KubeadmController_get_etcd_nodes_reuses_the_given_controller():
+    fake_remote = UtilsForTesting.get_fake_remote()
+    fake_kubectl = get_fake_kubernetes_controller()
+    fake_kubectl.get_object.return_value = {
+        "data": {"ClusterConfiguration": "etcd: {external: {endpoints: [https://etcd-1.example:2379]}}"}
+    }
+    controller = KubeadmController(remote=fake_remote, target_node_fqdn="fake.example")
+
+    assert controller.get_etcd_nodes(kubectl=fake_kubectl) == ["etcd-1.example"]
+    fake_kubectl.get_object.assert_called_once_with("configmaps", "kubeadm-config", namespace="kube-system")
+
+
+@pytest.mark.parametrize(
+    **UtilsForTesting.to_parametrize(
+        test_cases={
+            "Only the token": {"raw_output": "abcdef.0123456789abcdef\n"},
+            "Warnings before the token": {
+                "raw_output": "W0101 00:00:00.000000   1 version.go:104] could not fetch a version\n"
+                "abcdef.0123456789abcdef\n"
+            },
+        }
+    )
+)
+def test_KubeadmController_get_new_token_happy_path(raw_output: str):
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[raw_output])
+    controller = KubeadmController(remote=fake_remote, target_node_fqdn="control.example")
+
+    assert controller.get_new_token() == "abcdef.0123456789abcdef"
+
+
+@pytest.mark.parametrize("raw_output", ["", "\n", "timed out waiting for the condition"])
+def test_KubeadmController_get_new_token_raises_on_bad_output(raw_output: str):
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[raw_output])
+    controller = KubeadmController(remote=fake_remote, target_node_fqdn="control.example")
+
+    with pytest.raises(KubeadmCreateTokenError):
+        controller.get_new_token()
+
+
+def test_KubeadmController_join_with_shared_token():
+    fake_remote = UtilsForTesting.get_fake_remote(
+        responses=[
+            "abcdef.0123456789abcdef\n" + CA_PUBLIC_KEY,
+            "ok",
+            "This node has joined the cluster:",
+            "ok",
+            "This node has joined the cluster:",
+            "",
+        ]
+    )
+    fake_controller = get_fake_kubernetes_controller()
+    control_kubeadm = KubeadmController(remote=fake_remote, target_node_fqdn="control.example")
+
+    with control_kubeadm.with_shared_token() as token:
+        for node_fqdn in ["worker-1.example", "worker-2.example"]:
+            KubeadmController(remote=fake_remote, target_node_fqdn=node_fqdn).join(
+                kubernetes_controller=fake_controller,
+                wait_for_ready=False,
+                token=token,
+                control_kubeadm=control_kubeadm,
+            )
+
+    commands = [call.args[0].command for call in fake_remote.query.return_value.run_sync.call_args_list]
+    assert len(commands) == 6
+    assert commands[0].startswith("kubeadm token create --ttl 30m")
+    assert f"--token {token} --discovery-token-ca-cert-hash sha256:{CA_PUBLIC_KEY_HASH}" in commands[2]
+    assert f"--token {token} --discovery-token-ca-cert-hash sha256:{CA_PUBLIC_KEY_HASH}" in commands[4]
+    assert commands[5] == f"nohup kubeadm token delete {token} </dev/null >/dev/null 2>&1 &"
@@ -3,26 +3,44 @@ from __future__ import annotations
 import json
 from argparse import ArgumentTypeError
 from pathlib import Path
-from typing import Any
+from unittest import mock
 
 import pytest
+from spicerack.remote import RemoteExecutionError
 
 from wmcs_libs.common import UtilsForTesting
-from wmcs_libs.k8s.kubernetes import KubernetesController, validate_version
+from wmcs_libs.k8s.kubernetes import (
+    KubeletController,
+    KubernetesClusterInfo,
+    KubernetesController,
+    KubernetesError,
+    KubernetesMalformedClusterInfo,
+    KubernetesNodeInfo,
+    KubernetesNodeNotFound,
+    KubernetesNodeStatusError,
+    KubernetesTimeoutForNotReady,
+    validate_version,
+)
 
 
-def test_KubernetesController_get_evictable_pods_for_node(monkeypatch):
-    fake_remote = UtilsForTesting.get_fake_remote()
-    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+def _pod_summary(pods: list[dict]) -> str:
+    """Render pods like kubectl does with POD_SUMMARY_JSONPATH."""
+    return "".join(
+        f"{pod['metadata']['namespace']}\t{pod['metadata']['name']}\t{pod['spec'].get('nodeName', '')}\t"
+        f"{' '.join(ref['kind'] for ref in pod['metadata'].get('ownerReferences', []))}\t"
+        f"{pod.get('status', {}).get('phase', 'Running')}\n"
+        for pod in pods
+    )
 
-    def fake_get_pods_for_node(node_hostname: str) -> list[dict[str, Any]]:
-        with (Path(__file__).parent / ".." / "fixtures" / "k8s" / "control-node-pods.json").open("r") as f:
-            pods = json.load(f)
-        return pods
 
-    monkeypatch.setattr(controller, "get_pods_for_node", fake_get_pods_for_node)
+def test_KubernetesController_get_evictable_pods_for_node():
+    with (Path(__file__).parent / ".." / "fixtures" / "k8s" / "control-node-pods.json").open("r") as f:
+        pods = json.load(f)
+    other_node_pod = {"metadata": {"name": "other-node-pod", "namespace": "tool-a"}, "spec": {"nodeName": "worker-1"}}
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[_pod_summary([*pods, other_node_pod])])
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
 
-    evictable_pods = [pod["metadata"]["name"] for pod in controller.get_evictable_pods_for_node("fake.example")]
+    evictable_pods = [pod["metadata"]["name"] for pod in controller.get_evictable_pods_for_node("tools-k8s-control-1")]
     # The test data in question is a snapshot of pods running on a control plane
     # node. Most of them can't be evicted, since they are either Kubernetes or
     # Calico components, but at the time there was a CoreDNS pod on the node, which
@@ -30,13 +48,541 @@ def test_KubernetesController_get_evictable_pods_for_node(monkeypatch):
     assert evictable_pods == ["coredns-796684d57c-cnfxl"]
 
 
+def test_KubernetesController_get_pods_for_node_reuses_the_cluster_wide_listing():
+    all_pods = _pod_summary(
+        [
+            {"metadata": {"name": "pod-1", "namespace": "tool-a"}, "spec": {"nodeName": "worker-1"}},
+            {"metadata": {"name": "pod-2", "namespace": "tool-b"}, "spec": {"nodeName": "worker-2"}},
+            {"metadata": {"name": "pod-3", "namespace": "tool-a"}, "spec": {"nodeName": "worker-2"}},
+            {"metadata": {"name": "pending", "namespace": "tool-a"}, "spec": {}},
+        ]
+    )
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[all_pods, "", all_pods])
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+    run_sync = fake_remote.query.return_value.run_sync
+
+    assert [pod["metadata"]["name"] for pod in controller.get_pods_for_node("worker-1")] == ["pod-1"]
+    assert [pod["metadata"]["name"] for pod in controller.get_pods_for_node("worker-2", namespace="tool-a")] == [
+        "pod-3"
+    ]
+    assert run_sync.call_count == 1
+    assert run_sync.call_args.args[0].command.startswith(
+        "kubectl get pods --all-namespaces '--field-selector=status.phase!=Succeeded,status.phase!=Failed' "
+        "'--output=jsonpath={range .items[*]}"
+    )
+
+    controller.delete_pod(pod_name="pod-1", namespace="tool-a")
+    controller.get_pods_for_node("worker-1")
+    assert run_sync.call_count == 3
+
+
+def test_KubernetesController_get_pods_for_node_parses_the_pod_summary():
+    raw_output = (
+        "tool-a\tpod-1\tworker-1\tReplicaSet\tRunning\n"
+        "Warning: some kubectl warning\n"
+        "kube-system\tcalico-node-x\tworker-1\tDaemonSet Other\tRunning\n"
+        "tool-a\tpending\t\t\tPending\n"
+    )
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[raw_output])
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    assert controller.get_pods_for_node("worker-1") == [
+        {
+            "metadata": {"name": "pod-1", "namespace": "tool-a", "ownerReferences": [{"kind": "ReplicaSet"}]},
+            "spec": {"nodeName": "worker-1"},
+            "status": {"phase": "Running"},
+        },
+        {
+            "metadata": {
+                "name": "calico-node-x",
+                "namespace": "kube-system",
+                "ownerReferences": [{"kind": "DaemonSet"}, {"kind": "Other"}],
+            },
+            "spec": {"nodeName": "worker-1"},
+            "status": {"phase": "Running"},
+        },
+    ]
+    assert [pod["metadata"]["name"] for pod in controller.get_evictable_pods_for_node("worker-1")] == ["pod-1"]
+
+
+def test_KubernetesController_get_nodes_uses_the_api_label_selector():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[json.dumps({"kind": "NodeList", "items": []})])
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    assert controller.get_nodes(selector="kubernetes.io/hostname=worker-1") == []
+    command = fake_remote.query.return_value.run_sync.call_args.args[0].command
+    assert command == "kubectl get --raw '/api/v1/nodes?labelSelector=kubernetes.io%2Fhostname%3Dworker-1'"
+
+
+def test_KubernetesController_get_nodes_warms_the_node_cache():
+    node = {"kind": "Node", "metadata": {"name": "worker-1"}}
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[json.dumps({"kind": "NodeList", "items": [node]})])
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    assert controller.get_nodes() == [node]
+    assert controller.get_node("worker-1") == [node]
+    fake_remote.query.return_value.run_sync.assert_called_once()
+
+
+def test_KubernetesController_get_node_gets_the_node_by_name():
+    node = {"kind": "Node", "metadata": {"name": "worker-1"}}
+    fake_remote = UtilsForTesting.get_fake_remote(
+        responses=[json.dumps(node), 'Error from server (NotFound): nodes "worker-2" not found']
+    )
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    assert controller.get_node(node_hostname="worker-1") == [node]
+    command = fake_remote.query.return_value.run_sync.call_args.args[0].command
+    assert command == "kubectl get --raw '/api/v1/nodes/worker-1'"
+
+    assert controller.get_node(node_hostname="worker-2") == []
+
+
+def test_KubernetesController_get_node_raises_and_does_not_cache_other_errors():
+    node = {"kind": "Node", "metadata": {"name": "worker-1"}}
+    fake_remote = UtilsForTesting.get_fake_remote(
+        responses=["Unable to connect to the server: dial tcp 10.0.0.1:6443: i/o timeout", json.dumps(node)]
+    )
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    with pytest.raises(KubernetesError):
+        controller.get_node(node_hostname="worker-1")
+
+    assert controller.get_node(node_hostname="worker-1") == [node]
+
+
+def test_KubernetesController_get_node_is_cached_until_the_node_changes():
+    node = {"metadata": {"name": "worker-1"}, "spec": {}, "status": {}}
+    fake_remote = UtilsForTesting.get_fake_remote(
+        responses=[json.dumps(node), "node/worker-1 drained", json.dumps(node)]
+    )
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+    run_sync = fake_remote.query.return_value.run_sync
+
+    assert controller.get_node("worker-1") == [node]
+    assert controller.get_node("worker-1") == [node]
+    assert run_sync.call_count == 1
+
+    # the drain forgets the cached info
+    controller.drain_node("worker-1")
+    assert run_sync.call_count == 2
+
+    assert controller.get_node("worker-1") == [node]
+    assert run_sync.call_count == 3
+
+
+def test_KubernetesController_invalidate_cache_forgets_nodes_and_pods():
+    node = {"metadata": {"name": "worker-1"}, "spec": {}, "status": {}}
+    pods = _pod_summary([{"metadata": {"name": "pod-1", "namespace": "tool-a"}, "spec": {"nodeName": "worker-1"}}])
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[json.dumps(node), pods, "", json.dumps(node), pods])
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+    run_sync = fake_remote.query.return_value.run_sync
+
+    controller.get_node("worker-1")
+    controller.get_pods_for_node("worker-1")
+    # labelling a node forgets it too
+    controller.add_node_labels("worker-1", {"some-label=value"})
+    controller.get_node("worker-1")
+    assert run_sync.call_count == 4
+
+    controller.invalidate_cache()
+    controller.get_pods_for_node("worker-1")
+    assert run_sync.call_count == 5
+
+
+def test_KubernetesController_reboot_nodes_reboots_all_at_once():
+    fake_remote = UtilsForTesting.get_fake_remote(
+        responses=[
+            # drain, a single kubectl drain for both nodes
+            "",
+            # wait for drain, a single pod listing for both nodes
+            "",
+            # uncordon
+            "",
+            "",
+            # wait for ready, a single kubectl wait for both nodes
+            "",
+        ]
+    )
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    phases = list(controller.reboot_nodes(node_hostnames=["worker-1", "worker-2"], domain="example"))
+
+    assert [str(phase) for phase in phases] == ["drain", "wait_drain", "vm_reboot", "uncordon", "wait_ready"]
+    fake_remote.query.assert_any_call("D{worker-1.example,worker-2.example}", use_sudo=True)
+    fake_remote.query.return_value.reboot.assert_called_once_with(batch_size=2)
+    assert fake_remote.query.return_value.wait_reboot_since.call_args.kwargs["since"].tzinfo is not None
+    run_sync = fake_remote.query.return_value.run_sync
+    assert run_sync.call_count == 5
+    assert run_sync.call_args_list[0].args[0].command.endswith("--force worker-1 worker-2")
+    assert run_sync.call_args.args[0].command == (
+        "kubectl wait --for=condition=Ready node/worker-1 node/worker-2 --timeout=600s"
+    )
+
+
+def test_KubernetesController_reboot_nodes_waits_for_the_drain_with_a_shared_deadline():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=["", "", "", "", ""])
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+    now = [1000.0]
+
+    def _drain_for_a_while(node_hostname: str, timeout_seconds: int) -> None:
+        now[0] += 200
+
+    with mock.patch("wmcs_libs.k8s.kubernetes.time.monotonic", side_effect=lambda: now[0]), mock.patch.object(
+        controller, "wait_for_drain", side_effect=_drain_for_a_while
+    ) as wait_for_drain:
+        list(controller.reboot_nodes(node_hostnames=["worker-1", "worker-2", "worker-3"], domain="example"))
+
+    assert [call.kwargs["timeout_seconds"] for call in wait_for_drain.call_args_list] == [300, 100, 0]
+
+
+def test_KubernetesController_wait_for_nodes_ready_reports_the_not_ready_node():
+    ready_node = {"status": {"conditions": [{"type": "Ready", "status": "True"}]}}
+    not_ready_node = {"status": {"conditions": [{"type": "Ready", "status": "False"}]}}
+    fake_remote = UtilsForTesting.get_fake_remote(
+        side_effect=[
+            RemoteExecutionError(retcode=1, message="timed out", results=iter([])),
+            iter([(None, mock.MagicMock(**{"message.return_value": json.dumps(ready_node).encode()}))]),
+            iter([(None, mock.MagicMock(**{"message.return_value": json.dumps(not_ready_node).encode()}))]),
+        ]
+    )
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    with pytest.raises(KubernetesTimeoutForNotReady, match="node worker-2"):
+        controller.wait_for_nodes_ready(node_hostnames=["worker-1", "worker-2"], timeout_seconds=10)
+
+
+def test_KubernetesController_wait_for_nodes_ready_handles_nodes_without_conditions():
+    # a node that just registered might not report any conditions yet
+    fake_remote = UtilsForTesting.get_fake_remote(
+        side_effect=[
+            RemoteExecutionError(retcode=1, message="timed out", results=iter([])),
+            iter([(None, mock.MagicMock(**{"message.return_value": json.dumps({"status": {}}).encode()}))]),
+        ]
+    )
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    with pytest.raises(KubernetesTimeoutForNotReady, match="node worker-1"):
+        controller.wait_for_nodes_ready(node_hostnames=["worker-1"], timeout_seconds=10)
+
+
+def test_KubernetesController_wait_for_drain_waits_for_the_pods_deletion():
+    pods = _pod_summary(
+        [
+            {"metadata": {"name": "pod-1", "namespace": "tool-a"}, "spec": {"nodeName": "worker-1"}},
+            {"metadata": {"name": "pod-2", "namespace": "tool-b"}, "spec": {"nodeName": "worker-1"}},
+            {"metadata": {"name": "pod-3", "namespace": "tool-a"}, "spec": {"nodeName": "worker-1"}},
+        ]
+    )
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[pods, "", "", ""])
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    controller.wait_for_drain(node_hostname="worker-1", timeout_seconds=30)
+
+    commands = [call.args[0].command for call in fake_remote.query.return_value.run_sync.call_args_list]
+    assert len(commands) == 4
+    assert commands[1] == "kubectl wait --for=delete --namespace=tool-a --timeout=30s pod/pod-1 pod/pod-3"
+    assert commands[2] == "kubectl wait --for=delete --namespace=tool-b --timeout=30s pod/pod-2"
+
+
+def test_KubernetesController_get_nodes_hostnames_only_fetches_the_names():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=["worker-1 worker-2 control-1"])
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    assert controller.get_nodes_hostnames() == ["worker-1", "worker-2", "control-1"]
+    command = fake_remote.query.return_value.run_sync.call_args.args[0].command
+    assert command == "kubectl get nodes '--output=jsonpath={.items[*].metadata.name}'"
+
+
+@pytest.mark.parametrize(
+    **UtilsForTesting.to_parametrize(
+        test_cases={
+            "Ready": {"raw_output": "True", "expected_ready": True},
+            "Not ready": {"raw_output": "False", "expected_ready": False},
+            "Unknown": {"raw_output": "Unknown\n", "expected_ready": False},
+        }
+    )
+)
+def test_KubernetesController_is_node_ready(raw_output: str, expected_ready: bool):
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[raw_output])
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    assert controller.is_node_ready(node_hostname="worker-1") is expected_ready
+
+
+def test_KubernetesController_is_node_ready_raises_without_ready_condition():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[""])
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    with pytest.raises(KubernetesNodeStatusError):
+        controller.is_node_ready(node_hostname="worker-1")
+
+
+def test_KubernetesController_get_object_builds_the_command_without_empty_args():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[json.dumps({"kind": "Pod"})])
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    assert controller.get_object(kind="pod", name="some-pod", namespace="tool-a b") == {"kind": "Pod"}
+    command = fake_remote.query.return_value.run_sync.call_args.args[0].command
+    assert command == "kubectl get pod some-pod '--namespace=tool-a b' --output=json"
+
+
+def test_KubernetesController_drain_nodes_raises_if_a_node_is_missing():
+    fake_remote = UtilsForTesting.get_fake_remote(
+        side_effect=[
+            RemoteExecutionError(retcode=1, message="failed", results=iter([])),
+            iter([(None, mock.MagicMock(**{"message.return_value": b"node/worker-1"}))]),
+            RemoteExecutionError(retcode=1, message="NotFound", results=iter([])),
+        ]
+    )
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    with pytest.raises(KubernetesNodeNotFound, match="worker-2"):
+        controller.drain_nodes(node_hostnames=["worker-1", "worker-2"])
+
+
+def test_KubernetesController_delete_node_raises_if_node_is_missing():
+    fake_remote = UtilsForTesting.get_fake_remote(
+        side_effect=[
+            RemoteExecutionError(retcode=1, message="failed", results=iter([])),
+            RemoteExecutionError(retcode=1, message="NotFound", results=iter([])),
+        ]
+    )
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    with pytest.raises(KubernetesNodeNotFound):
+        controller.delete_node(node_hostname="worker-1")
+
+
+def test_KubernetesController_get_node_info_only_fetches_the_kubelet_version():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=["v1.24.17"])
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    assert controller.get_node_info(node_hostname="worker-1") == KubernetesNodeInfo(kubelet_version="1.24.17")
+    command = fake_remote.query.return_value.run_sync.call_args.args[0].command
+    assert command == "kubectl get nodes worker-1 '--output=jsonpath={.status.nodeInfo.kubeletVersion}'"
+
+
+def test_KubernetesController_get_node_info_raises_if_node_is_missing():
+    fake_remote = UtilsForTesting.get_fake_remote(
+        side_effect=[RemoteExecutionError(retcode=1, message="NotFound", results=iter([]))]
+    )
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    with pytest.raises(KubernetesNodeNotFound):
+        controller.get_node_info(node_hostname="worker-1")
+
+
+def test_KubernetesController_delete_node_reraises_other_errors():
+    fake_remote = UtilsForTesting.get_fake_remote(
+        side_effect=[
+            RemoteExecutionError(retcode=1, message="failed", results=iter([])),
+            iter([(None, mock.MagicMock(**{"message.return_value": b"node/worker-1"}))]),
+        ]
+    )
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    with pytest.raises(RemoteExecutionError):
+        controller.delete_node(node_hostname="worker-1")
+
+
+@pytest.mark.parametrize(
+    **UtilsForTesting.to_parametrize(
+        test_cases={
+            "Running": {"raw_output": "Running", "expected_running": True},
+            "Pending": {"raw_output": "Pending", "expected_running": False},
+            "No status yet": {"raw_output": "", "expected_running": False},
+        }
+    )
+)
+def test_KubernetesController_is_pod_running(raw_output: str, expected_running: bool):
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[raw_output])
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    assert controller.is_pod_running(pod_name="some-pod", namespace="tool-a") is expected_running
+    command = fake_remote.query.return_value.run_sync.call_args.args[0].command
+    assert command == "kubectl get pod some-pod --namespace=tool-a '--output=jsonpath={.status.phase}'"
+
+
+def test_KubernetesController_is_pod_running_missing_ok():
+    fake_remote = UtilsForTesting.get_fake_remote(
+        side_effect=[RemoteExecutionError(retcode=1, message="NotFound", results=iter([]))]
+    )
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    assert controller.is_pod_running(pod_name="some-pod", namespace="tool-a", missing_ok=True) is False
+
+
+def test_KubernetesController_wait_for_ready_uses_kubectl_wait():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=["node/fake-node condition met"])
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    controller.wait_for_ready(node_hostname="fake-node", timeout_seconds=30)
+
+    fake_remote.query.return_value.run_sync.assert_called_once()
+    command = fake_remote.query.return_value.run_sync.call_args.args[0].command
+    assert command == "kubectl wait --for=condition=Ready node/fake-node --timeout=30s"
+
+
+def test_KubernetesController_wait_for_ready_raises_on_timeout():
+    node_not_ready = {"status": {"conditions": [{"type": "Ready", "status": "False"}]}}
+    fake_msg_tree = mock.MagicMock()
+    fake_msg_tree.message.return_value = json.dumps(node_not_ready).encode()
+    fake_remote = UtilsForTesting.get_fake_remote(
+        side_effect=[
+            RemoteExecutionError(retcode=1, message="timed out", results=iter([])),
+            iter([(None, fake_msg_tree)]),
+        ]
+    )
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    with pytest.raises(KubernetesTimeoutForNotReady):
+        controller.wait_for_ready(node_hostname="fake-node", timeout_seconds=30)
+
+
+def test_KubeletController_get_static_pods_defined():
+    fake_remote = UtilsForTesting.get_fake_remote(
+        responses=["staticPodPath: /etc/kubernetes/manifests", "kube-apiserver.yaml\netcd.yaml\n"]
+    )
+    kubelet = KubeletController(
+        remote=fake_remote,
+        kubelet_node_fqdn="control-1.example",
+        k8s_control=mock.create_autospec(spec=KubernetesController, instance=True),
+    )
+    kubelet.invalidate()
+
+    assert kubelet.get_static_pods_defined() == ["etcd", "kube-apiserver"]
+    command = fake_remote.query.return_value.run_sync.call_args.args[0].command
+    assert command == "find /etc/kubernetes/manifests -maxdepth 1 -name '*.yaml' -printf '%f\\n'"
+
+
+def test_KubeletController_get_kubelet_config_is_shared_between_controllers():
+    fake_remote = UtilsForTesting.get_fake_remote(
+        responses=["staticPodPath: /etc/kubernetes/manifests", "staticPodPath: /etc/kubernetes/other"]
+    )
+    k8s_control = mock.create_autospec(spec=KubernetesController, instance=True)
+    kubelet = KubeletController(remote=fake_remote, kubelet_node_fqdn="cache-1.example", k8s_control=k8s_control)
+    kubelet.invalidate()
+
+    assert kubelet.get_kubelet_config_parameter("staticPodPath") == "/etc/kubernetes/manifests"
+    other_kubelet = KubeletController(remote=fake_remote, kubelet_node_fqdn="cache-1.example", k8s_control=k8s_control)
+    assert other_kubelet.get_kubelet_config_parameter("staticPodPath") == "/etc/kubernetes/manifests"
+    fake_remote.query.return_value.run_sync.assert_called_once()
+
+    other_kubelet.invalidate()
+    assert kubelet.get_kubelet_config_parameter("staticPodPath") == "/etc/kubernetes/other"
+
+
+def test_KubeletController_stop_static_pod_moves_and_checks_in_one_call():
+    fake_remote = UtilsForTesting.get_fake_remote(
+        responses=[
+            "staticPodPath: /etc/kubernetes/manifests\nfileCheckFrequency: 20s",
+            "kube-apiserver.yaml\n",
+            "",
+        ]
+    )
+    k8s_control = mock.create_autospec(spec=KubernetesController, instance=True)
+    kubelet = KubeletController(remote=fake_remote, kubelet_node_fqdn="control-1.example", k8s_control=k8s_control)
+    kubelet.invalidate()
+
+    kubelet.stop_static_pod(pod_name="kube-apiserver", namespace="kube-system")
+
+    assert fake_remote.query.return_value.run_sync.call_count == 3
+    command = fake_remote.query.return_value.run_sync.call_args.args[0].command
+    assert command == (
+        "mv /etc/kubernetes/manifests/kube-apiserver.yaml"
+        " /etc/kubernetes/manifests/.cookbook-stopped-kube-apiserver.yaml"
+        " && sudo -i sleep 20"
+        " && sudo -i test -e /etc/kubernetes/manifests/.cookbook-stopped-kube-apiserver.yaml"
+        " && sudo -i test ! -e /etc/kubernetes/manifests/kube-apiserver.yaml"
+    )
+    k8s_control.delete_pod.assert_called_once_with(pod_name="kube-apiserver-control-1", namespace="kube-system")
+
+
+def test_KubeletController_restart_all_static_pods_in_parallel():
+    fake_remote = UtilsForTesting.get_fake_remote(
+        responses=[
+            "staticPodPath: /etc/kubernetes/manifests\nfileCheckFrequency: 20s",
+            # assert_static_pod_path_clean
+            "",
+            "kube-apiserver.yaml\nkube-scheduler.yaml\nkube-controller-manager.yaml\n",
+            # restart the kube-apiserver on its own
+            "kube-apiserver.yaml\nkube-scheduler.yaml\nkube-controller-manager.yaml\n",
+            "",
+            "kube-scheduler.yaml\nkube-controller-manager.yaml\n",
+            "",
+            # then the rest together
+            "kube-apiserver.yaml\nkube-scheduler.yaml\nkube-controller-manager.yaml\n",
+            "",
+            "kube-apiserver.yaml\n",
+            "",
+        ]
+    )
+    k8s_control = mock.create_autospec(spec=KubernetesController, instance=True)
+    k8s_control.is_pod_running.return_value = True
+    kubelet = KubeletController(remote=fake_remote, kubelet_node_fqdn="control-1.example", k8s_control=k8s_control)
+    kubelet.invalidate()
+
+    kubelet.restart_all_static_pods(namespace="kube-system", parallel=True)
+
+    commands = [call.args[0].command for call in fake_remote.query.return_value.run_sync.call_args_list]
+    assert len(commands) == 11
+    assert commands[8].startswith(
+        "mv /etc/kubernetes/manifests/kube-controller-manager.yaml"
+        " /etc/kubernetes/manifests/.cookbook-stopped-kube-controller-manager.yaml"
+        " && sudo -i mv /etc/kubernetes/manifests/kube-scheduler.yaml"
+    )
+    assert commands[8].count("sleep") == 1
+    assert commands[10].count("sleep") == 1
+
+
+def test_KubernetesClusterInfo_form_cluster_info_output():
+    raw_output = (
+        "\x1b[0;32mKubernetes control plane\x1b[0m is running at \x1b[0;33mhttps://k8s.example:6443\x1b[0m\n"
+        "\x1b[0;32mCoreDNS\x1b[0m is running at \x1b[0;33mhttps://k8s.example:6443/dns\x1b[0m\n"
+        "\x1b[0;32mMetrics-server\x1b[0m is running at \x1b[0;33mhttps://k8s.example:6443/metrics\x1b[0m\n"
+        "\n"
+        "To further debug and diagnose cluster problems, use 'kubectl cluster-info dump'.\n"
+    )
+
+    assert KubernetesClusterInfo.form_cluster_info_output(raw_output=raw_output) == KubernetesClusterInfo(
+        master_url="https://k8s.example:6443",
+        dns_url="https://k8s.example:6443/dns",
+        metrics_url="https://k8s.example:6443/metrics",
+    )
+
+
+def test_KubernetesClusterInfo_form_cluster_info_output_raises_on_missing_urls():
+    raw_output = "Kubernetes control plane is running at https://k8s.example:6443\n"
+
+    with pytest.raises(KubernetesMalformedClusterInfo):
+        KubernetesClusterInfo.form_cluster_info_output(raw_output=raw_output)
+
+
 def test_validate_version_ok():
     assert validate_version("1.23.4") == "1.23.4"
-    assert validate_version(" 1.23. 4  ") == "1.23.4"
+    assert validate_version(" 1.23.4  ") == "1.23.4"
 
 
-@pytest.mark.parametrize("version", ["aaaa", "1.23", "1.23.4.5", "1.23.", "1..2", "aa.aa.aa"])
+@pytest.mark.parametrize(
+    "version",
+    ["aaaa", "1.23", "1.23.4.5", "1.23.", "1..2", "aa.aa.aa", "1..2..3", " 1 . 2 . 3 ", "1.23.4-rc1", "١.٢.٣"],
+)
 def test_validate_version_error(version):
     with pytest.raises(ArgumentTypeError) as exc:
         assert validate_version(version) is None
     assert exc.value.args[0] == f"Expected version in minor.major.patch format, got '{version}'"
+
+
+def test_KubernetesController_get_cluster_info_is_fetched_once():
+    raw_output = (
+        "Kubernetes control plane is running at https://k8s.example:6443\n"
+        "CoreDNS is running at https://k8s.example:6443/dns\n"
+        "Metrics-server is running at https://k8s.example:6443/metrics\n"
+    )
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[raw_output])
+    controller = KubernetesController(remote=fake_remote, controlling_node_fqdn="fake.example")
+
+    assert controller.get_cluster_info() == controller.get_cluster_info()
+    assert controller.get_cluster_info().master_url == "https://k8s.example:6443"
+    fake_remote.query.return_value.run_sync.assert_called_once()
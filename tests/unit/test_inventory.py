@@ -20,6 +20,7 @@ from wmcs_libs.inventory.toolsk8s import (
     ToolforgeKubernetesClusterName,
     ToolforgeKubernetesNodeRoleName,
 )
+from wmcs_libs.openstack.clusters import get_openstack_clusters
 
 
 def get_dummy_inventory(
@@ -246,3 +247,12 @@ def test_get_openstack_project_deployment_ok(
 def test_get_openstack_project_deployment_invalid(node_fqdn: str) -> None:
     with pytest.raises(InventoryError):
         assert get_openstack_project_deployment(node_fqdn) is None
+
+
+def test_get_openstack_clusters_returns_a_new_list_every_time():
+    clusters = get_openstack_clusters()
+    assert clusters
+    assert OpenstackClusterName.EQIAD1 in clusters
+
+    clusters.clear()
+    assert get_openstack_clusters()
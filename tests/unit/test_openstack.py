@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from dataclasses import asdict
 from unittest import mock
 
@@ -7,19 +8,25 @@ import cumin
 import pytest
 
 from wmcs_libs.common import CUMIN_SAFE_WITHOUT_OUTPUT, UtilsForTesting
+from wmcs_libs.inventory.libs import get_node_inventory_info
 from wmcs_libs.inventory.openstack import OpenstackClusterName
 from wmcs_libs.openstack.common import (
     NeutronAgentHAState,
     NeutronAgentType,
     NeutronAgentWithHAState,
     NeutronPartialAgent,
+    NeutronPartialPort,
     NeutronPartialRouter,
     NeutronRouterStatus,
     OpenstackAPI,
     OpenstackBadQuota,
+    OpenstackError,
+    OpenstackNotFound,
     OpenstackQuotaEntry,
     OpenstackQuotaName,
     Unit,
+    get_control_nodes,
+    wait_for_it,
 )
 
 
@@ -91,6 +98,11 @@ def test_OpenstackQuotaEntry_name_to_cli_works(quota_name: OpenstackQuotaName, v
                 "quota_name": OpenstackQuotaName.GIGABYTES,
                 "expected_value": 10,
             },
+            "Per volume gigabytes passing 10G": {
+                "human_str": "10G",
+                "quota_name": OpenstackQuotaName.PER_VOLUME_GIGABYTES,
+                "expected_value": 10,
+            },
             "CORES passing 20": {
                 "human_str": "20",
                 "quota_name": OpenstackQuotaName.CORES,
@@ -111,6 +123,16 @@ def test_OpenstackQuotaEntry_name_to_cli_works(quota_name: OpenstackQuotaName, v
                 "quota_name": OpenstackQuotaName.RAM,
                 "expected_value": 20 * 1024,
             },
+            "RAM passing 20GB": {
+                "human_str": "20GB",
+                "quota_name": OpenstackQuotaName.RAM,
+                "expected_value": 20 * 1024,
+            },
+            "Instances passing -1 (unlimited)": {
+                "human_str": "-1",
+                "quota_name": OpenstackQuotaName.INSTANCES,
+                "expected_value": -1,
+            },
         }
     )
 )
@@ -142,6 +164,12 @@ def test_OpenstackQuotaEntry___init__raises(human_str: str, quota_name: Openstac
         OpenstackQuotaEntry.from_human_spec(human_spec=human_str, name=quota_name)
 
 
+@pytest.mark.parametrize("human_str", ["", "G", "ten", "10G5", "-10G"])
+def test_OpenstackQuotaEntry___init__raises_on_unparseable_spec(human_str: str):
+    with pytest.raises(ValueError):
+        OpenstackQuotaEntry.from_human_spec(human_spec=human_str, name=OpenstackQuotaName.RAM)
+
+
 @pytest.mark.parametrize(
     **UtilsForTesting.to_parametrize(
         test_cases={
@@ -380,7 +408,8 @@ def test_OpenstackAPI_get_neutron_agents_works(neutron_output: str, expected_age
 
     fake_run_sync.assert_called_with(
         cumin.transports.Command(
-            "env OS_PROJECT_ID=admin-monitoring wmcs-openstack network agent list -f json --os-cloud novaadmin",
+            "env OS_PROJECT_ID=admin-monitoring wmcs-openstack network agent list -f json --noindent "
+            "--os-cloud novaadmin",
             ok_codes=[0],
         ),
         is_safe=True,
@@ -491,7 +520,7 @@ def test_NeutronController_list_agents_hosting_router_works(
     assert gotten_agents == expected_agents
     fake_run_sync.assert_called_with(
         cumin.transports.Command(
-            "env OS_PROJECT_ID=admin-monitoring wmcs-openstack network agent list --long --router=dummy_router -f json --os-cloud novaadmin",  # noqa: E501
+            "env OS_PROJECT_ID=admin-monitoring wmcs-openstack network agent list --long --router=dummy_router -f json --noindent --os-cloud novaadmin",  # noqa: E501
             ok_codes=[0],
         ),
         is_safe=True,
@@ -591,7 +620,7 @@ def test_NeutronController_router_list_works(neutron_output: str, expected_route
     assert gotten_routers == expected_routers
     fake_run_sync.assert_called_with(
         cumin.transports.Command(
-            "env OS_PROJECT_ID=admin-monitoring wmcs-openstack router list -f json --os-cloud novaadmin",
+            "env OS_PROJECT_ID=admin-monitoring wmcs-openstack router list -f json --noindent --os-cloud novaadmin",
             ok_codes=[0],
         ),
         is_safe=True,
@@ -603,9 +632,325 @@ def test_NeutronController_router_list_works(neutron_output: str, expected_route
     )
 
 
+def test_OpenstackAPI_neutron_agents_set_admin_state_runs_them_in_parallel():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[""])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+    fake_run_sync = fake_remote.query.return_value.run_sync
+
+    my_api.neutron_agents_set_admin_state(agent_ids=["agent-1", "agent-2"], admin_state_up=False)
+
+    fake_run_sync.assert_called_once()
+    assert fake_run_sync.call_args.args[0].command == (
+        "env OS_PROJECT_ID=admin wmcs-openstack network agent set --disable agent-1 --os-cloud novaadmin & pid0=$!; "
+        "sudo -i env OS_PROJECT_ID=admin wmcs-openstack network agent set --disable agent-2 --os-cloud novaadmin & "
+        "pid1=$!; failed=0; wait $pid0 || failed=1; wait $pid1 || failed=1; test $failed = 0"
+    )
+
+
+def test_OpenstackAPI_neutron_agents_set_admin_state_does_nothing_without_agents():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+
+    my_api.neutron_agents_set_admin_state(agent_ids=[], admin_state_up=True)
+
+    fake_remote.query.return_value.run_sync.assert_not_called()
+
+
+def test_OpenstackAPI_server_exists_reuses_the_listing_until_a_server_is_deleted():
+    listing = json.dumps([{"ID": "some-id", "Name": "vm-1"}])
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[listing, "", "[]"])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+    fake_run_sync = fake_remote.query.return_value.run_sync
+
+    assert my_api.server_exists("vm-1")
+    assert not my_api.server_exists("vm-2")
+    assert fake_run_sync.call_count == 1
+
+    my_api.server_delete("vm-1")
+    assert not my_api.server_exists("vm-1")
+    assert fake_run_sync.call_count == 3
+
+
+def test_OpenstackAPI_server_list_filter_exists_keeps_only_existing_servers():
+    listing = json.dumps([{"ID": "id-1", "Name": "vm-1"}, {"ID": "id-3", "Name": "vm-3"}])
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[listing])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+    hostnames = ["vm-0", "vm-1", "vm-2", "vm-4", "vm-3"]
+
+    assert my_api.server_list_filter_exists(hostnames) == ["vm-1", "vm-3"]
+    assert hostnames == ["vm-0", "vm-1", "vm-2", "vm-4", "vm-3"]
+
+
+def test_get_control_nodes_returns_a_new_list_every_time():
+    control_nodes = get_control_nodes(OpenstackClusterName.EQIAD1)
+    control_nodes.clear()
+
+    assert get_control_nodes(OpenstackClusterName.EQIAD1)
+
+
+@pytest.mark.parametrize("agent_type", list(NeutronAgentType))
+def test_NeutronAgentType_openstack_id_is_known_for_all_types(agent_type: NeutronAgentType):
+    assert agent_type.openstack_id
+
+
+def test_OpenstackAPI_get_nodes_domain_looks_up_the_inventory_once():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+
+    with mock.patch(
+        "wmcs_libs.openstack.common.get_node_inventory_info", wraps=get_node_inventory_info
+    ) as wrapped_get_node_inventory_info:
+        assert my_api.get_nodes_domain() == "eqiad.wmnet"
+        assert my_api.get_nodes_domain() == "eqiad.wmnet"
+
+    wrapped_get_node_inventory_info.assert_called_once()
+
+
+def test_OpenstackAPI_server_stop_polls_only_the_status():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=["", json.dumps({"status": "SHUTOFF"})])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+    fake_run_sync = fake_remote.query.return_value.run_sync
+
+    my_api.server_stop("vm-1")
+
+    assert fake_run_sync.call_args.args[0].command == (
+        "env OS_PROJECT_ID=admin wmcs-openstack server show vm-1 --column status -f json --noindent "
+        "--os-cloud novaadmin"
+    )
+
+
+def test_OpenstackAPI_security_group_create_quotes_the_description():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[""])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+
+    my_api.security_group_create(name="my-group", description="Tool's group")
+
+    assert fake_remote.query.return_value.run_sync.call_args.args[0].command == (
+        "env OS_PROJECT_ID=admin wmcs-openstack security group create my-group "
+        """--description 'Tool'"'"'s group' -f json --noindent --os-cloud novaadmin"""
+    )
+
+
+def test_OpenstackAPI_attach_service_ips_sets_all_the_addresses_at_once():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[""])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+
+    my_api.attach_service_ips(ip_addresses=["172.16.0.1", "172.16.0.2"], server_port_id="port-id")
+
+    assert fake_remote.query.return_value.run_sync.call_args.args[0].command == (
+        "env OS_PROJECT_ID=admin wmcs-openstack port set --allowed-address ip-address=172.16.0.1 "
+        "--allowed-address ip-address=172.16.0.2 port-id --os-cloud novaadmin"
+    )
+
+
+def test_OpenstackAPI_port_get_by_ip_filters_by_the_fixed_ip():
+    listing = json.dumps([{"ID": "port-id", "Name": "", "MAC Address": "fa:16:3e:00:00:01"}])
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[listing])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+
+    ports = my_api.port_get_by_ip(ip_address="172.16.0.1")
+
+    assert ports == [NeutronPartialPort(port_id="port-id", port_name="", mac_address="fa:16:3e:00:00:01")]
+    assert fake_remote.query.return_value.run_sync.call_args.args[0].command == (
+        "env OS_PROJECT_ID=admin wmcs-openstack port list --fixed-ip=ip-address=172.16.0.1 -f json --noindent "
+        "--os-cloud novaadmin"
+    )
+
+
+def test_OpenstackAPI_server_get_aggregates_reuses_the_aggregates_until_a_host_is_moved():
+    aggregate_list = json.dumps([{"Name": "ceph"}, {"Name": "maintenance"}])
+    all_details = "\n".join(
+        [
+            json.dumps({"name": "ceph", "hosts": ["cloudvirt1001"]}),
+            json.dumps({"name": "maintenance", "hosts": []}),
+        ]
+    )
+    fake_remote = UtilsForTesting.get_fake_remote(
+        responses=[aggregate_list, all_details, "", aggregate_list, all_details]
+    )
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+    fake_run_sync = fake_remote.query.return_value.run_sync
+
+    assert my_api.server_get_aggregates(name="cloudvirt1001") == [{"name": "ceph", "hosts": ["cloudvirt1001"]}]
+    assert my_api.server_get_aggregates(name="cloudvirt1001") == [{"name": "ceph", "hosts": ["cloudvirt1001"]}]
+    assert fake_run_sync.call_count == 2
+
+    my_api.aggregate_add_host(aggregate_name="maintenance", host_name="cloudvirt1002")
+    my_api.server_get_aggregates(name="cloudvirt1001")
+    assert fake_run_sync.call_count == 5
+
+
+def test_OpenstackAPI_server_get_aggregates_only_shows_the_server_aggregates_when_listing_the_hosts():
+    aggregate_list = json.dumps(
+        [
+            {"Name": "ceph", "Hosts": ["cloudvirt1001", "cloudvirt1002"]},
+            {"Name": "maintenance", "Hosts": []},
+            {"Name": "empty", "Hosts": None},
+        ]
+    )
+    ceph_details = json.dumps({"name": "ceph", "hosts": ["cloudvirt1001", "cloudvirt1002"]})
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[aggregate_list, ceph_details])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+    fake_run_sync = fake_remote.query.return_value.run_sync
+
+    assert my_api.server_get_aggregates(name="cloudvirt1001") == [
+        {"name": "ceph", "hosts": ["cloudvirt1001", "cloudvirt1002"]}
+    ]
+    assert fake_run_sync.call_args.args[0].command == (
+        "env OS_PROJECT_ID=admin wmcs-openstack aggregate show ceph -f json --noindent --os-cloud novaadmin"
+    )
+
+
+def test_OpenstackAPI_aggregates_show_fetches_all_the_details_in_one_command():
+    all_details = "\n".join([json.dumps({"name": "ceph"}), json.dumps({"name": "maintenance"})])
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[all_details])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+    fake_run_sync = fake_remote.query.return_value.run_sync
+
+    assert my_api.aggregates_show(aggregates=["ceph", "maintenance"], cumin_params=None) == [
+        {"name": "ceph"},
+        {"name": "maintenance"},
+    ]
+    assert fake_run_sync.call_args.args[0].command == (
+        "env OS_PROJECT_ID=admin wmcs-openstack aggregate show ceph -f json --noindent --os-cloud novaadmin && "
+        "sudo -i env OS_PROJECT_ID=admin wmcs-openstack aggregate show maintenance -f json --noindent "
+        "--os-cloud novaadmin"
+    )
+
+
+def test_OpenstackAPI_aggregates_show_raises_when_some_details_are_missing():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[json.dumps({"name": "ceph"})])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+
+    with pytest.raises(OpenstackError):
+        my_api.aggregates_show(aggregates=["ceph", "maintenance"], cumin_params=None)
+
+
+def test_OpenstackAPI_aggregates_show_raises_with_the_output_when_it_is_not_json():
+    warning = "WARNING: some deprecation warning from the client"
+    all_details = "\n".join([json.dumps({"name": "ceph"}), warning, json.dumps({"name": "maintenance"})])
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[all_details])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+
+    with pytest.raises(OpenstackError, match=warning):
+        my_api.aggregates_show(aggregates=["ceph", "maintenance"], cumin_params=None)
+
+
+def test_OpenstackAPI_server_group_ensure_returns_the_existing_group():
+    listing = json.dumps([{"ID": "group-id", "Name": "my-group", "Policies": "anti-affinity"}])
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[listing])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+
+    assert my_api.server_group_ensure(server_group="my-group")["ID"] == "group-id"
+    fake_remote.query.return_value.run_sync.assert_called_once()
+
+
+def test_OpenstackAPI_security_group_by_name_reuses_the_listing_until_a_group_is_created():
+    listing = json.dumps(
+        [
+            {"ID": "default-id", "Name": "default", "Project": "admin"},
+            {"ID": "other-id", "Name": "other", "Project": "admin"},
+        ]
+    )
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[listing, "", listing])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+    fake_run_sync = fake_remote.query.return_value.run_sync
+
+    assert my_api.security_group_by_name(name="default")["ID"] == "default-id"
+    assert my_api.security_group_by_name(name="other")["ID"] == "other-id"
+    assert fake_run_sync.call_count == 1
+
+    my_api.security_group_create(name="new", description="New group")
+    my_api.security_group_by_name(name="default")
+    assert fake_run_sync.call_count == 3
+
+
+def test_OpenstackAPI_security_group_ensure_creates_the_group_and_rules_in_one_command():
+    before = json.dumps([{"ID": "default-id", "Name": "default", "Project": "admin"}])
+    after = json.dumps(
+        [
+            {"ID": "default-id", "Name": "default", "Project": "admin"},
+            {"ID": "new-id", "Name": "new", "Project": "admin"},
+        ]
+    )
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[before, "", after])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+    fake_run_sync = fake_remote.query.return_value.run_sync
+
+    assert my_api.security_group_ensure(security_group="new", description="New")["ID"] == "new-id"
+
+    assert fake_run_sync.call_count == 3
+    assert fake_run_sync.call_args_list[1].args[0].command == (
+        "env OS_PROJECT_ID=admin wmcs-openstack security group create new --description New -f json --noindent "
+        "--os-cloud novaadmin && "
+        "sudo -i env OS_PROJECT_ID=admin wmcs-openstack security group rule create --egress --remote-group new "
+        "--protocol any new -f json --noindent --os-cloud novaadmin && "
+        "sudo -i env OS_PROJECT_ID=admin wmcs-openstack security group rule create --ingress --remote-group new "
+        "--protocol any new -f json --noindent --os-cloud novaadmin"
+    )
+
+
+def test_OpenstackAPI_server_create_leaves_plain_values_unquoted():
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[json.dumps({"id": "new-server-id"})])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+
+    new_server_id = my_api.server_create(
+        name="vm-1",
+        flavor="g3.cores1.ram2.disk20",
+        image="debian-12.0-bookworm",
+        network="lan-flat-cloudinstances2b",
+        server_group_id="group-id",
+        security_group_ids=["default-id"],
+        properties={"description": "canary VM"},
+        availability_zone="host:cloudvirt1001",
+    )
+
+    assert new_server_id == "new-server-id"
+    assert fake_remote.query.return_value.run_sync.call_args.args[0].command == (
+        "env OS_PROJECT_ID=admin wmcs-openstack server create --flavor g3.cores1.ram2.disk20 "
+        "--image debian-12.0-bookworm --network lan-flat-cloudinstances2b --wait --hint group=group-id "
+        "--security-group default-id --property 'description=canary VM' --availability-zone host:cloudvirt1001 vm-1 "
+        "-f json --noindent --os-cloud novaadmin"
+    )
+
+
+def test_OpenstackAPI_get_vm_proxy_recordsets_lets_designate_filter_by_name():
+    recordsets = json.dumps([{"id": "recordset-id", "name": "myproject.wmcloud.org.", "type": "A"}])
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[recordsets])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+
+    assert my_api.get_vm_proxy_recordsets(name="myproject.wmcloud.org.") == json.loads(recordsets)
+    assert fake_remote.query.return_value.run_sync.call_args.args[0].command == (
+        "env OS_PROJECT_ID=admin wmcs-openstack recordset list --all-projects --name myproject.wmcloud.org. "
+        "wmcloud.org. -f json --noindent --os-cloud novaadmin"
+    )
+
+
+def test_OpenstackAPI_get_all_users_reuses_the_listing():
+    listing = json.dumps([{"ID": "user-id", "Name": "user"}])
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[listing])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+
+    users = my_api.get_all_users()
+    users.clear()
+
+    assert my_api.get_all_users() == [{"ID": "user-id", "Name": "user"}]
+    fake_remote.query.return_value.run_sync.assert_called_once()
+
+
+def test_OpenstackAPI_aggregate_add_host_raises_when_host_not_found():
+    fake_remote = UtilsForTesting.get_fake_remote(
+        responses=["Unable to add host: Compute host cloudvirt1001.eqiad.wmnet could not be found. (HTTP 404)"]
+    )
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+
+    with pytest.raises(OpenstackNotFound):
+        my_api.aggregate_add_host(aggregate_name="ceph", host_name="cloudvirt1001.eqiad.wmnet")
+
+
 def test_OpenstackAPI_quota_show_happy_path():
     fake_remote = UtilsForTesting.get_fake_remote(
-        # openstack quota show -f json admin-monitoring
+        # openstack quota show -f json --noindent admin-monitoring
         responses=[
             """[
                 {
@@ -669,7 +1014,7 @@ def test_OpenstackAPI_quota_set_happy_path():
 
 def test_OpenstackAPI_quota_increase_happy_path():
     fake_remote = UtilsForTesting.get_fake_remote(
-        # openstack quota show -f json admin-monitoring
+        # openstack quota show -f json --noindent admin-monitoring
         responses=[
             # First show to see what's there
             """[
@@ -686,9 +1031,7 @@ def test_OpenstackAPI_quota_increase_happy_path():
                     "Limit": 1
                 }
             ]""",
-            # quota set response
-            "",
-            # last show to verify the increases were made
+            # quota set (no output) and show to verify the increases were made
             """[
                 {
                     "Resource": "floating-ips",
@@ -713,20 +1056,118 @@ def test_OpenstackAPI_quota_increase_happy_path():
     )
 
     expected_show_command = cumin.transports.Command(
-        ("wmcs-openstack quota show admin-monitoring -f json --os-cloud novaadmin"),
+        ("wmcs-openstack quota show admin-monitoring -f json --noindent --os-cloud novaadmin"),
         ok_codes=[0],
     )
 
-    expected_set_command = cumin.transports.Command(
-        ("wmcs-openstack quota set --cores=11 --gigabytes=21 --floating-ips=30 admin-monitoring --os-cloud novaadmin"),
+    expected_set_and_show_command = cumin.transports.Command(
+        (
+            "wmcs-openstack quota set --cores=11 --gigabytes=21 --floating-ips=30 admin-monitoring "
+            "--os-cloud novaadmin && sudo -i wmcs-openstack quota show admin-monitoring -f json --noindent "
+            "--os-cloud novaadmin"
+        ),
         ok_codes=[0],
     )
 
     fake_control_host = fake_remote.query.return_value
-    assert fake_control_host.run_sync.call_count == 3
+    assert fake_control_host.run_sync.call_count == 2
     calls = [
         mock.call(expected_show_command, **asdict(CUMIN_SAFE_WITHOUT_OUTPUT)),
-        mock.call(expected_set_command),
-        mock.call(expected_show_command, **asdict(CUMIN_SAFE_WITHOUT_OUTPUT)),
+        mock.call(expected_set_and_show_command),
     ]
     fake_control_host.run_sync.assert_has_calls(calls)
+
+
+def test_wait_for_it_checks_one_last_time_at_the_deadline():
+    clock = {"now": 1000.0}
+    sleeps = []
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock["now"] += seconds
+
+    condition_fn = mock.MagicMock(return_value=False)
+    with mock.patch("wmcs_libs.openstack.common.time") as fake_time:
+        fake_time.monotonic.side_effect = lambda: clock["now"]
+        fake_time.sleep.side_effect = fake_sleep
+        with pytest.raises(TimeoutError):
+            wait_for_it(
+                condition_fn=condition_fn,
+                condition_name_msg="something",
+                when_failed_raise_exception=TimeoutError,
+                condition_failed_msg_fn=lambda: "still not there",
+                timeout_seconds=25,
+            )
+
+    assert sleeps == [1, 2, 4, 8, 10]
+    assert condition_fn.call_count == 6
+
+
+def test_wait_for_it_backs_off_up_to_10_seconds():
+    clock = {"now": 1000.0}
+    sleeps = []
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock["now"] += seconds
+
+    condition_fn = mock.MagicMock(side_effect=[False] * 7 + [True])
+    with mock.patch("wmcs_libs.openstack.common.time") as fake_time:
+        fake_time.monotonic.side_effect = lambda: clock["now"]
+        fake_time.sleep.side_effect = fake_sleep
+        wait_for_it(
+            condition_fn=condition_fn,
+            condition_name_msg="something",
+            when_failed_raise_exception=TimeoutError,
+            condition_failed_msg_fn=lambda: "still not there",
+        )
+
+    assert sleeps == [1, 2, 4, 8, 10, 10, 10]
+
+
+def test_OpenstackAPI_server_start_raises_with_the_last_status_when_it_never_starts():
+    clock = {"now": 1000.0}
+
+    def fake_sleep(seconds: float) -> None:
+        clock["now"] += seconds
+
+    fake_remote = UtilsForTesting.get_fake_remote(
+        responses=[""] + [json.dumps({"status": "SHUTOFF"})] * 50,
+    )
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+    with mock.patch("wmcs_libs.openstack.common.time") as fake_time:
+        fake_time.monotonic.side_effect = lambda: clock["now"]
+        fake_time.sleep.side_effect = fake_sleep
+
+        with pytest.raises(OpenstackError, match="Server vm-1 status is 'SHUTOFF'"):
+            my_api.server_start("vm-1")
+
+    # up to 30s between checks, give or take the jitter
+    max_sleep = max(call.args[0] for call in fake_time.sleep.call_args_list)
+    assert 30 * 0.75 <= max_sleep <= 30 * 1.25
+
+
+def test_wait_for_it_varies_the_pauses_by_the_jitter():
+    clock = {"now": 1000.0}
+    sleeps = []
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock["now"] += seconds
+
+    condition_fn = mock.MagicMock(side_effect=[False] * 3 + [True])
+    with mock.patch("wmcs_libs.openstack.common.time") as fake_time, mock.patch(
+        "wmcs_libs.openstack.common.random.uniform", return_value=1.25
+    ) as fake_uniform:
+        fake_time.monotonic.side_effect = lambda: clock["now"]
+        fake_time.sleep.side_effect = fake_sleep
+        wait_for_it(
+            condition_fn=condition_fn,
+            condition_name_msg="something",
+            when_failed_raise_exception=TimeoutError,
+            condition_failed_msg_fn=lambda: "still not there",
+            jitter=0.25,
+        )
+
+    fake_uniform.assert_called_with(0.75, 1.25)
+    assert sleeps == [1.25, 2.5, 5]
@@ -116,7 +116,7 @@ def test_NeutronController_get_cloudnets_works(neutron_output: str, expected_clo
     assert sorted(gotten_agents) == sorted(expected_cloudnets)
     fake_run_sync.assert_called_with(
         cumin.transports.Command(
-            "env OS_PROJECT_ID=admin-monitoring wmcs-openstack network agent list --agent-type=l3 -f json --os-cloud novaadmin",  # noqa: E501
+            "env OS_PROJECT_ID=admin-monitoring wmcs-openstack network agent list --agent-type=l3 -f json --noindent --os-cloud novaadmin",  # noqa: E501
             ok_codes=[0],
         ),
         is_safe=True,
@@ -222,3 +222,27 @@ def test_NeutronController_check_if_network_is_alive_raises(
     ):
         with pytest.raises(NetworkUnhealthy):
             my_controller.check_if_network_is_alive()
+
+
+def test_NeutronController_wait_for_cloudnet_admin_down_only_fetches_the_cloudnet_agents():
+    neutron_output = """
+        [
+            {
+                "ID": "3f54b3c2-503f-4667-8263-859a259b3b21",
+                "Agent Type": "L3 agent",
+                "Host": "cloudnet1006",
+                "Availability Zone": "nova",
+                "Alive": true,
+                "State": false,
+                "Binary": "neutron-l3-agent"
+            }
+        ]
+    """
+    fake_remote = UtilsForTesting.get_fake_remote(responses=[neutron_output])
+    my_api = OpenstackAPI(remote=fake_remote, project="admin", cluster_name=OpenstackClusterName.EQIAD1)
+    my_controller = NeutronController(openstack_api=my_api)
+    fake_run_sync = fake_remote.query.return_value.run_sync
+
+    my_controller.wait_for_cloudnet_admin_down(cloudnet_host="cloudnet1006")
+
+    assert "network agent list --host=cloudnet1006 " in fake_run_sync.call_args.args[0].command
@@ -259,6 +259,11 @@ clustershell:
           -o StrictHostKeyChecking=no
           -o "UserKnownHostsFile=/dev/null"
           -o "LogLevel=ERROR"
+        # reuse the ssh connections, cookbooks run many short commands on the same hosts
+        - |
+          -o "ControlMaster=auto"
+          -o "ControlPath=~/.ssh/cumin-%C"
+          -o "ControlPersist=60"
 EOC
     fi
 
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import math
 from abc import ABCMeta, abstractmethod
 from datetime import timedelta
 
@@ -28,6 +29,8 @@ class WMCSCookbookBatchRunnerBase(WMCSCookbookRunnerBase, metaclass=ABCMeta):
         self.common_opts = common_opts
         super().__init__(spicerack=spicerack, common_opts=common_opts)
         self.query: str | None = None
+        # how many hosts are passed to run_on_hosts at the same time
+        self.batch_size: int = 1
 
     @property
     def runtime_description(self) -> str:
@@ -41,8 +44,7 @@ class WMCSCookbookBatchRunnerBase(WMCSCookbookRunnerBase, metaclass=ABCMeta):
             raise NotImplementedError("Subclass did not set self.query in constructor")
         result = self.spicerack.remote().query(self.query, use_sudo=True)
 
-        # TODO: make batch size configurable
-        for hosts in result.split(len(result)):
+        for hosts in result.split(math.ceil(len(result) / self.batch_size)):
             am_hosts = None
             downtime_id = None
             if self.downtime_reason:
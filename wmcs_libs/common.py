@@ -16,7 +16,7 @@ from dataclasses import replace as replace_in_dataclass
 from enum import Enum, auto
 from functools import partial
 from itertools import chain
-from typing import Any, Callable, Generator, Pattern
+from typing import Any, Callable, Generator, Pattern, Sequence
 from unittest import mock
 
 import yaml
@@ -31,6 +31,12 @@ from wmflib.irc import SocketHandler
 from wmcs_libs.proxy import with_proxy
 from wmcs_libs.test_helpers import WMCSCookbookRecorder
 
+try:
+    # the libyaml based loader is way faster, but it might not be available
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader  # type: ignore[assignment]
+
 LOGGER = logging.getLogger(__name__)
 PHABRICATOR_BOT_CONFIG_FILE = "/etc/phabricator_ops-monitoring-bot.conf"
 DIGIT_RE = re.compile("([0-9]+)")
@@ -181,6 +187,23 @@ def with_common_opts(spicerack: Spicerack, args: argparse.Namespace, runner: Cal
     return partial(runner, common_opts=common_opts)
 
 
+def _get_command(command: list[str] | Command, node: RemoteHosts, user: str | None, capture_errors: bool) -> Command:
+    """Build the cumin command to run, see run_one_raw."""
+    if node._use_sudo and user:  # pylint: disable=protected-access
+        command_prefix = f"-u '{user}' "
+    elif user:
+        raise Exception("You can't pass a user unless you have a node initialized with 'use_sudo=True'")
+    else:
+        command_prefix = ""
+
+    if not isinstance(command, Command):
+        command = Command(command=command_prefix + " ".join(command), ok_codes=[] if capture_errors else [0])
+    else:
+        command.command = command_prefix + command.command
+
+    return command
+
+
 def run_one_raw_needed_to_be_able_to_mock(
     command: list[str] | Command,
     node: RemoteHosts,
@@ -195,18 +218,7 @@ def run_one_raw_needed_to_be_able_to_mock(
     Useful when testing and/or recording test cases. Don't use unless you know what you are sure, use run_one_raw
     instead for most cases.
     """
-    if node._use_sudo and user:  # pylint: disable=protected-access
-        command_prefix = f"-u '{user}' "
-    elif user:
-        raise Exception("You can't pass a user unless you have a node initialized with 'use_sudo=True'")
-    else:
-        command_prefix = ""
-
-    if not isinstance(command, Command):
-        command = Command(command=command_prefix + " ".join(command), ok_codes=[] if capture_errors else [0])
-    else:
-        command.command = command_prefix + command.command
-
+    command = _get_command(command=command, node=node, user=user, capture_errors=capture_errors)
     run_sync_params = asdict(cumin_params) if cumin_params else {}
 
     try:
@@ -283,6 +295,30 @@ def run_one_raw(
     )
 
 
+def run_all_raw(
+    command: list[str] | Command,
+    nodes: RemoteHosts,
+    user: str | None = None,
+    capture_errors: bool = False,
+    cumin_params: CuminParams | None = None,
+) -> dict[str, str]:
+    """Run a command on several nodes.
+
+    Returns the raw output of each node by hostname, the nodes that did not output anything are not included.
+    """
+    command = _get_command(command=command, node=nodes, user=user, capture_errors=capture_errors)
+    run_sync_params = asdict(cumin_params) if cumin_params else {}
+
+    outputs: dict[str, str] = {}
+    for hosts, result in nodes.run_sync(command, **run_sync_params):
+        # Avoid crashing if we can't decode properly
+        raw_result = result.message().decode("utf-8", "backslashreplace")
+        for host in hosts:
+            outputs[host] = raw_result
+
+    return outputs
+
+
 def run_one_formatted_as_list(
     command: list[str] | Command,
     node: RemoteHosts,
@@ -366,7 +402,7 @@ def run_one_formatted(
             return json.loads(raw_result)
 
         if try_format == OutputFormat.YAML:
-            return yaml.safe_load(raw_result)
+            return yaml.load(raw_result, Loader=SafeLoader)
 
     except (json.JSONDecodeError, yaml.YAMLError) as error:
         raise Exception(f"Unable to parse output of command as {try_format}:\n{raw_result}") from error
@@ -504,11 +540,13 @@ class UtilsForTesting:
 
     @staticmethod
     def get_fake_remote_hosts(
-        responses: list[str] | None = None, side_effect: list[Any] | None = None
+        responses: Sequence[str | dict[str, str]] | None = None, side_effect: list[Any] | None = None
     ) -> mock.MagicMock:
         """Create a fake RemoteHosts object.
 
-        It will return a RemoteHosts that will return the given responses when run_sync is called in them.
+        It will return a RemoteHosts that will return the given responses when run_sync is called in them, one per
+        call. A response can also be a dict of hostname to output, for commands run on several hosts (see
+        run_all_raw).
         If side_effect is passed, it will override the responses and set that as side_effect of the mock on run_sync.
         """
         responses = responses if responses is not None else []
@@ -524,18 +562,27 @@ class UtilsForTesting:
             fake_msg_tree.message.return_value = msg_tree_response.encode()
             return fake_msg_tree
 
+        def _get_fake_run_sync_result(response: str | dict[str, str]):
+            # the return type of run_sync is Iterator[Tuple[NodeSet, MsgTreeElem]]
+            if isinstance(response, dict):
+                return iter(
+                    (NodeSet(nodes=host), _get_fake_msg_tree(msg_tree_response=host_response))
+                    for host, host_response in response.items()
+                )
+
+            return iter([(None, _get_fake_msg_tree(msg_tree_response=response))])
+
         if side_effect is not None:
             fake_hosts.run_sync.side_effect = side_effect
         else:
-            # the return type of run_sync is Iterator[Tuple[NodeSet, MsgTreeElem]]
-            fake_hosts.run_sync.return_value = (
-                (None, _get_fake_msg_tree(msg_tree_response=response)) for response in responses
-            )
+            fake_hosts.run_sync.side_effect = [_get_fake_run_sync_result(response=response) for response in responses]
 
         return fake_hosts
 
     @staticmethod
-    def get_fake_remote(responses: list[str] | None = None, side_effect: list[Any] | None = None) -> mock.MagicMock:
+    def get_fake_remote(
+        responses: Sequence[str | dict[str, str]] | None = None, side_effect: list[Any] | None = None
+    ) -> mock.MagicMock:
         """Create a fake remote.
 
         It will return a RemoteHosts that will return the given responses when run_sync is called in them.
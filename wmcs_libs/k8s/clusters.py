@@ -18,13 +18,16 @@ from wmcs_libs.inventory.toolsk8s import (
     ToolforgeKubernetesNodeRoleName,
 )
 
+# the enum does not change, no need to list it every time a parser is built
+CLUSTER_NAME_CHOICES = tuple(ToolforgeKubernetesClusterName)
+
 
 def add_toolforge_kubernetes_cluster_opts(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
     """Adds argparse arguments to work with Toolforge Kubernetes clusters."""
     parser.add_argument(
         "--cluster-name",
         required=True,
-        choices=list(ToolforgeKubernetesClusterName),
+        choices=CLUSTER_NAME_CHOICES,
         type=ToolforgeKubernetesClusterName,
         help="cluster to work on",
     )
@@ -2,13 +2,28 @@
 """Kubeadm deployment tool related code."""
 from __future__ import annotations
 
+import base64
+import binascii
+import hashlib
 import logging
+import re
+import time
+from contextlib import contextmanager
+from typing import Generator
+from urllib.parse import urlsplit
 
 import yaml
-from spicerack.remote import Remote
+from spicerack.remote import Remote, RemoteExecutionError, RemoteHosts
 from wmflib.interactive import ask_confirmation
 
-from wmcs_libs.common import CuminParams, run_one_raw, simple_create_file
+from wmcs_libs.common import (
+    CUMIN_SAFE_WITHOUT_OUTPUT,
+    CUMIN_UNSAFE_WITHOUT_OUTPUT,
+    CuminParams,
+    SafeLoader,
+    run_all_raw,
+    run_one_raw,
+)
 from wmcs_libs.k8s.kubernetes import KubernetesController, KubernetesTimeoutForNotReady
 
 LOGGER = logging.getLogger(__name__)
@@ -25,6 +40,16 @@ PKI_FILES_TO_TRANSFER = [
     "front-proxy-client.key",
 ]
 
+PKI_PATH = "/etc/kubernetes/pki"
+CA_CERT_PATH = f"{PKI_PATH}/ca.crt"
+DEFAULT_TOKEN_TTL = "1h"  # nosec B105
+BATCH_TOKEN_TTL = "30m"  # nosec B105
+BATCH_JOIN_CONCURRENCY = 7
+TOKEN_RE = re.compile(r"^[a-z0-9]{6}\.[a-z0-9]{16}$")
+JOIN_ATTEMPTS = 3
+JOIN_SUCCESS_MESSAGE = "This node has joined the cluster"
+JOIN_INVALID_TOKEN_RE = re.compile(r"token id .* is invalid|could not find a JWS signature|token .* has expired")
+
 HAPROXY_KEEPALIVED_PEERS_HIERA_KEY = "profile::toolforge::k8s::haproxy::keepalived_peers"
 KUBEADM_VERSION_COMPONENT_HIERA_KEY = "profile::wmcs::kubeadm::component"
 KUBERNETES_VERSION_HIERA_KEY = "profile::wmcs::kubeadm::kubernetes_version"
@@ -42,10 +67,63 @@ class KubeadmCreateTokenError(KubeadmError):
     """Raised when there was an error creating a token."""
 
 
+class KubeadmJoinError(KubeadmError):
+    """Raised when a node failed to join the cluster."""
+
+
+class KubeadmJoinPreflightError(KubeadmError):
+    """Raised when a node that should join the cluster can't reach the control plane."""
+
+
 class KubeadmTimeoutForNodeReady(KubeadmError):
     """Raised when a node did not get to Ready status on time."""
 
 
+class KubeadmMalformedCACert(KubeadmError):
+    """Raised when the CA certificate public key could not be parsed."""
+
+
+class KubeadmMalformedCertificatesArchive(KubeadmError):
+    """Raised when the certificates archive fetched from a control node is not valid base64."""
+
+
+def _get_public_key_hash(public_key_pem: str) -> str:
+    """Get the sha256 hash of a PEM encoded public key, in the format that kubeadm expects.
+
+    The PEM body is the base64 encoded DER SubjectPublicKeyInfo, which is what kubeadm hashes.
+    """
+    pem_lines = [line.strip() for line in public_key_pem.strip().splitlines()]
+    try:
+        start = pem_lines.index("-----BEGIN PUBLIC KEY-----")
+        end = pem_lines.index("-----END PUBLIC KEY-----", start)
+    except ValueError as error:
+        raise KubeadmMalformedCACert(f"Unable to find a public key in:\n{public_key_pem}") from error
+
+    der_public_key = base64.b64decode("".join(pem_lines[start + 1 : end]))
+    return hashlib.sha256(der_public_key).hexdigest()
+
+
+def _get_endpoint_host(endpoint: str) -> str:
+    """Get the host part of an etcd endpoint, ex. https://etcd-1.example:2379 -> etcd-1.example."""
+    # urlsplit also takes care of IPv6 addresses, ex. https://[::1]:2379
+    host = urlsplit(endpoint).hostname
+    if host is None:
+        # no scheme, ex. etcd-1.example:2379
+        host = urlsplit(f"//{endpoint}").hostname
+
+    return host or endpoint
+
+
+@contextmanager
+def _timed_join_step(step: str, node_fqdn: str) -> Generator[None, None, None]:
+    """Log how long a step of the join process took, to know where the time goes."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        LOGGER.info("kubeadm.join.step=%s node=%s dur_ms=%d", step, node_fqdn, (time.perf_counter() - start) * 1000)
+
+
 class KubeadmController:
     """Controller for a Kubeadmin managed kubernetes cluster."""
 
@@ -54,24 +132,46 @@ class KubeadmController:
         self._remote = remote
         self._target_node_fqdn = target_node_fqdn
         self._target_node = self._remote.query(f"D{{{self._target_node_fqdn}}}", use_sudo=True)
+        # the CA does not change for the lifetime of the cluster, so it's safe to keep it around
+        self._ca_cert_hash: str | None = None
 
     def get_nodes_domain(self) -> str:
         """Get the network domain for the nodes in the cluster."""
         return self._target_node_fqdn.split(".", 1)[-1]
 
-    def get_new_token(self) -> str:
-        """Creates a new bootstrap token."""
+    def get_new_token(self, ttl: str = DEFAULT_TOKEN_TTL) -> str:
+        """Creates a new bootstrap token, valid for the given ttl (ex. 1h, 30m)."""
         raw_output = run_one_raw(
-            command=["kubeadm", "token", "create"], node=self._target_node, cumin_params=CuminParams(print_output=False)
+            command=["kubeadm", "token", "create", "--ttl", ttl],
+            node=self._target_node,
+            cumin_params=CuminParams(print_output=False),
         )
-        output = raw_output.splitlines()[-1].strip()
-        if not output:
+        return self._parse_new_token(raw_output=raw_output)
+
+    @staticmethod
+    def _parse_new_token(raw_output: str) -> str:
+        """Get the token from the 'kubeadm token create' output, it's the last line (there might be warnings)."""
+        token = raw_output.rstrip().rpartition("\n")[2].strip()
+        if not TOKEN_RE.match(token):
             raise KubeadmCreateTokenError(f"Error creating a new token:\nOutput:{raw_output}")
 
-        return output
+        return token
+
+    def delete_token(self, token: str, async_delete: bool = False) -> str:
+        """Removes the given bootstrap token.
+
+        With async_delete, the deletion runs in the background and we don't wait for it (nor check the result), the
+        token expires anyhow after its ttl.
+        """
+        if async_delete:
+            run_one_raw(
+                # all the standard streams detached, otherwise the remote command might not return until it finishes
+                command=["nohup", "kubeadm", "token", "delete", token, "</dev/null", ">/dev/null", "2>&1", "&"],
+                node=self._target_node,
+                cumin_params=CUMIN_UNSAFE_WITHOUT_OUTPUT,
+            )
+            return ""
 
-    def delete_token(self, token: str) -> str:
-        """Removes the given bootstrap token."""
         raw_output = run_one_raw(
             command=["kubeadm", "token", "delete", token],
             node=self._target_node,
@@ -84,100 +184,380 @@ class KubeadmController:
 
     def get_ca_cert_hash(self) -> str:
         """Retrieves the CA cert hash to use when bootstrapping."""
+        if self._ca_cert_hash is not None:
+            return self._ca_cert_hash
+
+        # only extract the public key remotely, the hashing is done locally
         raw_output = run_one_raw(
-            command=[
-                "openssl x509 -pubkey -in /etc/kubernetes/pki/ca.crt",
-                "| openssl rsa -pubin -outform der 2>/dev/null",
-                "| openssl dgst -sha256 -hex",
-                "| sed 's/^.* //'",
-            ],
+            command=["openssl", "x509", "-pubkey", "-noout", "-in", CA_CERT_PATH],
             node=self._target_node,
+            cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
         )
-        return raw_output.strip()
+        self._ca_cert_hash = _get_public_key_hash(public_key_pem=raw_output)
+        return self._ca_cert_hash
 
-    def join(
-        self,
-        kubernetes_controller: KubernetesController,
-        wait_for_ready: bool = True,
-        timeout_seconds: int = 600,
-        is_control: bool = False,
-    ) -> None:
-        """Join this node to the kubernetes cluster controlled by the given controller."""
-        control_kubeadm = KubeadmController(
-            remote=self._remote, target_node_fqdn=kubernetes_controller.controlling_node_fqdn
+    def _create_token_and_get_ca_cert_hash(self, ttl: str = DEFAULT_TOKEN_TTL) -> tuple[str, str]:
+        """Creates a new bootstrap token and retrieves the CA cert hash with a single remote call."""
+        if self._ca_cert_hash is not None:
+            return self.get_new_token(ttl=ttl), self._ca_cert_hash
+
+        raw_output = run_one_raw(
+            command=[
+                "kubeadm",
+                "token",
+                "create",
+                "--ttl",
+                ttl,
+                "&&",
+                "openssl",
+                "x509",
+                "-pubkey",
+                "-noout",
+                "-in",
+                CA_CERT_PATH,
+            ],
+            node=self._target_node,
+            cumin_params=CuminParams(print_output=False),
         )
-        cluster_info = kubernetes_controller.get_cluster_info()
-        # kubeadm does not want the protocol part https?://
-        join_address = cluster_info.master_url.split("//", 1)[-1]
-        ca_cert_hash = control_kubeadm.get_ca_cert_hash()
-        new_token = control_kubeadm.get_new_token()
+        # the token is printed first, then the public key
+        token_output, pem_header, pem_rest = raw_output.partition("-----BEGIN PUBLIC KEY-----")
+        self._ca_cert_hash = _get_public_key_hash(public_key_pem=pem_header + pem_rest)
+        return self._parse_new_token(raw_output=token_output), self._ca_cert_hash
+
+    @contextmanager
+    def with_shared_token(self, ttl: str = BATCH_TOKEN_TTL) -> Generator[str, None, None]:
+        """Context manager that creates a bootstrap token to use for several joins, and deletes it at the end.
+
+        It also retrieves the CA cert hash in the same call.
+        """
+        token, _ = self._create_token_and_get_ca_cert_hash(ttl=ttl)
+        try:
+            yield token
+        finally:
+            self.delete_token(token=token, async_delete=True)
 
+    @staticmethod
+    def _get_join_command(join_address: str, token: str, ca_cert_hash: str, is_control: bool) -> list[str]:
+        """Get the kubeadm command to join a node to the cluster."""
         command = [
             "kubeadm",
             "join",
             join_address,
             "--token",
-            new_token,
+            token,
             "--discovery-token-ca-cert-hash",
             f"sha256:{ca_cert_hash}",
         ]
-
         if is_control:
             command.append("--control-plane")
 
+        return command
+
+    @staticmethod
+    def _check_control_plane_reachable(nodes: RemoteHosts, join_address: str) -> None:
+        """Make sure that the given nodes can reach the control plane before trying to join them.
+
+        Otherwise kubeadm might hang for minutes before failing.
+        """
         try:
             run_one_raw(
-                command=command,
-                node=self._target_node,
+                command=[
+                    "curl",
+                    "--silent",
+                    "--show-error",
+                    "--insecure",
+                    "--max-time",
+                    "3",
+                    f"https://{join_address}/healthz",
+                ],
+                node=nodes,
+                cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
             )
+        except RemoteExecutionError as error:
+            raise KubeadmJoinPreflightError(
+                f"Unable to reach the control plane at {join_address} from {nodes}"
+            ) from error
+
+    @staticmethod
+    def _wait_for_ready(
+        kubernetes_controller: KubernetesController, node_fqdns: list[str], timeout_seconds: int
+    ) -> None:
+        """Wait for freshly joined nodes to become ready."""
+        new_node_hostnames = [node_fqdn.split(".", 1)[0] for node_fqdn in node_fqdns]
+        try:
+            kubernetes_controller.wait_for_nodes_ready(
+                node_hostnames=new_node_hostnames, timeout_seconds=timeout_seconds
+            )
+        except KubernetesTimeoutForNotReady as e:
+            raise KubeadmTimeoutForNodeReady(str(e)) from e
+
+    def join(
+        self,
+        kubernetes_controller: KubernetesController,
+        wait_for_ready: bool = True,
+        timeout_seconds: int = 600,
+        is_control: bool = False,
+        token: str | None = None,
+        control_kubeadm: KubeadmController | None = None,
+    ) -> None:
+        """Join this node to the kubernetes cluster controlled by the given controller.
+
+        If no token is passed, a new one will be created (and deleted at the end), see also with_shared_token. When
+        joining several nodes, pass the same controller for the control node as `control_kubeadm` to all the joins,
+        so things like the CA cert hash are only fetched once.
+        """
+        if control_kubeadm is None:
+            control_kubeadm = KubeadmController(
+                remote=self._remote, target_node_fqdn=kubernetes_controller.controlling_node_fqdn
+            )
+        with _timed_join_step(step="get_cluster_info", node_fqdn=self._target_node_fqdn):
+            cluster_info = kubernetes_controller.get_cluster_info()
+
+        # kubeadm does not want the protocol part https?://
+        join_address = urlsplit(cluster_info.master_url).netloc
+        with _timed_join_step(step="preflight", node_fqdn=self._target_node_fqdn):
+            self._check_control_plane_reachable(nodes=self._target_node, join_address=join_address)
+
+        with _timed_join_step(step="get_token", node_fqdn=self._target_node_fqdn):
+            if token is None:
+                new_token, ca_cert_hash = control_kubeadm._create_token_and_get_ca_cert_hash()
+                owns_token = True
+            else:
+                new_token, ca_cert_hash = token, control_kubeadm.get_ca_cert_hash()
+                owns_token = False
+
+        try:
+            for attempt in range(1, JOIN_ATTEMPTS + 1):
+                command = self._get_join_command(
+                    join_address=join_address, token=new_token, ca_cert_hash=ca_cert_hash, is_control=is_control
+                )
+                with _timed_join_step(step=f"join_attempt_{attempt}", node_fqdn=self._target_node_fqdn):
+                    raw_output = run_one_raw(command=command, node=self._target_node, capture_errors=True)
+                if JOIN_SUCCESS_MESSAGE in raw_output:
+                    break
+
+                # the token might expire or be invalidated if the control plane is slow to answer, that happens
+                # before kubeadm changes anything in the node, so it's safe to retry with a new one
+                if attempt < JOIN_ATTEMPTS and JOIN_INVALID_TOKEN_RE.search(raw_output):
+                    LOGGER.warning("Join failed due to an invalid token (attempt %d), retrying with a new one", attempt)
+                    # no need to delete the old one, expired tokens are cleaned up by the control plane
+                    with _timed_join_step(step="get_new_token", node_fqdn=self._target_node_fqdn):
+                        new_token = control_kubeadm.get_new_token()
+                    owns_token = True
+                    continue
+
+                raise KubeadmJoinError(f"Unable to join node {self._target_node_fqdn}:\n{raw_output}")
 
             if not wait_for_ready:
                 return
 
-            new_node_hostname = self._target_node_fqdn.split(".", 1)[0]
-            try:
-                kubernetes_controller.wait_for_ready(node_hostname=new_node_hostname, timeout_seconds=timeout_seconds)
-            except KubernetesTimeoutForNotReady as e:
-                raise KubeadmTimeoutForNodeReady(str(e)) from e
+            with _timed_join_step(step="wait_for_ready", node_fqdn=self._target_node_fqdn):
+                self._wait_for_ready(
+                    kubernetes_controller=kubernetes_controller,
+                    node_fqdns=[self._target_node_fqdn],
+                    timeout_seconds=timeout_seconds,
+                )
 
         finally:
-            control_kubeadm.delete_token(token=new_token)
+            if owns_token:
+                control_kubeadm.delete_token(token=new_token, async_delete=True)
+
+    @classmethod
+    def _join_workers(
+        cls,
+        remote: Remote,
+        control_kubeadm: KubeadmController,
+        target_node_fqdns: list[str],
+        join_address: str,
+        token: str,
+        concurrency: int,
+    ) -> None:
+        """Join the given worker nodes in parallel, checking the output of each of them like join does."""
+        ca_cert_hash = control_kubeadm.get_ca_cert_hash()
+        pending_fqdns = target_node_fqdns
+        retry_token: str | None = None
+        try:
+            for attempt in range(1, JOIN_ATTEMPTS + 1):
+                pending_nodes = ",".join(pending_fqdns)
+                with _timed_join_step(step=f"join_attempt_{attempt}", node_fqdn=pending_nodes):
+                    outputs = run_all_raw(
+                        command=cls._get_join_command(
+                            join_address=join_address,
+                            token=retry_token or token,
+                            ca_cert_hash=ca_cert_hash,
+                            is_control=False,
+                        ),
+                        nodes=remote.query(f"D{{{pending_nodes}}}", use_sudo=True),
+                        capture_errors=True,
+                        cumin_params=CuminParams(batch_size=concurrency),
+                    )
+
+                # nodes that did not output anything did not join either
+                failed = {
+                    node_fqdn: outputs.get(node_fqdn, "")
+                    for node_fqdn in pending_fqdns
+                    if JOIN_SUCCESS_MESSAGE not in outputs.get(node_fqdn, "")
+                }
+                if not failed:
+                    return
+
+                # same as in join, an invalid token is safe to retry with a new one
+                if attempt < JOIN_ATTEMPTS and all(JOIN_INVALID_TOKEN_RE.search(output) for output in failed.values()):
+                    LOGGER.warning(
+                        "Join of %s failed due to an invalid token (attempt %d), retrying with a new one",
+                        ",".join(failed),
+                        attempt,
+                    )
+                    with _timed_join_step(step="get_new_token", node_fqdn=",".join(failed)):
+                        retry_token = control_kubeadm.get_new_token(ttl=BATCH_TOKEN_TTL)
+                    pending_fqdns = list(failed)
+                    continue
+
+                failures = "\n".join(f"{node_fqdn}:\n{output}" for node_fqdn, output in failed.items())
+                raise KubeadmJoinError(f"Unable to join nodes {','.join(failed)}:\n{failures}")
 
-    def copy_certificates_from(self, existing_node_fqdn: str):
-        """Copy certificate data from an existing control node to a new one."""
-        existing_node = self._remote.query(f"D{{{existing_node_fqdn}}}", use_sudo=True)
-        for file in PKI_FILES_TO_TRANSFER:
-            file_full_path = f"/etc/kubernetes/pki/{file}"
+        finally:
+            if retry_token is not None:
+                control_kubeadm.delete_token(token=retry_token, async_delete=True)
+
+    @classmethod
+    def join_many(
+        cls,
+        remote: Remote,
+        target_node_fqdns: list[str],
+        kubernetes_controller: KubernetesController,
+        wait_for_ready: bool = True,
+        timeout_seconds: int = 600,
+        is_control: bool = False,
+        concurrency: int = BATCH_JOIN_CONCURRENCY,
+    ) -> None:
+        """Join several nodes to the kubernetes cluster controlled by the given controller.
 
-            file_content = run_one_raw(
-                command=["cat", file_full_path],
-                node=existing_node,
-                cumin_params=CuminParams(print_output=False, is_safe=True),
+        Control nodes have to be joined one by one. Worker nodes are joined in parallel (at most `concurrency` at a
+        time, to avoid overwhelming the control plane), all of them using the same bootstrap token. As in join, the
+        output of each worker is checked, and the ones that failed due to an invalid token are retried with a new one.
+        """
+        control_kubeadm = cls(remote=remote, target_node_fqdn=kubernetes_controller.controlling_node_fqdn)
+        if is_control:
+            with control_kubeadm.with_shared_token() as shared_token:
+                for target_node_fqdn in target_node_fqdns:
+                    cls(remote=remote, target_node_fqdn=target_node_fqdn).join(
+                        kubernetes_controller=kubernetes_controller,
+                        wait_for_ready=wait_for_ready,
+                        timeout_seconds=timeout_seconds,
+                        is_control=True,
+                        token=shared_token,
+                        control_kubeadm=control_kubeadm,
+                    )
+            return
+
+        cluster_info = kubernetes_controller.get_cluster_info()
+        join_address = urlsplit(cluster_info.master_url).netloc
+        target_nodes = remote.query(f"D{{{','.join(target_node_fqdns)}}}", use_sudo=True)
+        cls._check_control_plane_reachable(nodes=target_nodes, join_address=join_address)
+
+        with control_kubeadm.with_shared_token() as shared_token:
+            cls._join_workers(
+                remote=remote,
+                control_kubeadm=control_kubeadm,
+                target_node_fqdns=target_node_fqdns,
+                join_address=join_address,
+                token=shared_token,
+                concurrency=concurrency,
             )
 
-            # TODO: this is a terrible heuristic but it works
-            if file.endswith(".key"):
-                # Create the file beforehand so it does not become world-writable
-                run_one_raw(
-                    command=["install", "-b", "-m", "0600", "/dev/null", file_full_path],
-                    node=self._target_node,
-                )
+            if not wait_for_ready:
+                return
 
-            simple_create_file(
-                dst_node=self._target_node,
-                contents=file_content,
-                remote_path=file_full_path,
-                use_root=True,
-                cumin_params=CuminParams(print_output=False),
+            # the nodes are all joining at the same time, a single watch covers all of them
+            cls._wait_for_ready(
+                kubernetes_controller=kubernetes_controller,
+                node_fqdns=target_node_fqdns,
+                timeout_seconds=timeout_seconds,
             )
 
-    def get_etcd_nodes(self, existing_control_node_fqdn: str) -> list[str]:
-        """Get list of etcd nodes currently known to kubeadm."""
-        kubectl = KubernetesController(self._remote, existing_control_node_fqdn)
-        kubeadm_config = kubectl.get_object("configmaps", "kubeadm-config", namespace="kube-system")
-        config = yaml.safe_load(kubeadm_config["data"]["ClusterConfiguration"])
+    def copy_certificates_from(self, existing_node_fqdn: str):
+        """Copy certificate data from an existing control node to a new one.
+
+        All the files are transferred in one go as a base64 encoded tarball, that also keeps their permissions.
+        """
+        existing_node = self._remote.query(f"D{{{existing_node_fqdn}}}", use_sudo=True)
+        tarball_base64 = run_one_raw(
+            command=[
+                "tar",
+                "--create",
+                "--gzip",
+                f"--directory={PKI_PATH}",
+                *PKI_FILES_TO_TRANSFER,
+                "|",
+                "base64",
+                "--wrap=0",
+            ],
+            node=existing_node,
+            cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
+        ).strip()
+        # cumin merges stderr in the output, make sure we only send a clean archive to the new node
+        try:
+            base64.b64decode(tarball_base64, validate=True)
+        except binascii.Error as error:
+            raise KubeadmMalformedCertificatesArchive(
+                f"Got invalid base64 output when fetching certificates from {existing_node_fqdn}: {error}"
+            ) from error
+
+        # the node sudo only applies to the first command of the pipe, so we need it explicitly for tar
+        run_one_raw(
+            command=[
+                "echo",
+                f"'{tarball_base64}'",
+                "|",
+                "base64",
+                "--decode",
+                "|",
+                "sudo",
+                "-i",
+                "tar",
+                "--extract",
+                "--gzip",
+                "--same-permissions",
+                f"--directory={PKI_PATH}",
+            ],
+            node=self._target_node,
+            cumin_params=CuminParams(print_output=False),
+        )
+
+    def _get_kubeadm_config_raw(self, control_fqdn: str) -> str:
+        """Get the raw ClusterConfiguration yaml from the kubeadm-config configmap, without a full controller."""
+        return run_one_raw(
+            command=[
+                "kubectl",
+                "--namespace=kube-system",
+                "get",
+                "configmap",
+                "kubeadm-config",
+                "--output='jsonpath={.data.ClusterConfiguration}'",
+            ],
+            node=self._remote.query(f"D{{{control_fqdn}}}", use_sudo=True),
+            cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
+        )
+
+    def get_etcd_nodes(
+        self, existing_control_node_fqdn: str | None = None, kubectl: KubernetesController | None = None
+    ) -> list[str]:
+        """Get list of etcd nodes currently known to kubeadm.
+
+        If you already have a controller for the cluster, pass it as `kubectl` to reuse it.
+        """
+        if kubectl is not None:
+            kubeadm_config = kubectl.get_object("configmaps", "kubeadm-config", namespace="kube-system")
+            raw_cluster_config = kubeadm_config["data"]["ClusterConfiguration"]
+        elif existing_control_node_fqdn:
+            raw_cluster_config = self._get_kubeadm_config_raw(control_fqdn=existing_control_node_fqdn)
+        else:
+            raise ValueError("Either existing_control_node_fqdn or kubectl must be specified")
+
+        config = yaml.load(raw_cluster_config, Loader=SafeLoader)
 
-        return [endpoint.split("//", 1)[1].split(":")[0] for endpoint in config["etcd"]["external"]["endpoints"]]
+        return list(map(_get_endpoint_host, config["etcd"]["external"]["endpoints"]))
 
     def upgrade_first(self, target_version: str):
         """Upgrades the first control node to a new Kubernetes version."""
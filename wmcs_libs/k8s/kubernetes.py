@@ -4,18 +4,83 @@ from __future__ import annotations
 
 import json
 import logging
+import math
+import re
+import shlex
 import time
 from argparse import ArgumentTypeError
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum, auto
 from typing import Any, Generator, Literal, overload
+from urllib.parse import quote, urlencode
 
-from spicerack.remote import Remote, RemoteExecutionError
+from spicerack.remote import Remote, RemoteExecutionError, RemoteHosts
 
-from wmcs_libs.common import CuminParams, OutputFormat, run_one_as_dict, run_one_raw
+from wmcs_libs.common import (
+    CUMIN_SAFE_WITHOUT_OUTPUT,
+    CUMIN_UNSAFE_WITHOUT_OUTPUT,
+    OutputFormat,
+    run_one_as_dict,
+    run_one_raw,
+)
 
 LOGGER = logging.getLogger(__name__)
+ANSI_COLOR_RE = re.compile(r"\x1b\[[0-9;]*m")
+CLUSTER_INFO_URL_RE = re.compile(
+    r"^(?P<name>Kubernetes control plane|CoreDNS|Metrics-server) is running at (?P<url>\S+)", re.MULTILINE
+)
+# how long a cluster-wide pod listing is reused, see KubernetesController.get_pods_for_node
+POD_CACHE_TTL_SECONDS = 5.0
+# pods that finished don't take any resources in the node, and are not interesting when draining it
+UNFINISHED_PODS_FIELD_SELECTOR = "status.phase!=Succeeded,status.phase!=Failed"
+# one line per pod, with only the fields used to find and wait for the pods of a node, see _parse_pod_summary
+# the phase goes last as it's never empty
+POD_SUMMARY_JSONPATH = (
+    '{range .items[*]}{.metadata.namespace}{"\\t"}{.metadata.name}{"\\t"}{.spec.nodeName}{"\\t"}'
+    '{.metadata.ownerReferences[*].kind}{"\\t"}{.status.phase}{"\\n"}{end}'
+)
+# DaemonSets run on every node so they can't be evicted from individual nodes.
+# The control plane components (api-server, controller-manager, scheduler) run with static manifests that are read by
+# Kubelet, and marked as owned by the Node resource. They can't be evicted either.
+# We assume that everything else can be evicted.
+NON_EVICTABLE_OWNER_KINDS = frozenset({"DaemonSet", "Node"})
+# how long to wait for the pods of the nodes being drained to go away, see KubernetesController.wait_for_drain
+DRAIN_TIMEOUT_SECONDS = 300
+# how long a node lookup is reused, see KubernetesController.get_node
+NODE_CACHE_TTL_SECONDS = 10.0
+# how long a kubelet config is reused, see KubeletController.get_kubelet_config
+KUBELET_CONFIG_CACHE_TTL_SECONDS = 60.0
+# major.minor.patch, surrounding whitespace is allowed but nothing else
+VERSION_RE = re.compile(r"^\s*(\d+)\.(\d+)\.(\d+)\s*$", re.ASCII)
+
+
+def _parse_pod_summary(raw_output: str) -> list[dict[str, Any]]:
+    """Parse the output of POD_SUMMARY_JSONPATH into pods that only have the fields in it."""
+    pods = []
+    for line in raw_output.splitlines():
+        fields = line.split("\t")
+        # cumin merges stderr in the output, kubectl warnings don't have tabs
+        if len(fields) != 5:
+            continue
+
+        namespace, name, node_name, owner_kinds, phase = fields
+        metadata: dict[str, Any] = {"name": name, "namespace": namespace}
+        if owner_kinds:
+            metadata["ownerReferences"] = [{"kind": kind} for kind in owner_kinds.split()]
+
+        pods.append({"metadata": metadata, "spec": {"nodeName": node_name or None}, "status": {"phase": phase}})
+
+    return pods
+
+
+def _get_ready_condition_status(conditions: list[dict[str, Any]]) -> bool | None:
+    """Whether the Ready condition in the given node conditions is True, None if there's no Ready condition (yet)."""
+    for condition in conditions:
+        if condition["type"] == "Ready":
+            return condition["status"] == "True"
+
+    return None
 
 
 class KubernetesError(Exception):
@@ -98,23 +163,17 @@ class KubernetesClusterInfo:
         To further debug and diagnose cluster problems, use 'kubectl cluster-info dump'.
         ```
         """
-        master_url = None
-        dns_url = None
-        metrics_url = None
-        for line in raw_output.splitlines():
-            # get rid of the terminal colors
-            line = line.replace("\x1b[0;33m", "").replace("\x1b[0;32m", "").replace("\x1b[0m", "")
-            if line.startswith("Kubernetes control plane"):
-                master_url = line.rsplit(" ", 1)[-1]
-            elif line.startswith("CoreDNS"):
-                dns_url = line.rsplit(" ", 1)[-1]
-            elif line.startswith("Metrics-server"):
-                metrics_url = line.rsplit(" ", 1)[-1]
-
-        if master_url is None or dns_url is None or metrics_url is None:
-            raise KubernetesMalformedClusterInfo(f"Unable to parse cluster info:\n{raw_output}")
-
-        return cls(master_url=master_url, dns_url=dns_url, metrics_url=metrics_url)
+        # get rid of the terminal colors
+        plain_output = ANSI_COLOR_RE.sub("", raw_output)
+        urls = {match["name"]: match["url"] for match in CLUSTER_INFO_URL_RE.finditer(plain_output)}
+        try:
+            return cls(
+                master_url=urls["Kubernetes control plane"],
+                dns_url=urls["CoreDNS"],
+                metrics_url=urls["Metrics-server"],
+            )
+        except KeyError as error:
+            raise KubernetesMalformedClusterInfo(f"Unable to parse cluster info:\n{raw_output}") from error
 
 
 @dataclass(frozen=True)
@@ -137,20 +196,62 @@ class KubernetesController:
         self._remote = remote
         self.controlling_node_fqdn = controlling_node_fqdn
         self._controlling_node = self._remote.query(f"D{{{self.controlling_node_fqdn}}}", use_sudo=True)
+        # (fetch time, pods), see _get_all_pods_cached
+        self._pods_cache: tuple[float, list[dict[str, Any]]] | None = None
+        # node hostname -> (fetch time, node list), see get_node
+        self._nodes_cache: dict[str, tuple[float, list[dict[str, Any]]]] = {}
+        # see get_cluster_info
+        self._cluster_info: KubernetesClusterInfo | None = None
+        # node fqdns -> hosts, see _get_remote_hosts
+        self._remote_hosts_cache: dict[tuple[str, ...], RemoteHosts] = {}
 
     def get_nodes_domain(self) -> str:
         """Get the network domain for the nodes in the cluster."""
         return self.controlling_node_fqdn.split(".", 1)[-1]
 
     def get_cluster_info(self) -> KubernetesClusterInfo:
-        """Get cluster info."""
-        raw_output = run_one_raw(
-            # cluster-info does not support json output format (there's a dump
-            # command, but it's too verbose)
-            command=["kubectl", "cluster-info"],
-            node=self._controlling_node,
-        )
-        return KubernetesClusterInfo.form_cluster_info_output(raw_output=raw_output)
+        """Get cluster info.
+
+        The endpoints don't change while a cookbook runs, so they are only fetched once per controller, that saves a
+        round trip for each node when joining several nodes in a row.
+        """
+        if self._cluster_info is None:
+            raw_output = run_one_raw(
+                # cluster-info does not support json output format (there's a dump
+                # command, but it's too verbose)
+                command=["kubectl", "cluster-info"],
+                node=self._controlling_node,
+            )
+            self._cluster_info = KubernetesClusterInfo.form_cluster_info_output(raw_output=raw_output)
+
+        return self._cluster_info
+
+    @staticmethod
+    def _kubectl_get(
+        kind: str,
+        *,
+        name: str | None = None,
+        namespace: str | None = None,
+        all_namespaces: bool = False,
+        selector: str | None = None,
+        field_selector: str | None = None,
+        output: str = "json",
+    ) -> list[str]:
+        """Build a 'kubectl get' command, only passing the options that are set."""
+        command = ["kubectl", "get", kind]
+        if name:
+            command.append(shlex.quote(name))
+        if namespace:
+            command.append(shlex.quote(f"--namespace={namespace}"))
+        elif all_namespaces:
+            command.append("--all-namespaces")
+        if selector:
+            command.append(shlex.quote(f"--selector={selector}"))
+        if field_selector:
+            command.append(shlex.quote(f"--field-selector={field_selector}"))
+
+        command.append(shlex.quote(f"--output={output}"))
+        return command
 
     @overload
     def get_object(self, kind: str, name: str, namespace: str, *, missing_ok: Literal[False] = False) -> dict[str, Any]:
@@ -170,88 +271,196 @@ class KubernetesController:
         """Get data for a single object in the cluster."""
         try:
             return run_one_as_dict(
-                command=["kubectl", "get", kind, name, f"--namespace={namespace}", "--output=json"],
+                command=self._kubectl_get(kind, name=name, namespace=namespace),
                 node=self._controlling_node,
-                cumin_params=CuminParams(is_safe=True, print_output=False, print_progress_bars=False),
+                cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
             )
         except RemoteExecutionError:
             if missing_ok:
                 return None
             raise
 
-    def get_nodes(self, selector: str | None = None) -> list[dict[str, Any]]:
-        """Get the nodes currently in the cluster."""
-        if selector:
-            selector_cli = f"--selector='{selector}'"
-        else:
-            selector_cli = ""
+    def _get_api_path(self, path: str, params: dict[str, str] | None = None) -> dict[str, Any]:
+        """Do a GET request straight to the API server, ex. path='/api/v1/nodes', params={'labelSelector': '...'}.
 
-        output = run_one_as_dict(
-            command=["kubectl", "get", "nodes", "--output=json", selector_cli],
+        This skips kubectl's resource discovery and object printing, and returns the json as the API sends it.
+        """
+        url = f"{path}?{urlencode(params)}" if params else path
+        return run_one_as_dict(
+            command=["kubectl", "get", "--raw", f"'{url}'"],
             node=self._controlling_node,
-            cumin_params=CuminParams(is_safe=True, print_output=False, print_progress_bars=False),
+            cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
         )
-        return output["items"]
+
+    def _find_api_object(self, path: str) -> dict[str, Any] | None:
+        """Get a single object straight from the API server, ex. path='/api/v1/nodes/mynode', None if it does not exist.
+
+        Only a not found reply from the API server is turned into None, any other error is raised.
+        """
+        # kubectl exits with 1 for any error, so we have to look at what it says
+        raw_output = run_one_raw(
+            command=["kubectl", "get", "--raw", f"'{path}'"],
+            node=self._controlling_node,
+            capture_errors=True,
+            cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
+        )
+        if raw_output.startswith("Error from server (NotFound)"):
+            return None
+
+        try:
+            return json.loads(raw_output)
+        except json.JSONDecodeError as error:
+            raise KubernetesError(f"Unable to get {path} from the API server: {raw_output}") from error
+
+    def get_nodes(self, selector: str | None = None) -> list[dict[str, Any]]:
+        """Get the nodes currently in the cluster.
+
+        The nodes listed also warm the get_node cache, so looking at them one by one afterwards is free.
+        """
+        params = {"labelSelector": selector} if selector else None
+        now = time.monotonic()
+        nodes = self._get_api_path("/api/v1/nodes", params=params)["items"]
+        for node in nodes:
+            self._nodes_cache[node["metadata"]["name"]] = (now, [node])
+
+        return nodes
 
     def get_nodes_hostnames(self, selector: str | None = None) -> list[str]:
         """Get the list of nodes currently in the cluster, in hostname list fashion."""
-        hostname_list = []
-        for item in self.get_nodes(selector):
-            hostname_list.append(item["metadata"]["name"])
+        # only fetch the names, the full node objects are quite big
+        raw_output = run_one_raw(
+            command=self._kubectl_get("nodes", selector=selector, output="jsonpath={.items[*].metadata.name}"),
+            node=self._controlling_node,
+            cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
+        )
+        return raw_output.split()
+
+    def get_node(self, node_hostname: str, use_cache: bool = True) -> list[dict[str, Any]]:
+        """Get only info for the the given node.
+
+        The result is reused for NODE_CACHE_TTL_SECONDS unless use_cache is False, pass that when you need the
+        current status of the node.
+        """
+        now = time.monotonic()
+        cached = self._nodes_cache.get(node_hostname)
+        if use_cache and cached is not None and now - cached[0] <= NODE_CACHE_TTL_SECONDS:
+            return cached[1]
+
+        # the node name is its hostname, getting it by name avoids the API server going through all the nodes
+        node_data = self._find_api_object(f"/api/v1/nodes/{quote(node_hostname, safe='')}")
+        if node_data is None:
+            # not cached, it might be joining the cluster right now
+            return []
+
+        self._nodes_cache[node_hostname] = (now, [node_data])
+        return [node_data]
 
-        return hostname_list
+    def invalidate_node(self, node_hostname: str) -> None:
+        """Forget the cached info for the given node, see get_node."""
+        self._nodes_cache.pop(node_hostname, None)
 
-    def get_node(self, node_hostname: str) -> list[dict[str, Any]]:
-        """Get only info for the the given node."""
-        return self.get_nodes(selector=f"kubernetes.io/hostname={node_hostname}")
+    def invalidate_cache(self) -> None:
+        """Forget all the cached nodes and pods, for when the cluster was changed behind this controller's back."""
+        self._nodes_cache.clear()
+        self._invalidate_pods_cache()
 
     def get_node_info(self, node_hostname: str) -> KubernetesNodeInfo:
         """Get parsed metadata about the given node."""
-        node_data = self.get_node(node_hostname=node_hostname)
-        if not node_data:
-            raise KubernetesNodeNotFound(f"Unable to find node {node_hostname} in the cluster.")
+        # only fetch the fields that are parsed, not the whole node object
+        try:
+            kubelet_version = run_one_raw(
+                command=self._kubectl_get(
+                    "nodes", name=node_hostname, output="jsonpath={.status.nodeInfo.kubeletVersion}"
+                ),
+                node=self._controlling_node,
+                cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
+            )
+        except RemoteExecutionError as error:
+            raise KubernetesNodeNotFound(f"Unable to find node {node_hostname} in the cluster.") from error
 
-        return KubernetesNodeInfo.from_node_status(node_data[0]["status"])
+        return KubernetesNodeInfo(kubelet_version=kubelet_version.strip().removeprefix("v"))
 
     def get_pods(self, namespace: str | None = None, field_selector: str | None = None) -> list[dict[str, Any]]:
         """Get pods."""
-        namespace_arg = f"--namespace='{namespace}'" if namespace else "--all-namespaces"
-        field_selector_args = [f"--field-selector='{field_selector}'"] if field_selector else []
+        path = f"/api/v1/namespaces/{quote(namespace, safe='')}/pods" if namespace else "/api/v1/pods"
+        params = {"fieldSelector": field_selector} if field_selector else None
+        return self._get_api_path(path, params=params)["items"]
 
-        output = run_one_as_dict(
-            command=["kubectl", "get", "pods", namespace_arg, "--output=json", *field_selector_args],
-            node=self._controlling_node,
-            cumin_params=CuminParams(is_safe=True, print_output=False, print_progress_bars=False),
-        )
-        return output["items"]
+    def _get_all_pods_cached(self, ttl_seconds: float = POD_CACHE_TTL_SECONDS) -> list[dict[str, Any]]:
+        """Get all the unfinished pods in the cluster, reusing the previous listing if it's recent enough.
+
+        A full cluster-wide pod listing can be tens of MB, so kubectl trims it down in the control node and only the
+        few fields that are used come back, see POD_SUMMARY_JSONPATH.
+        """
+        now = time.monotonic()
+        if self._pods_cache is None or now - self._pods_cache[0] > ttl_seconds:
+            raw_output = run_one_raw(
+                command=self._kubectl_get(
+                    "pods",
+                    all_namespaces=True,
+                    field_selector=UNFINISHED_PODS_FIELD_SELECTOR,
+                    output=f"jsonpath={POD_SUMMARY_JSONPATH}",
+                ),
+                node=self._controlling_node,
+                cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
+            )
+            self._pods_cache = (now, _parse_pod_summary(raw_output))
+
+        return self._pods_cache[1]
+
+    def _invalidate_pods_cache(self) -> None:
+        self._pods_cache = None
 
     def get_pods_for_node(self, node_hostname: str, namespace: str | None = None) -> list[dict[str, Any]]:
-        """Get pods for node."""
-        return self.get_pods(namespace=namespace, field_selector=f"spec.nodeName={node_hostname}")
+        """Get the pods for node that did not finish yet (pending or running).
+
+        The finished pods are filtered out by the API server, the node in a (briefly cached) cluster-wide listing, so
+        checking several nodes in a row costs a single kubectl call. The pods returned only have the fields in
+        POD_SUMMARY_JSONPATH.
+        """
+        return [
+            pod
+            for pod in self._get_all_pods_cached()
+            if pod["spec"].get("nodeName") == node_hostname
+            and (namespace is None or pod["metadata"]["namespace"] == namespace)
+        ]
 
     def get_evictable_pods_for_node(self, node_hostname: str) -> list[dict[str, Any]]:
         """Get all pods in a node which will be evicted when draining the node."""
-        pods = self.get_pods_for_node(node_hostname=node_hostname)
+        # a single pass over the cluster-wide listing, see get_pods_for_node
         return [
             pod
-            for pod in pods
-            if not any(
-                # DaemonSets run on every node so they can't be evicted from individual nodes.
-                # The control plane components (api-server, controller-manager, scheduler) run
-                # with static manifests that are read by Kubelet, and marked as owned by the Node
-                # resource. They can't be evicted either.
-                # We assume that everything else can be evicted.
-                ref["kind"] == "Node" or ref["kind"] == "DaemonSet"
-                for ref in pod["metadata"].get("ownerReferences", [])
-            )
+            for pod in self._get_all_pods_cached()
+            if pod["spec"].get("nodeName") == node_hostname
+            and not any(ref["kind"] in NON_EVICTABLE_OWNER_KINDS for ref in pod["metadata"].get("ownerReferences", []))
         ]
 
+    def _raise_if_node_missing(self, node_hostname: str, error: RemoteExecutionError) -> None:
+        """Raise KubernetesNodeNotFound if the node does not exist, to call when a command on a node failed.
+
+        That way the happy path does not need to check that the node exists beforehand.
+        """
+        try:
+            # just check that it's there, no need for the whole node object
+            run_one_raw(
+                command=self._kubectl_get("nodes", name=node_hostname, output="name"),
+                node=self._controlling_node,
+                cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
+            )
+        except RemoteExecutionError:
+            raise KubernetesNodeNotFound(f"Unable to find node {node_hostname} in the cluster.") from error
+
     def drain_node(self, node_hostname: str, timeout_seconds: int = 60) -> None:
         """Drain a node, it does not wait for the containers to be stopped though."""
-        node_info = self.get_node(node_hostname=node_hostname)
-        if not node_info:
-            raise KubernetesNodeNotFound(f"Unable to find node {node_hostname} in the cluster.")
+        self.drain_nodes(node_hostnames=[node_hostname], timeout_seconds=timeout_seconds)
+
+    def drain_nodes(self, node_hostnames: list[str], timeout_seconds: int = 60) -> None:
+        """Drain several nodes with a single 'kubectl drain', it does not wait for the containers to be stopped though.
 
+        kubectl cordons all the nodes before evicting anything, so the evicted pods are not rescheduled in a node that
+        is about to be drained too, and it already sends the evictions for the pods of a node in parallel, retrying the
+        ones refused by a pod disruption budget. The timeout applies to each node.
+        """
         command = [
             "kubectl",
             "drain",
@@ -261,126 +470,216 @@ class KubernetesController:
             "--skip-wait-for-delete-timeout=1",
             f"--timeout={timeout_seconds}s",
             "--force",
-            node_hostname,
+            *node_hostnames,
         ]
 
-        run_one_raw(command=command, node=self._controlling_node)
+        try:
+            run_one_raw(command=command, node=self._controlling_node)
+        except RemoteExecutionError as error:
+            for node_hostname in node_hostnames:
+                self._raise_if_node_missing(node_hostname=node_hostname, error=error)
+            raise
+        finally:
+            for node_hostname in node_hostnames:
+                self.invalidate_node(node_hostname)
+            self._invalidate_pods_cache()
 
-    def wait_for_drain(self, node_hostname: str, check_interval_seconds: int = 10, timeout_seconds: int = 300) -> None:
-        """Wait for a given node to be completely drained of pods."""
-        start_time = time.time()
-        cur_time = start_time
-        while cur_time - start_time < timeout_seconds:
-            evictable_pods = self.get_evictable_pods_for_node(node_hostname)
-            if not evictable_pods:
-                return
+    def wait_for_drain(self, node_hostname: str, timeout_seconds: int = DRAIN_TIMEOUT_SECONDS) -> None:
+        """Wait for a given node to be completely drained of pods.
 
+        This uses 'kubectl wait --for=delete' on the pods still in the node, that watches them and returns as soon as
+        they are gone instead of polling.
+        """
+        deadline = time.monotonic() + timeout_seconds
+        # only used if kubectl wait fails right away, to avoid hammering the API
+        backoff_seconds = 1
+        evictable_pods = self.get_evictable_pods_for_node(node_hostname)
+        while evictable_pods:
             LOGGER.debug(
                 "Waiting for node %s to stop all it's pods, still %d running ...",
                 node_hostname,
                 len(evictable_pods),
             )
-
-            time.sleep(check_interval_seconds)
-            cur_time = time.time()
-
-        # timed out!
-        raise KubernetesTimeoutForDrain(
-            f"Waited {timeout_seconds} for node {node_hostname} to drain, but it never did. "
-            f"Still has {len(evictable_pods)} pods running. Running pods:\n"
-            f"{json.dumps(evictable_pods, indent=4)}"
-        )
+            pods_by_namespace: dict[str, list[str]] = {}
+            for pod in evictable_pods:
+                pods_by_namespace.setdefault(pod["metadata"]["namespace"], []).append(f"pod/{pod['metadata']['name']}")
+
+            try:
+                for namespace, pods in pods_by_namespace.items():
+                    remaining_seconds = math.ceil(deadline - time.monotonic())
+                    if remaining_seconds <= 0:
+                        break
+
+                    run_one_raw(
+                        command=[
+                            "kubectl",
+                            "wait",
+                            "--for=delete",
+                            f"--namespace={namespace}",
+                            f"--timeout={remaining_seconds}s",
+                            *pods,
+                        ],
+                        node=self._controlling_node,
+                        cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
+                    )
+            except RemoteExecutionError:
+                LOGGER.debug("Waiting for the pods in node %s failed, retrying in %ds", node_hostname, backoff_seconds)
+                time.sleep(max(0, min(backoff_seconds, deadline - time.monotonic())))
+                backoff_seconds = min(backoff_seconds * 2, 10)
+
+            self._invalidate_pods_cache()
+            evictable_pods = self.get_evictable_pods_for_node(node_hostname)
+            if evictable_pods and time.monotonic() >= deadline:
+                raise KubernetesTimeoutForDrain(
+                    f"Waited {timeout_seconds} for node {node_hostname} to drain, but it never did. "
+                    f"Still has {len(evictable_pods)} pods running. Running pods:\n"
+                    f"{json.dumps(evictable_pods, indent=4)}"
+                )
 
     def delete_node(self, node_hostname: str) -> None:
         """Delete a node, it does not drain it, see drain_node for that."""
-        node_info = self.get_node(node_hostname=node_hostname)
-        if not node_info:
-            raise KubernetesNodeNotFound(f"Unable to find node {node_hostname} in the cluster.")
+        try:
+            run_one_raw(command=["kubectl", "delete", "node", node_hostname], node=self._controlling_node)
+        except RemoteExecutionError as error:
+            self._raise_if_node_missing(node_hostname=node_hostname, error=error)
+            raise
 
-        run_one_raw(command=["kubectl", "delete", "node", node_hostname], node=self._controlling_node)
+        self.invalidate_node(node_hostname)
+        self._invalidate_pods_cache()
 
     def uncordon_node(self, node_hostname: str) -> None:
         """Uncordon a node."""
-        current_nodes = self.get_nodes(selector=f"kubernetes.io/hostname={node_hostname}")
-        if not current_nodes:
-            raise KubernetesNodeNotFound("Unable to find node {node_hostname} in the cluster.")
-
-        run_one_raw(
-            command=["kubectl", "uncordon", node_hostname],
-            node=self._controlling_node,
-            cumin_params=CuminParams(print_output=False, print_progress_bars=False),
-        )
+        try:
+            run_one_raw(
+                command=["kubectl", "uncordon", node_hostname],
+                node=self._controlling_node,
+                cumin_params=CUMIN_UNSAFE_WITHOUT_OUTPUT,
+            )
+        except RemoteExecutionError as error:
+            self._raise_if_node_missing(node_hostname=node_hostname, error=error)
+            raise
+        finally:
+            self.invalidate_node(node_hostname)
 
     def is_node_ready(self, node_hostname: str) -> bool:
         """Ready means in 'Ready' status."""
-        node_info = self.get_node(node_hostname=node_hostname)
-        if not node_info:
-            raise KubernetesNodeNotFound(f"Unable to find node {node_hostname} in the cluster.")
+        try:
+            # only fetch the status of the Ready condition
+            ready_status = run_one_raw(
+                command=self._kubectl_get(
+                    "node", name=node_hostname, output='jsonpath={.status.conditions[?(@.type=="Ready")].status}'
+                ),
+                node=self._controlling_node,
+                cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
+            ).strip()
+        except RemoteExecutionError as error:
+            raise KubernetesNodeNotFound(f"Unable to find node {node_hostname} in the cluster.") from error
 
+        if ready_status not in ("True", "False", "Unknown"):
+            raise KubernetesNodeStatusError(
+                f"Unable to get 'Ready' condition of node {node_hostname}, got:\n{ready_status}"
+            )
+
+        return ready_status == "True"
+
+    def wait_for_ready(self, node_hostname: str, timeout_seconds: int = 600) -> None:
+        """Wait for a given k8s node to be in READY status.
+
+        This uses 'kubectl wait', that watches the node and returns as soon as it's ready instead of polling.
+        """
+        self.wait_for_nodes_ready(node_hostnames=[node_hostname], timeout_seconds=timeout_seconds)
+
+    def wait_for_nodes_ready(self, node_hostnames: list[str], timeout_seconds: int = 600) -> None:
+        """Wait for all the given k8s nodes to be in READY status, with a single 'kubectl wait' watching all of them."""
         try:
-            return next(
-                condition["status"] == "True"
-                for condition in node_info[0]["status"]["conditions"]
-                if condition["type"] == "Ready"
+            run_one_raw(
+                command=[
+                    "kubectl",
+                    "wait",
+                    "--for=condition=Ready",
+                    *(f"node/{node_hostname}" for node_hostname in node_hostnames),
+                    f"--timeout={timeout_seconds}s",
+                ],
+                node=self._controlling_node,
+                cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
             )
-        except StopIteration as error:
-            raise KubernetesNodeStatusError(
-                f"Unable to get 'Ready' condition of node {node_hostname}, got conditions:\n"
-                f"{node_info[0]['conditions']}"
-            ) from error
-
-    def wait_for_ready(self, node_hostname: str, check_interval_seconds: int = 10, timeout_seconds: int = 600) -> None:
-        """Wait for a given k8s node to be in READY status."""
-        start_time = time.time()
-        cur_time = start_time
-
-        while cur_time - start_time < timeout_seconds:
-            if self.is_node_ready(node_hostname):
-                return
-
-            time.sleep(check_interval_seconds)
-            cur_time = time.time()
-
-        # timed out!
-        cur_conditions = self.get_node(node_hostname)[0]["conditions"]
-        raise KubernetesTimeoutForNotReady(
-            f"Waited {timeout_seconds} for node {node_hostname} to "
-            "become healthy, but it never did. Current conditions:\n"
-            f"{json.dumps(cur_conditions, indent=4)}"
-        )
+        except RemoteExecutionError as error:
+            for node_hostname in node_hostnames:
+                node_info = self.get_node(node_hostname, use_cache=False)
+                if not node_info:
+                    raise KubernetesNodeNotFound(f"Unable to find node {node_hostname} in the cluster.") from error
+
+                cur_conditions = node_info[0]["status"].get("conditions", [])
+                if not _get_ready_condition_status(cur_conditions):
+                    raise KubernetesTimeoutForNotReady(
+                        f"Waited {timeout_seconds} for node {node_hostname} to "
+                        "become healthy, but it never did. Current conditions:\n"
+                        f"{json.dumps(cur_conditions, indent=4)}"
+                    ) from error
+
+            # they all became ready in the end, but kubectl failed for some other reason
+            raise
 
     def reboot_node(
         self, node_hostname: str, domain: str
     ) -> Generator[KubernetesRebootNodePhase, KubernetesRebootNodePhase, KubernetesRebootNodePhase]:
         """Reboot k8s node."""
+        return (yield from self.reboot_nodes(node_hostnames=[node_hostname], domain=domain))
+
+    def _get_remote_hosts(self, node_fqdns: list[str]) -> RemoteHosts:
+        """Get the remote hosts for the given nodes, the cumin query is parsed only the first time."""
+        key = tuple(node_fqdns)
+        if key not in self._remote_hosts_cache:
+            self._remote_hosts_cache[key] = self._remote.query(f"D{{{','.join(node_fqdns)}}}", use_sudo=True)
+
+        return self._remote_hosts_cache[key]
+
+    def reboot_nodes(
+        self, node_hostnames: list[str], domain: str, drain_timeout_seconds: int = DRAIN_TIMEOUT_SECONDS
+    ) -> Generator[KubernetesRebootNodePhase, KubernetesRebootNodePhase, KubernetesRebootNodePhase]:
+        """Reboot several k8s nodes at the same time, each phase is done for all of them before going to the next.
+
+        That way the nodes wait for the drain, reboot and become ready in parallel instead of one after the other.
+        """
         yield KubernetesRebootNodePhase.DRAIN
-        self.drain_node(node_hostname)
+        self.drain_nodes(node_hostnames)
 
         yield KubernetesRebootNodePhase.WAIT_DRAIN
-        self.wait_for_drain(node_hostname)
+        # the nodes drain at the same time, so they share a single deadline, otherwise waiting for each node in turn
+        # could take up to drain_timeout_seconds per node
+        deadline = time.monotonic() + drain_timeout_seconds
+        for node_hostname in node_hostnames:
+            self.wait_for_drain(node_hostname, timeout_seconds=max(0, math.ceil(deadline - time.monotonic())))
 
         yield KubernetesRebootNodePhase.VM_REBOOT
-        node_fqdn = f"{node_hostname}.{domain}"
-        node = self._remote.query(f"D{{{node_fqdn}}}", use_sudo=True)
-        reboot_time = datetime.utcnow()
-        node.reboot()
-        node.wait_reboot_since(since=reboot_time)
+        node_fqdns = [f"{node_hostname}.{domain}" for node_hostname in node_hostnames]
+        nodes = self._get_remote_hosts(node_fqdns)
+        # spicerack compares it with a timezone aware datetime
+        reboot_time = datetime.now(timezone.utc)
+        nodes.reboot(batch_size=len(node_fqdns))
+        nodes.wait_reboot_since(since=reboot_time)
+        for node_hostname in node_hostnames:
+            self.invalidate_node(node_hostname)
 
         yield KubernetesRebootNodePhase.UNCORDON
-        self.uncordon_node(node_hostname)
+        for node_hostname in node_hostnames:
+            self.uncordon_node(node_hostname)
 
         yield KubernetesRebootNodePhase.WAIT_READY
-        self.wait_for_ready(node_hostname)
+        # they are all booting at the same time, a single watch covers all of them
+        self.wait_for_nodes_ready(node_hostnames)
 
         return KubernetesRebootNodePhase.DONE
 
     def add_node_labels(self, node_hostname: str, labels: set[str]) -> None:
         """Add the specified labels to a node."""
         run_one_raw(command=["kubectl", "label", "node", node_hostname, *labels], node=self._controlling_node)
+        self.invalidate_node(node_hostname)
 
     def add_node_taints(self, node_hostname: str, taints: set[str]) -> None:
         """Add the specified labels to a node."""
         run_one_raw(command=["kubectl", "taint", "node", node_hostname, *taints], node=self._controlling_node)
+        self.invalidate_node(node_hostname)
 
     def delete_pod(self, pod_name: str, namespace: str) -> None:
         """Delete the given pod."""
@@ -389,17 +688,29 @@ class KubernetesController:
             node=self._controlling_node,
             command=command,
             capture_errors=False,
-            cumin_params=CuminParams(print_output=False, print_progress_bars=False),
+            cumin_params=CUMIN_UNSAFE_WITHOUT_OUTPUT,
         )
+        self._invalidate_pods_cache()
 
     def is_pod_running(self, pod_name: str, namespace: str, missing_ok: bool = False) -> bool:
         """Check if a pod is in running state."""
-        pod_dict = self.get_object(kind="pod", name=pod_name, namespace=namespace, missing_ok=missing_ok)
-        if not pod_dict:
-            # we rely on get_object() to raise the error if not missing_ok
-            return False
+        try:
+            # only fetch the phase, not the whole pod
+            phase = run_one_raw(
+                command=self._kubectl_get("pod", name=pod_name, namespace=namespace, output="jsonpath={.status.phase}"),
+                node=self._controlling_node,
+                cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
+            )
+        except RemoteExecutionError:
+            if missing_ok:
+                return False
+            raise
+
+        return phase.strip() == "Running"
+
 
-        return pod_dict.get("status", {}).get("phase", "") == "Running"
+# (kubelet node fqdn, config path) -> (fetch time, config), shared between all the KubeletController instances
+_KUBELET_CONFIG_CACHE: dict[tuple[str, str], tuple[float, dict[str, Any]]] = {}
 
 
 class KubeletController:
@@ -420,20 +731,32 @@ class KubeletController:
         self.kubelet_config_path = kubelet_config_path
         self._kubelet_node = self._remote.query(f"D{{{self.kubelet_node_fqdn}}}", use_sudo=True)
         self._static_pod_stopped_prefix = ".cookbook-stopped-"
-        self._kubelet_config_cache: dict[str, Any] = {}
+        # short pod name -> runtime pod name, see _static_pod_runtime_name
+        self._runtime_name_cache: dict[str, str] = {}
 
     def get_kubelet_config(self) -> dict[str, Any]:
-        """Get the kubelet configuration."""
-        # some basic caching
-        if not self._kubelet_config_cache:
-            self._kubelet_config_cache = run_one_as_dict(
-                command=["cat", self.kubelet_config_path],
-                node=self._kubelet_node,
-                try_format=OutputFormat.YAML,
-                cumin_params=CuminParams(is_safe=True, print_output=False, print_progress_bars=False),
-            )
+        """Get the kubelet configuration.
+
+        It's cached for KUBELET_CONFIG_CACHE_TTL_SECONDS, for any controller of the same kubelet.
+        """
+        cache_key = (self.kubelet_node_fqdn, self.kubelet_config_path)
+        now = time.monotonic()
+        cached = _KUBELET_CONFIG_CACHE.get(cache_key)
+        if cached is not None and now - cached[0] <= KUBELET_CONFIG_CACHE_TTL_SECONDS:
+            return cached[1]
+
+        kubelet_config = run_one_as_dict(
+            command=["cat", self.kubelet_config_path],
+            node=self._kubelet_node,
+            try_format=OutputFormat.YAML,
+            cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
+        )
+        _KUBELET_CONFIG_CACHE[cache_key] = (now, kubelet_config)
+        return kubelet_config
 
-        return self._kubelet_config_cache
+    def invalidate(self) -> None:
+        """Forget the cached kubelet configuration, for when it changes."""
+        _KUBELET_CONFIG_CACHE.pop((self.kubelet_node_fqdn, self.kubelet_config_path), None)
 
     def get_kubelet_config_parameter(self, param: str) -> Any:
         """Get a given config parameter."""
@@ -453,40 +776,42 @@ class KubeletController:
     def get_static_pods_defined(self) -> list[str]:
         """Get a list of static pods defined in this kubelet."""
         static_pods_path = str(self.get_kubelet_config_parameter("staticPodPath"))
+        # find prints just the file names, and unlike a shell glob does not fail when there are none
         files = run_one_raw(
-            command=["ls", f"{static_pods_path}/*.yaml"],
+            command=["find", static_pods_path, "-maxdepth", "1", "-name", "'*.yaml'", "-printf", "'%f\\n'"],
             node=self._kubelet_node,
-            cumin_params=CuminParams(is_safe=True, print_output=False, print_progress_bars=False),
+            cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
         )
-        return [file.removesuffix(".yaml").removeprefix(f"{static_pods_path}/") for file in files.splitlines()]
+        # find returns them in directory order, keep the same order ls used to give
+        return sorted(file.removesuffix(".yaml") for file in files.splitlines())
 
     def assert_static_pod_path_clean(self) -> None:
         """Quick and dirty check to see if there was a previous unfinished run."""
         static_pod_path = str(self.get_kubelet_config_parameter("staticPodPath"))
-        command = ["ls", "-ad", f"{static_pod_path}/.*"]
+        command = ["find", static_pod_path, "-mindepth", "1", "-maxdepth", "1", "-name", "'.*'", "-printf", "'%f\\n'"]
         try:
             raw_output = run_one_raw(
                 node=self._kubelet_node,
                 command=command,
                 capture_errors=False,
-                cumin_params=CuminParams(print_output=False, print_progress_bars=False, is_safe=True),
+                cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
             )
         except RemoteExecutionError:
             # if this fails, there is usually nothing in here, ignore
             return
 
         allowed_entries = [
-            f"{static_pod_path}/.",
-            f"{static_pod_path}/..",
             # .kubelet-keep can exist after a package upgrade
-            f"{static_pod_path}/.kubelet-keep",
+            ".kubelet-keep",
         ]
 
         for line in raw_output.splitlines():
             if line in allowed_entries:
                 continue
 
-            raise KubeletUnexpectedStaticPodPathStatus(f"path '{static_pod_path}' contains cruft. Fix by hand: {line}")
+            raise KubeletUnexpectedStaticPodPathStatus(
+                f"path '{static_pod_path}' contains cruft. Fix by hand: {static_pod_path}/{line}"
+            )
 
     def assert_static_pod_is_defined(self, pod_name: str) -> None:
         """Asserts whether a static pod is defined."""
@@ -495,78 +820,104 @@ class KubeletController:
 
     def _static_pod_runtime_name(self, short_pod_name: str) -> str:
         """Returns the full runtime name of a static pod."""
-        return f"{short_pod_name}-{self.kubelet_node_short_hostname}"
+        runtime_name = self._runtime_name_cache.get(short_pod_name)
+        if runtime_name is None:
+            runtime_name = f"{short_pod_name}-{self.kubelet_node_short_hostname}"
+            self._runtime_name_cache[short_pod_name] = runtime_name
 
-    def stop_static_pod(self, pod_name: str, namespace: str) -> None:
-        """Stop a static pod running in this kubelet."""
-        self.assert_static_pod_is_defined(pod_name)
+        return runtime_name
 
-        static_pod_path = self.get_kubelet_config_parameter("staticPodPath")
-        orig = f"{static_pod_path}/{pod_name}.yaml"
-        dest = f"{static_pod_path}/{self._static_pod_stopped_prefix}{pod_name}.yaml"
+    def _move_static_pod_manifests(self, moves: list[tuple[str, str]]) -> None:
+        """Move static pod manifests (list of (orig, dest)), and wait for the kubelet to pick up the change.
+
+        It's done in a single remote command, that also checks that the manifests are in place afterwards.
+        """
+        steps = [["mv", orig, dest] for orig, dest in moves]
+        steps.append(["sleep", str(self.get_kubelet_filecheckfrequency())])
+        for orig, dest in moves:
+            steps.extend([["test", "-e", dest], ["test", "!", "-e", orig]])
+
+        # the node sudo only applies to the first command, and the manifests directory is usually only readable by root
+        command = steps[0]
+        for step in steps[1:]:
+            command.extend(["&&", "sudo", "-i", *step])
 
-        command = ["mv", orig, dest]
         run_one_raw(
             node=self._kubelet_node,
             command=command,
-            cumin_params=CuminParams(print_output=False, print_progress_bars=False),
+            cumin_params=CUMIN_UNSAFE_WITHOUT_OUTPUT,
         )
 
-        time.sleep(self.get_kubelet_filecheckfrequency())
+    def stop_static_pod(self, pod_name: str, namespace: str) -> None:
+        """Stop a static pod running in this kubelet."""
+        self.stop_static_pods(pod_names=[pod_name], namespace=namespace)
 
-        try:
-            # reset the metadata.creationTimestamp value
-            self.k8s_control.delete_pod(pod_name=self._static_pod_runtime_name(pod_name), namespace=namespace)
-        except RemoteExecutionError:
-            # we don't care if this fails, this step is actually optional
-            pass
+    def stop_static_pods(self, pod_names: list[str], namespace: str) -> None:
+        """Stop several static pods running in this kubelet, at the same time."""
+        defined_pods = self.get_static_pods_defined()
+        for pod_name in pod_names:
+            if pod_name not in defined_pods:
+                raise KubeletStaticPodNotFound(f"static pod {pod_name} doesn't seem to be defined in this kubelet")
 
+        static_pod_path = self.get_kubelet_config_parameter("staticPodPath")
+        moves = [
+            (
+                f"{static_pod_path}/{pod_name}.yaml",
+                f"{static_pod_path}/{self._static_pod_stopped_prefix}{pod_name}.yaml",
+            )
+            for pod_name in pod_names
+        ]
         try:
-            self.assert_static_pod_is_defined(pod_name)
-            if self.k8s_control.is_pod_running(
-                pod_name=self._static_pod_runtime_name(pod_name), namespace=namespace, missing_ok=True
-            ):
-                # pod is still running? we failed to stop it
-                raise KubeletUnableToStopStaticPod(f"we somehow failed to stop static pod {pod_name}")
-        except KubeletStaticPodNotFound:
-            # expected, the pod was sucessfully stopped
-            pass
+            self._move_static_pod_manifests(moves=moves)
+        except RemoteExecutionError as error:
+            # the manifests are still there, or we could not move them
+            raise KubeletUnableToStopStaticPod(f"we somehow failed to stop static pods {pod_names}") from error
+
+        for pod_name in pod_names:
+            try:
+                # reset the metadata.creationTimestamp value
+                self.k8s_control.delete_pod(pod_name=self._static_pod_runtime_name(pod_name), namespace=namespace)
+            except RemoteExecutionError:
+                # we don't care if this fails, this step is actually optional
+                pass
 
     def start_static_pod(self, pod_name: str, namespace: str) -> None:
         """Start a previously stopped static pod."""
-        try:
-            self.assert_static_pod_is_defined(pod_name)
-            if self.k8s_control.is_pod_running(
+        self.start_static_pods(pod_names=[pod_name], namespace=namespace)
+
+    def start_static_pods(self, pod_names: list[str], namespace: str) -> None:
+        """Start several previously stopped static pods, at the same time."""
+        defined_pods = self.get_static_pods_defined()
+        pods_to_start = [
+            pod_name
+            for pod_name in pod_names
+            # if it's defined and running, it's already started and there's nothing to do
+            if pod_name not in defined_pods
+            or not self.k8s_control.is_pod_running(
                 pod_name=self._static_pod_runtime_name(pod_name), namespace=namespace, missing_ok=True
-            ):
-                # pod is already running doing nothing
-                return
-        except KubeletStaticPodNotFound:
-            # expected, the pod was previously stopped
-            pass
+            )
+        ]
+        if not pods_to_start:
+            return
 
         static_pod_path = self.get_kubelet_config_parameter("staticPodPath")
-        orig = f"{static_pod_path}/{self._static_pod_stopped_prefix}{pod_name}.yaml"
-        dest = f"{static_pod_path}/{pod_name}.yaml"
-
-        command = ["mv", orig, dest]
-        run_one_raw(
-            node=self._kubelet_node,
-            command=command,
-            cumin_params=CuminParams(print_output=False, print_progress_bars=False),
-        )
-
-        time.sleep(self.get_kubelet_filecheckfrequency())
-
+        moves = [
+            (
+                f"{static_pod_path}/{self._static_pod_stopped_prefix}{pod_name}.yaml",
+                f"{static_pod_path}/{pod_name}.yaml",
+            )
+            for pod_name in pods_to_start
+        ]
         try:
-            self.assert_static_pod_is_defined(pod_name)
-        except KubeletStaticPodNotFound as e:
-            raise KubeletUnableToStartStaticPod(f"we failed to start static pod {pod_name}: {str(e)}") from e
+            self._move_static_pod_manifests(moves=moves)
+        except RemoteExecutionError as e:
+            raise KubeletUnableToStartStaticPod(f"we failed to start static pods {pods_to_start}: {str(e)}") from e
 
-        if not self.k8s_control.is_pod_running(
-            pod_name=self._static_pod_runtime_name(pod_name), namespace=namespace, missing_ok=True
-        ):
-            raise KubeletUnableToStartStaticPod(f"we failed to start static pod {pod_name}")
+        for pod_name in pods_to_start:
+            if not self.k8s_control.is_pod_running(
+                pod_name=self._static_pod_runtime_name(pod_name), namespace=namespace, missing_ok=True
+            ):
+                raise KubeletUnableToStartStaticPod(f"we failed to start static pod {pod_name}")
 
     def restart_static_pod(self, pod_name: str, namespace: str) -> None:
         """Restart a given static pod.
@@ -576,8 +927,11 @@ class KubeletController:
         self.stop_static_pod(pod_name, namespace)
         self.start_static_pod(pod_name, namespace)
 
-    def restart_all_static_pods(self, namespace: str) -> None:
-        """Restart all static pods."""
+    def restart_all_static_pods(self, namespace: str, parallel: bool = False) -> None:
+        """Restart all static pods.
+
+        With parallel, all the pods but the kube-apiserver are restarted at the same time.
+        """
         self.assert_static_pod_path_clean()
 
         pod_list = self.get_static_pods_defined()
@@ -589,13 +943,19 @@ class KubeletController:
             self.restart_static_pod("kube-apiserver", namespace)
             pod_list.remove("kube-apiserver")
 
+        if parallel:
+            if pod_list:
+                self.stop_static_pods(pod_list, namespace)
+                self.start_static_pods(pod_list, namespace)
+            return
+
         for pod in pod_list:
             self.restart_static_pod(pod, namespace)
 
 
 def validate_version(version: str) -> str:
     """Argparse type validator for Kubernetes versions."""
-    parts = [part.strip() for part in version.split(".") if part.strip() != "" and part.strip().isnumeric()]
-    if len(parts) != 3:
+    match = VERSION_RE.match(version)
+    if not match:
         raise ArgumentTypeError(f"Expected version in minor.major.patch format, got '{version}'")
-    return ".".join(parts)
+    return ".".join(match.groups())
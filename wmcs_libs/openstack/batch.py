@@ -13,6 +13,23 @@ from wmcs_libs.common import CommonOpts, add_common_opts
 from wmcs_libs.inventory.openstack import OpenstackClusterName
 from wmcs_libs.openstack.common import get_node_cluster_name
 
+# the enum does not change, no need to list it every time a parser is built
+CLUSTER_NAME_CHOICES = tuple(OpenstackClusterName)
+
+
+def _add_target_opts(parser: argparse.ArgumentParser) -> None:
+    """Add the options to select the nodes to operate on, shared by all the batch cookbooks."""
+    parser.add_argument(
+        "--fqdn",
+        help="Operate on this specific node",
+    )
+    parser.add_argument(
+        "--cluster-name",
+        choices=CLUSTER_NAME_CHOICES,
+        type=OpenstackClusterName,
+        help="Operate on all nodes of this cluster",
+    )
+
 
 class CloudcontrolBatchBase(CookbookBase, metaclass=ABCMeta):
     """Base cookbook class for batch operations on clouducontrol nodes."""
@@ -24,17 +41,7 @@ class CloudcontrolBatchBase(CookbookBase, metaclass=ABCMeta):
             formatter_class=ArgparseFormatter,
         )
         add_common_opts(parser)
-
-        parser.add_argument(
-            "--fqdn",
-            help="Operate on this specific node",
-        )
-        parser.add_argument(
-            "--cluster-name",
-            choices=list(OpenstackClusterName),
-            type=OpenstackClusterName,
-            help="Operate on all nodes of this cluster",
-        )
+        _add_target_opts(parser)
 
         return parser
 
@@ -70,22 +77,18 @@ class CloudvirtBatchBase(CookbookBase, metaclass=ABCMeta):
             formatter_class=ArgparseFormatter,
         )
         add_common_opts(parser)
-
-        parser.add_argument(
-            "--fqdn",
-            help="Operate on this specific node",
-        )
-        parser.add_argument(
-            "--cluster-name",
-            choices=list(OpenstackClusterName),
-            type=OpenstackClusterName,
-            help="Operate on all nodes of this cluster",
-        )
+        _add_target_opts(parser)
         parser.add_argument(
             "--ceph-only",
             action="store_true",
             help="Operate on ceph-enabled nodes only",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1,
+            help="How many nodes to operate on at the same time, make sure the cluster has capacity for it",
+        )
         # TODO: add support for selecting on e.g. kernel version or similar
 
         return parser
@@ -114,3 +117,7 @@ class CloudvirtBatchRunnerBase(WMCSCookbookBatchRunnerBase, metaclass=ABCMeta):
             )
         else:
             raise ValueError("Either --fqdn or --cluster-name must be specified")
+
+        if args.batch_size < 1:
+            raise ValueError("--batch-size must be at least 1")
+        self.batch_size = args.batch_size
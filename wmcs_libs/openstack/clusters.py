@@ -1,16 +1,23 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
 from wmcs_libs.inventory.cluster import ClusterType
-from wmcs_libs.inventory.openstack import OpenstackCluster
+from wmcs_libs.inventory.openstack import OpenstackClusterName
 from wmcs_libs.inventory.static import get_static_inventory
 
 
-def get_openstack_clusters() -> list[OpenstackCluster]:
-    ret = []
-    inventory = get_static_inventory()
+@lru_cache(maxsize=None)
+def _get_openstack_clusters_cached() -> tuple[OpenstackClusterName, ...]:
+    # the static inventory does not change while running
+    return tuple(
+        cluster_name
+        for site in get_static_inventory().values()
+        for cluster_name in site.clusters_by_type.get(ClusterType.OPENSTACK, {})
+    )
 
-    for item in inventory.items():
-        # tuple(SiteName, Site)
-        site = item[1]
-        for cluster in site.clusters_by_type.get(ClusterType.OPENSTACK, []):
-            ret.append(cluster)
 
-    return ret
+def get_openstack_clusters() -> list[OpenstackClusterName]:
+    """Get the names of all the openstack clusters in the static inventory."""
+    # a new list every time, so callers can't change the cached one
+    return list(_get_openstack_clusters_cached())
@@ -3,18 +3,21 @@
 """Openstack generic related code."""
 from __future__ import annotations
 
+import copy
+import json
 import logging
+import random
 import re
+import shlex
 import time
 from collections.abc import Collection
-from dataclasses import dataclass
 from enum import Enum, auto
+from functools import lru_cache
 from ipaddress import IPv4Address
 from typing import Any, Callable, NamedTuple, Type, Union, cast
 
 import yaml
 from cumin.transports import Command
-from spicerack.decorators import retry
 from spicerack.remote import Remote, RemoteHosts
 
 from wmcs_libs.common import (
@@ -25,6 +28,7 @@ from wmcs_libs.common import (
     CuminParams,
     OutputFormat,
     run_one_formatted,
+    run_one_formatted_as_list,
     run_one_raw,
     simple_create_file,
 )
@@ -35,6 +39,26 @@ LOGGER = logging.getLogger(__name__)
 AGGREGATES_FILE_PATH = "/etc/wmcs_host_aggregates.yaml"
 MINUTES_IN_HOUR = 60
 SECONDS_IN_MINUTE = 60
+# how long to reuse the project server listing for the server existence checks, see OpenstackAPI.server_exists
+SERVER_LIST_CACHE_TTL_SECONDS = 5
+# what the cli outputs when the api replies with not found, it exits with 1 for any error so the code does not help
+NOT_FOUND_ERROR_MARKER = "HTTP 404"
+# how long to reuse the aggregate listing and details, see OpenstackAPI.server_get_aggregates
+AGGREGATE_CACHE_TTL_SECONDS = 30
+# how long to reuse the project security group listing, see OpenstackAPI.security_group_list
+SECURITY_GROUP_LIST_CACHE_TTL_SECONDS = 30
+# how long to reuse the user listing, see OpenstackAPI.get_all_users
+USER_LIST_CACHE_TTL_SECONDS = 60
+# how long to wait for a server or db instance to get to a status, and the longest pause between the checks
+STATUS_WAIT_TIMEOUT_SECONDS = 6 * SECONDS_IN_MINUTE
+STATUS_WAIT_MAX_CHECK_INTERVAL_SECONDS = 30
+# resizing copies the whole disk, so it can take way longer than the other status changes
+SERVER_RESIZE_WAIT_TIMEOUT_SECONDS = 30 * SECONDS_IN_MINUTE
+# how much the pause between status checks can randomly vary (ex. 0.25 is +-25%), so cookbooks polling at the same
+# time don't stay in sync
+STATUS_WAIT_JITTER = 0.25
+# a quota value, with or without units, ex. 10, 10G or 100MB, see OpenstackQuotaEntry.from_human_spec
+HUMAN_SPEC_RE = re.compile(r"(?P<value>-?[0-9]+)(?P<unit>[^0-9]*)\Z")
 
 
 OpenstackID = str
@@ -43,9 +67,16 @@ OpenstackName = str
 OpenstackIdentifier = Union[OpenstackID, OpenstackName]
 
 
+@lru_cache(maxsize=None)
+def _get_nodes_by_role_cached(cluster_name: OpenstackClusterName, role_name: OpenstackNodeRoleName) -> tuple[str, ...]:
+    # the static inventory does not change while running
+    return tuple(get_nodes_by_role(cluster_name, role_name=role_name))
+
+
 def get_control_nodes(cluster_name: OpenstackClusterName) -> list[str]:
     """Get all the FQDNs of the control nodes (in the future with netbox or similar)."""
-    return get_nodes_by_role(cluster_name, role_name=OpenstackNodeRoleName.CONTROL)
+    # a new list every time, so callers can't change the cached one
+    return list(_get_nodes_by_role_cached(cluster_name, role_name=OpenstackNodeRoleName.CONTROL))
 
 
 def get_control_nodes_from_node(node: str) -> list[str]:
@@ -55,12 +86,7 @@ def get_control_nodes_from_node(node: str) -> list[str]:
 
 def get_gateway_nodes(cluster_name: OpenstackClusterName) -> list[str]:
     """Get all the FQDNs of the gateway nodes (in the future with netbox or similar)."""
-    return get_nodes_by_role(cluster_name, role_name=OpenstackNodeRoleName.GATEWAY)
-
-
-def _quote(mystr: str) -> str:
-    """Wraps the given string in single quotes."""
-    return f"'{mystr}'"
+    return list(_get_nodes_by_role_cached(cluster_name, role_name=OpenstackNodeRoleName.GATEWAY))
 
 
 def _if_not_empty(data: str) -> str | None:
@@ -76,29 +102,42 @@ def wait_for_it(
     when_failed_raise_exception: Type[Exception],
     condition_failed_msg_fn: Callable[..., str],
     timeout_seconds: int = 900,
+    max_check_interval_seconds: int = 10,
+    jitter: float = 0,
 ):
     """Wait until a condition happens.
 
     It will call the callable until it returns True, or timeout_seconds passed, in which case it will raise
     when_failed_raise_exception with the return value of condition_failed_msg_fn.
+
+    The checks start every second and back off exponentially up to every max_check_interval_seconds, so short waits
+    return quickly without polling too often on long ones. A jitter (ex. 0.25 for +-25%) randomly varies each pause.
     """
-    check_interval_seconds = 10
-    start_time = time.time()
-    cur_time = start_time
-    while cur_time - start_time < timeout_seconds:
+    check_interval_seconds = 1
+    # monotonic, so clock adjustments in the middle of the wait don't shorten or stretch it
+    start_time = time.monotonic()
+    deadline = start_time + timeout_seconds
+    while True:
         if condition_fn():
             return
 
+        cur_time = time.monotonic()
+        if cur_time >= deadline:
+            break
+
+        # not cryptographic, only to spread the checks
+        jittered_interval_seconds = check_interval_seconds * random.uniform(1 - jitter, 1 + jitter)  # nosec B311
+        # don't oversleep the deadline, there's one last check right at it
+        sleep_seconds = min(jittered_interval_seconds, deadline - cur_time)
         LOGGER.info(
             "'%s' failed, waiting another %ds (timeout=%ds, %ds elapsed)...",
             condition_name_msg,
-            check_interval_seconds,
+            sleep_seconds,
             timeout_seconds,
             cur_time - start_time,
         )
-
-        time.sleep(check_interval_seconds)
-        cur_time = time.time()
+        time.sleep(sleep_seconds)
+        check_interval_seconds = min(check_interval_seconds * 2, max_check_interval_seconds)
 
     raise when_failed_raise_exception(
         f"Waited {timeout_seconds} for {condition_name_msg}, but it never happened:\n" f"{condition_failed_msg_fn()}"
@@ -163,6 +202,10 @@ class OpenstackQuotaName(Enum):
     VOLUMES_STANDARD = "volumes_standard"
 
 
+# the openstack cli option to set each quota, see OpenstackQuotaEntry.to_cli
+QUOTA_CLI_OPTIONS = {quota_name: f"--{quota_name.value.lower().replace('_', '-')}" for quota_name in OpenstackQuotaName}
+
+
 class Unit(Enum):
     """Basic information storage units."""
 
@@ -183,6 +226,29 @@ class Unit(Enum):
         raise OpenstackBadQuota(f"Unit {self} can't be lowered.")
 
 
+# (from unit, to unit) -> multiplier, only for the conversions to the same or a smaller unit (the Unit members go
+# from the biggest to the smallest)
+UNIT_CONVERSION_FACTORS = {
+    (from_unit, to_unit): 1024 ** (to_index - from_index)
+    for from_index, from_unit in enumerate(Unit)
+    for to_index, to_unit in enumerate(Unit)
+    if to_index >= from_index
+}
+
+
+def _get_quota_unit(quota_name: OpenstackQuotaName) -> Unit:
+    """Get the unit openstack expects for the given quota."""
+    if "gigabytes" in quota_name.value:
+        return Unit.GIGA
+    if quota_name == OpenstackQuotaName.RAM:
+        return Unit.MEGA
+    return Unit.UNIT
+
+
+# worked out once for all the quotas, see OpenstackQuotaEntry.from_human_spec
+QUOTA_UNITS = {quota_name: _get_quota_unit(quota_name) for quota_name in OpenstackQuotaName}
+
+
 class OpenstackQuotaEntry(NamedTuple):
     """Represents a specific entry for a quota."""
 
@@ -191,7 +257,7 @@ class OpenstackQuotaEntry(NamedTuple):
 
     def to_cli(self) -> str:
         """Return the openstack cli equivalent of setting this quota entry."""
-        return f"--{self.name.value.lower().replace('_', '-')}={self.value}"
+        return f"{QUOTA_CLI_OPTIONS[self.name]}={self.value}"
 
     def __str__(self):
         """Convert a OpenstackQuotaEntry to a formatted string for display."""
@@ -209,46 +275,31 @@ class OpenstackQuotaEntry(NamedTuple):
         )
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def _human_to_quota_number(human_spec: str, quota_name: OpenstackQuotaName) -> int:
         """Maps from human strings (ex. 10G) to the string needed for the given quota.
 
         This is to be able to translate "add 10G of ram" to the number that openstack expects for the ram, that is
         megabytes.
         """
-        if "gigabytes" in quota_name.value:
-            dst_unit = Unit.GIGA
-        elif quota_name == OpenstackQuotaName.RAM:
-            dst_unit = Unit.MEGA
-        else:
-            dst_unit = Unit.UNIT
-
-        try:
-            int(human_spec[-1:])
-            # if no unit passed use the openstack default one
-            cur_unit = dst_unit
-            cur_value = int(human_spec)
-
-        except ValueError as error:
-            unit_match = re.match("([0-9]+)([^0-9]+)$", human_spec)
-            if not unit_match:
-                raise ValueError(f"Unable to parse human spec '{human_spec}'") from error
-
-            value_str, unit_str = unit_match.groups()
-            # we only care about the first char, ex. GB -> G
-            cur_unit = Unit(unit_str[0].upper())
-            cur_value = int(value_str)
-
-        while dst_unit != cur_unit:
-            cur_value *= 1024
-            try:
-                cur_unit = cur_unit.next_unit()
-            except OpenstackBadQuota as error:
-                raise OpenstackBadQuota(
-                    f"Unable to translate {human_spec} for {quota_name} (maybe the quota chosen does not support that "
-                    "unit?)"
-                ) from error
+        dst_unit = QUOTA_UNITS[quota_name]
+        spec_match = HUMAN_SPEC_RE.match(human_spec)
+        # negative values are only valid without units, ex. -1 for unlimited
+        if not spec_match or (spec_match["unit"] and spec_match["value"].startswith("-")):
+            raise ValueError(f"Unable to parse human spec '{human_spec}'")
+
+        cur_value = int(spec_match["value"])
+        # if no unit passed use the openstack default one, we only care about the first char, ex. GB -> G
+        cur_unit = Unit(spec_match["unit"][0].upper()) if spec_match["unit"] else dst_unit
+
+        factor = UNIT_CONVERSION_FACTORS.get((cur_unit, dst_unit))
+        if factor is None:
+            raise OpenstackBadQuota(
+                f"Unable to translate {human_spec} for {quota_name} (maybe the quota chosen does not support that "
+                "unit?)"
+            )
 
-        return cur_value
+        return cur_value * factor
 
 
 class OpenstackServerGroupPolicy(ArgparsableEnum):
@@ -275,17 +326,16 @@ class NeutronAgentType(Enum):
     @property
     def openstack_id(self) -> str:
         """The short name used in OpenStack CLI commands for filtering."""
-        if self == NeutronAgentType.L3_AGENT:
-            return "l3"
-        if self == NeutronAgentType.OVS_AGENT:
-            return "open-vswitch"
-        if self == NeutronAgentType.LINUX_BRIDGE_AGENT:
-            return "linux-bridge"
-        if self == NeutronAgentType.DHCP_AGENT:
-            return "dhcp"
-        if self == NeutronAgentType.METADATA_AGENT:
-            return "metadata"
-        raise ValueError(f"Unknown agent type '{self}'!")
+        return NEUTRON_AGENT_TYPE_OPENSTACK_IDS[self]
+
+
+NEUTRON_AGENT_TYPE_OPENSTACK_IDS = {
+    NeutronAgentType.L3_AGENT: "l3",
+    NeutronAgentType.OVS_AGENT: "open-vswitch",
+    NeutronAgentType.LINUX_BRIDGE_AGENT: "linux-bridge",
+    NeutronAgentType.DHCP_AGENT: "dhcp",
+    NeutronAgentType.METADATA_AGENT: "metadata",
+}
 
 
 class NeutronAgentHAState(Enum):
@@ -295,8 +345,20 @@ class NeutronAgentHAState(Enum):
     STANDBY = "standby"
 
 
-@dataclass(frozen=True)
-class NeutronPartialAgent:
+def _neutron_agent_fields(agent_data: dict[str, Any]) -> dict[str, Any]:
+    """Get the common agent fields from an entry of the 'openstack network agent list' json output."""
+    return {
+        "agent_id": agent_data["ID"],
+        "agent_type": NeutronAgentType(agent_data["Agent Type"]),
+        "host": agent_data["Host"],
+        "availability_zone": agent_data["Availability Zone"],
+        "alive": agent_data["Alive"],
+        "admin_state_up": agent_data["State"],
+        "binary": agent_data["Binary"],
+    }
+
+
+class NeutronPartialAgent(NamedTuple):
     """Represents the details of a Neutron agent that can be seen in 'openstack network agent list' output."""
 
     agent_id: OpenstackID
@@ -309,33 +371,28 @@ class NeutronPartialAgent:
 
     @classmethod
     def from_agent_data(cls, agent_data: dict[str, Any]) -> "NeutronPartialAgent":
-        return cls(
-            agent_id=agent_data["ID"],
-            agent_type=NeutronAgentType(agent_data["Agent Type"]),
-            host=agent_data["Host"],
-            availability_zone=agent_data["Availability Zone"],
-            alive=agent_data["Alive"],
-            admin_state_up=agent_data["State"],
-            binary=agent_data["Binary"],
-        )
+        return cls(**_neutron_agent_fields(agent_data))
+
 
+class NeutronAgentWithHAState(NamedTuple):
+    """Represents a Neutron agent with a known HA status.
 
-@dataclass(frozen=True)
-class NeutronAgentWithHAState(NeutronPartialAgent):
-    """Represents a Neutron agent with a known HA status."""
+    Same fields as NeutronPartialAgent plus the HA state (named tuples can't add fields when subclassing).
+    """
 
+    agent_id: OpenstackID
+    agent_type: NeutronAgentType
+    host: str
+    availability_zone: str | None
+    alive: bool
+    admin_state_up: bool
+    binary: str
     ha_state: NeutronAgentHAState
 
     @classmethod
     def from_agent_data(cls, agent_data: dict[str, Any]) -> "NeutronAgentWithHAState":
         return cls(
-            agent_id=agent_data["ID"],
-            agent_type=NeutronAgentType(agent_data["Agent Type"]),
-            host=agent_data["Host"],
-            availability_zone=agent_data["Availability Zone"],
-            alive=agent_data["Alive"],
-            admin_state_up=agent_data["State"],
-            binary=agent_data["Binary"],
+            **_neutron_agent_fields(agent_data),
             ha_state=NeutronAgentHAState(agent_data["HA State"]),
         )
 
@@ -351,8 +408,7 @@ class NeutronRouterStatus(Enum):
     ERROR = "ERROR"
 
 
-@dataclass(frozen=True)
-class NeutronPartialRouter:
+class NeutronPartialRouter(NamedTuple):
     """Represents the details of a Neutron router that can be seen in 'openstack router list' output.
 
     We are only storing the fields we are using, if you need more please add them.
@@ -400,8 +456,7 @@ class NeutronPartialRouter:
         return self.status == NeutronRouterStatus.ACTIVE and self.has_ha and self.admin_state_up
 
 
-@dataclass(frozen=True)
-class NeutronPartialPort:
+class NeutronPartialPort(NamedTuple):
     """Represents the details of a Neutron port that can be seen in 'openstack port list' output."""
 
     port_id: OpenstackID
@@ -417,12 +472,14 @@ class NeutronPartialPort:
         )
 
 
-@dataclass(frozen=True)
-class NeutronPort(NeutronPartialPort):
+class NeutronPort(NamedTuple):
     """Represents the full details for a Neutron port.
 
     We are only storing the fields we are using, if you need more please add them."""
 
+    port_id: OpenstackID
+    port_name: str
+    mac_address: str
     device_id: OpenstackID | None
     device_owner: str | None
 
@@ -437,8 +494,7 @@ class NeutronPort(NeutronPartialPort):
         )
 
 
-@dataclass(frozen=True)
-class NeutronFloatingIP:
+class NeutronFloatingIP(NamedTuple):
     """Represents a Neutron floating IP address.
 
     We are only storing the fields we are using, if you need more please add them."""
@@ -470,14 +526,26 @@ class OpenstackAPI(CommandRunnerMixin):
         self.cluster_name = cluster_name
         self.control_node_fqdn = get_control_nodes(cluster_name)[0]
         self.control_node = remote.query(f"D{{{self.control_node_fqdn}}}", use_sudo=True)
+        # (fetch time, server names), see _get_server_names_cached
+        self._server_names_cache: tuple[float, frozenset[str]] | None = None
+        # (fetch time, aggregates) and aggregate -> (fetch time, details), see aggregate_list and aggregate_show
+        self._aggregate_list_cache: tuple[float, list[dict[str, Any]]] | None = None
+        self._aggregate_details_cache: dict[OpenstackIdentifier, tuple[float, dict[str, Any]]] = {}
+        # (fetch time, security groups), see security_group_list
+        self._security_group_list_cache: tuple[float, list[dict[str, Any]]] | None = None
+        # (fetch time, users), see get_all_users
+        self._all_users_cache: tuple[float, list[dict[str, Any]]] | None = None
+        # see get_nodes_domain
+        self._nodes_domain: str | None = None
         super().__init__(command_runner_node=self.control_node)
 
     def _get_full_command(
         self, *command: str, json_output: bool = True, project_as_arg: bool = False, with_env_var: bool = True
     ):
-        # some commands don't have formatted output
+        # some commands don't have formatted output, for the ones that do, skip the indentation, it only makes the
+        # output bigger to transfer and parse
         if json_output:
-            format_args = ["-f", "json"]
+            format_args = ["-f", "json", "--noindent"]
         else:
             format_args = []
         if "delete" in command:
@@ -499,6 +567,19 @@ class OpenstackAPI(CommandRunnerMixin):
 
         return final_command
 
+    @staticmethod
+    def _chain_commands(*full_commands: list[str]) -> list[str]:
+        """Join the given full commands into one that runs them one after the other, stopping at the first failure.
+
+        Useful to save the remote connection round trip when running several commands in a row.
+        """
+        # the node sudo only applies to the first command
+        chained_command = [*full_commands[0]]
+        for full_command in full_commands[1:]:
+            chained_command.extend(["&&", "sudo", "-i", *full_command])
+
+        return chained_command
+
     def hypervisor_list(self, cumin_params: CuminParams | None = None) -> list[dict[str, Any]]:
         """Returns a list of hypervisors."""
         return self.run_formatted_as_list(
@@ -511,23 +592,25 @@ class OpenstackAPI(CommandRunnerMixin):
 
     def get_nodes_domain(self) -> str:
         """Return the domain of the cluster handled by this controller."""
-        info = get_node_inventory_info(node=self.control_node_fqdn)
-        return f"{info.site_name.value}.wmnet"
+        # the inventory lookup goes through all the known nodes, and the control node does not change
+        if self._nodes_domain is None:
+            info = get_node_inventory_info(node=self.control_node_fqdn)
+            self._nodes_domain = f"{info.site_name.value}.wmnet"
+
+        return self._nodes_domain
 
     def create_service_ip(self, ip_name: OpenstackName, network: OpenstackIdentifier) -> dict[str, Any]:
         """Create a service IP with a specified name"""
-        return self.run_formatted_as_dict("port", "create", "--network", _quote(network), _quote(ip_name))
+        return self.run_formatted_as_dict("port", "create", "--network", shlex.quote(network), shlex.quote(ip_name))
+
+    def attach_service_ips(self, ip_addresses: list[str], server_port_id: OpenstackIdentifier) -> str:
+        """Attach all the specified service ip addresses to the specified port in a single call"""
+        address_args = [arg for address in ip_addresses for arg in ("--allowed-address", f"ip-address={address}")]
+        return self.run_raw("port", "set", *address_args, shlex.quote(server_port_id), json_output=False)
 
     def attach_service_ip(self, ip_address: str, server_port_id: OpenstackIdentifier) -> str:
         """Attach a specified service ip address to the specified port"""
-        return self.run_raw(
-            "port",
-            "set",
-            "--allowed-address",
-            f"ip-address={ip_address}",
-            _quote(server_port_id),
-            json_output=False,
-        )
+        return self.attach_service_ips(ip_addresses=[ip_address], server_port_id=server_port_id)
 
     def detach_service_ip(self, ip_address: str, mac_addr: str, server_port_id: OpenstackIdentifier) -> str:
         """Detach a specified service ip address from the specified port"""
@@ -536,7 +619,7 @@ class OpenstackAPI(CommandRunnerMixin):
             "unset",
             "--allowed-address",
             f"ip-address={ip_address},mac-address={mac_addr}",
-            _quote(server_port_id),
+            shlex.quote(server_port_id),
             json_output=False,
         )
 
@@ -554,7 +637,7 @@ class OpenstackAPI(CommandRunnerMixin):
         """Return neutron's list of registered services"""
         filter_args = []
         if host:
-            filter_args.append(f"--host={host}")
+            filter_args.append(shlex.quote(f"--host={host}"))
         if agent_type:
             filter_args.append(f"--agent-type={agent_type.openstack_id}")
 
@@ -565,25 +648,44 @@ class OpenstackAPI(CommandRunnerMixin):
 
     def neutron_agent_set_admin_up(self, agent_id: OpenstackID) -> None:
         """Set the given agent as admin-state-up (online)."""
-        self.run_raw(
-            "network", "agent", "set", "--enable", agent_id, json_output=False, cumin_params=CUMIN_UNSAFE_WITHOUT_OUTPUT
-        )
+        self.neutron_agents_set_admin_state(agent_ids=[agent_id], admin_state_up=True)
 
     def neutron_agent_set_admin_down(self, agent_id: OpenstackID) -> None:
         """Set the given agent as admin-state-down (offline)."""
-        self.run_raw(
-            "network",
-            "agent",
-            "set",
-            "--disable",
-            agent_id,
-            json_output=False,
-            cumin_params=CUMIN_UNSAFE_WITHOUT_OUTPUT,
-        )
+        self.neutron_agents_set_admin_state(agent_ids=[agent_id], admin_state_up=False)
+
+    def neutron_agents_set_admin_state(self, agent_ids: list[OpenstackID], admin_state_up: bool) -> None:
+        """Set the given agents as admin-state-up (online) or admin-state-down (offline).
+
+        The cli only takes one agent at a time, so it's called once per agent, but all in a single remote command that
+        runs them at the same time, and fails if any of them failed.
+        """
+        if not agent_ids:
+            return
+
+        state_arg = "--enable" if admin_state_up else "--disable"
+        steps = [
+            self._get_full_command("network", "agent", "set", state_arg, agent_id, json_output=False)
+            for agent_id in agent_ids
+        ]
+        if len(steps) == 1:
+            command = steps[0]
+        else:
+            # the node sudo only applies to the first command
+            command = [*steps[0], "&", "pid0=$!;"]
+            for index, step in enumerate(steps[1:], start=1):
+                command.extend(["sudo", "-i", *step, "&", f"pid{index}=$!;"])
+            command.append("failed=0;")
+            for index in range(len(steps)):
+                command.extend(["wait", f"$pid{index}", "||", "failed=1;"])
+            command.extend(["test", "$failed", "=", "0"])
+
+        run_one_raw(command=command, node=self.control_node, cumin_params=CUMIN_UNSAFE_WITHOUT_OUTPUT)
 
     def get_neutron_agents_for_router(self, router_id: OpenstackIdentifier) -> list[NeutronAgentWithHAState]:
+        router_filter = shlex.quote(f"--router={router_id}")
         data = self.run_formatted_as_list(
-            "network", "agent", "list", "--long", f"--router={router_id}", cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT
+            "network", "agent", "list", "--long", router_filter, cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT
         )
         return [NeutronAgentWithHAState.from_agent_data(agent) for agent in data]
 
@@ -602,11 +704,11 @@ class OpenstackAPI(CommandRunnerMixin):
 
     def port_get_for_server(self, server_id: OpenstackID) -> list[NeutronPartialPort]:
         """Get ports for a specified server."""
-        return self._port_get(port_filter=[f'--server="{server_id}"'])
+        return self._port_get(port_filter=[shlex.quote(f"--server={server_id}")])
 
     def port_get_by_ip(self, ip_address: str) -> list[NeutronPartialPort]:
         """Get ports for specified IP address"""
-        return self._port_get(port_filter=[f'--fixed-ip="ip-address={ip_address}"'])
+        return self._port_get(port_filter=[shlex.quote(f"--fixed-ip=ip-address={ip_address}")])
 
     def port_show(self, port_id: OpenstackID) -> NeutronPort:
         """Show information about a port."""
@@ -634,6 +736,12 @@ class OpenstackAPI(CommandRunnerMixin):
         """Get the information for a VM."""
         return self.run_formatted_as_dict("server", "show", vm_name_or_id, cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT)
 
+    def _server_get_status(self, vm_name_or_id: OpenstackIdentifier) -> str | None:
+        """Get only the status of a VM, lighter than server_show when polling it."""
+        return self.run_formatted_as_dict(
+            "server", "show", vm_name_or_id, "--column", "status", cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT
+        ).get("status")
+
     def db_instance_reboot(self, db_instance_id: OpenstackIdentifier) -> None:
         """Restart guest agent on db instance."""
         self.run_raw(
@@ -671,27 +779,32 @@ class OpenstackAPI(CommandRunnerMixin):
         _long = "--long" if long else ""
         return self.run_formatted_as_list("server", "list", _long, cumin_params=CuminParams.as_safe(cumin_params))
 
+    def _get_server_names_cached(self, cumin_params: CuminParams | None = None) -> frozenset[str]:
+        """Get the names of the servers in the project, reusing the previous listing if it's recent enough.
+
+        Servers created or deleted through this class invalidate it.
+        """
+        now = time.monotonic()
+        if self._server_names_cache is None or now - self._server_names_cache[0] > SERVER_LIST_CACHE_TTL_SECONDS:
+            names = frozenset(info["Name"] for info in self.server_list(cumin_params=cumin_params))
+            self._server_names_cache = (now, names)
+
+        return self._server_names_cache[1]
+
+    def _invalidate_server_names_cache(self) -> None:
+        self._server_names_cache = None
+
     def server_list_filter_exists(self, hostnames: list[str], cumin_params: CuminParams | None = None) -> list[str]:
         """Verify if all servers in the list exists.
 
         Returns the input list filtered with those hostnames that do exists.
         """
-        listing = self.server_list(cumin_params=cumin_params)
-
-        for hostname in hostnames:
-            if not any(info for info in listing if info["Name"] == hostname):
-                hostnames.remove(hostname)
-
-        return hostnames
+        existing_names = self._get_server_names_cached(cumin_params=cumin_params)
+        return [hostname for hostname in hostnames if hostname in existing_names]
 
     def server_exists(self, hostname: str, cumin_params: CuminParams | None = None) -> bool:
         """Returns True if a server exists, False otherwise."""
-        listing = self.server_list(cumin_params=cumin_params)
-
-        if not any(info for info in listing if info["Name"] == hostname):
-            return False
-
-        return True
+        return hostname in self._get_server_names_cached(cumin_params=cumin_params)
 
     def server_delete(self, name_to_remove: OpenstackName) -> None:
         """Delete a server.
@@ -700,6 +813,7 @@ class OpenstackAPI(CommandRunnerMixin):
         Openstack, that's probably not the FQDN (and hopefully the hostname,
         but maybe not).
         """
+        self._invalidate_server_names_cache()
         self.run_raw("server", "delete", name_to_remove)
 
     def server_force_reboot(self, name_to_reboot: OpenstackName) -> None:
@@ -711,44 +825,61 @@ class OpenstackAPI(CommandRunnerMixin):
         """
         self.run_raw("server", "reboot", "--hard", name_to_reboot, json_output=False)
 
-    @retry(
-        tries=8,
-        backoff_mode="power",
-        failure_message="Server is in unexpected status",
-        exceptions=(OpenstackError,),
-    )
-    def _server_wait_for_state(self, server: OpenstackIdentifier, states: Collection[str]) -> None:
-        """Wait for a server to be in a specific state."""
-        # TODO: should states be an Enum here?
-        server_state = self.server_show(server).get("status")
-        if server_state not in states:
-            raise OpenstackError(f"Server status is '{server_state}', not in any of {', '.join(states)}")
-
-    @retry(
-        tries=8,
-        backoff_mode="power",
-        failure_message="Db instance is in unexpected status",
-        exceptions=(OpenstackError,),
-    )
-    def _db_instance_wait_for_state(self, db_instance_id: OpenstackIdentifier, states: Collection[str]) -> None:
-        """Wait for a server to be in a specific state."""
+    @staticmethod
+    def _wait_for_status(
+        get_status_fn: Callable[[], str | None],
+        states: Collection[str | None],
+        status_name: str,
+        timeout_seconds: int = STATUS_WAIT_TIMEOUT_SECONDS,
+    ) -> None:
+        """Wait until get_status_fn returns any of the given states, raising OpenstackError if it never does."""
         # TODO: should states be an Enum here?
-        server_state = self.db_instance_show(db_instance_id).get("status")
-        if server_state not in states:
-            raise OpenstackError(f"Db instance status is '{server_state}', not in any of {', '.join(states)}")
-
-    @retry(
-        tries=8,
-        backoff_mode="power",
-        failure_message="Db instance has unexpected operating status",
-        exceptions=(OpenstackError,),
-    )
-    def _db_instance_wait_for_status(self, db_instance_id: OpenstackIdentifier, states: Collection[str]) -> None:
+        status = None
+
+        def status_in_states() -> bool:
+            nonlocal status
+            status = get_status_fn()
+            return status in states
+
+        wait_for_it(
+            condition_fn=status_in_states,
+            condition_name_msg=f"{status_name} in any of {', '.join(str(state) for state in states)}",
+            when_failed_raise_exception=OpenstackError,
+            condition_failed_msg_fn=lambda: f"{status_name} is '{status}'",
+            timeout_seconds=timeout_seconds,
+            max_check_interval_seconds=STATUS_WAIT_MAX_CHECK_INTERVAL_SECONDS,
+            jitter=STATUS_WAIT_JITTER,
+        )
+
+    def _server_wait_for_state(
+        self,
+        server: OpenstackIdentifier,
+        states: Collection[str | None],
+        timeout_seconds: int = STATUS_WAIT_TIMEOUT_SECONDS,
+    ) -> None:
         """Wait for a server to be in a specific state."""
-        # TODO: should states be an Enum here?
-        server_state = self.db_instance_show(db_instance_id).get("operating_status")
-        if server_state not in states:
-            raise OpenstackError(f"Db instance operating status is '{server_state}', not in any of {', '.join(states)}")
+        self._wait_for_status(
+            get_status_fn=lambda: self._server_get_status(server),
+            states=states,
+            status_name=f"Server {server} status",
+            timeout_seconds=timeout_seconds,
+        )
+
+    def _db_instance_wait_for_state(self, db_instance_id: OpenstackIdentifier, states: Collection[str | None]) -> None:
+        """Wait for a db instance to be in a specific state."""
+        self._wait_for_status(
+            get_status_fn=lambda: self.db_instance_show(db_instance_id).get("status"),
+            states=states,
+            status_name=f"Db instance {db_instance_id} status",
+        )
+
+    def _db_instance_wait_for_status(self, db_instance_id: OpenstackIdentifier, states: Collection[str | None]) -> None:
+        """Wait for a db instance to be in a specific operating status."""
+        self._wait_for_status(
+            get_status_fn=lambda: self.db_instance_show(db_instance_id).get("operating_status"),
+            states=states,
+            status_name=f"Db instance {db_instance_id} operating status",
+        )
 
     def server_start(self, server: OpenstackIdentifier):
         """Start a server."""
@@ -762,9 +893,11 @@ class OpenstackAPI(CommandRunnerMixin):
 
     def server_resize(self, server: OpenstackIdentifier, new_flavor_name: OpenstackName) -> None:
         """Resizes a server to a given flavor."""
-        orig_status = self.server_show(server).get("status")
+        orig_status = self._server_get_status(server)
         self.run_raw("server", "resize", "--flavor", new_flavor_name, server, json_output=False)
-        self._server_wait_for_state(server=server, states=["VERIFY_RESIZE"])
+        self._server_wait_for_state(
+            server=server, states=["VERIFY_RESIZE"], timeout_seconds=SERVER_RESIZE_WAIT_TIMEOUT_SECONDS
+        )
         self.run_raw("server", "resize", "confirm", server, json_output=False)
         self._server_wait_for_state(server=server, states=[orig_status])
 
@@ -818,75 +951,122 @@ class OpenstackAPI(CommandRunnerMixin):
         security_group_options = []
         if security_group_ids:
             for security_group_id in security_group_ids:
-                security_group_options.extend(["--security-group", security_group_id])
+                security_group_options.extend(["--security-group", shlex.quote(security_group_id)])
 
         server_group_options = []
         if server_group_id:
-            server_group_options.extend(["--hint", f"group={server_group_id}"])
+            server_group_options.extend(["--hint", shlex.quote(f"group={server_group_id}")])
 
         properties_opt = []
         if properties:
             for i in properties:
-                properties_opt.extend(["--property", f"{i}='{properties[i]}'"])
+                properties_opt.extend(["--property", shlex.quote(f"{i}={properties[i]}")])
 
         availability_zone_opt = []
         if availability_zone:
-            availability_zone_opt.extend(["--availability-zone", availability_zone])
+            availability_zone_opt.extend(["--availability-zone", shlex.quote(availability_zone)])
 
+        self._invalidate_server_names_cache()
         out = self.run_formatted_as_dict(
             "server",
             "create",
             "--flavor",
-            _quote(flavor),
+            shlex.quote(flavor),
             "--image",
-            _quote(image),
+            shlex.quote(image),
             "--network",
-            _quote(network),
+            shlex.quote(network),
             "--wait",
             *server_group_options,
             *security_group_options,
             *properties_opt,
             *availability_zone_opt,
-            name,
+            shlex.quote(name),
         )
         return out["id"]
 
     def server_get_aggregates(self, name: OpenstackName) -> list[dict[str, Any]]:
         """Get all the aggregates for the given server."""
-        # NOTE: this currently does a bunch of requests making it slow, can be simplified
-        # once the following gets released:
-        #  https://review.opendev.org/c/openstack/python-openstackclient/+/794237
         current_aggregates = self.aggregate_list(cumin_params=CuminParams(print_output=False))
-        server_aggregates: list[dict[str, Any]] = []
-        for aggregate in current_aggregates:
-            aggregate_details = self.aggregate_show(
-                aggregate=aggregate["Name"], cumin_params=CuminParams(print_output=False, print_progress_bars=False)
-            )
-            if name in aggregate_details.get("hosts", []):
-                server_aggregates.append(aggregate_details)
+        # newer clients show the hosts in the listing, so only the aggregates the server is in need the details, older
+        # ones need all of them to find out, see https://review.opendev.org/c/openstack/python-openstackclient/+/794237
+        if all("Hosts" in aggregate for aggregate in current_aggregates):
+            current_aggregates = [aggregate for aggregate in current_aggregates if name in (aggregate["Hosts"] or [])]
 
-        return server_aggregates
+        all_aggregates_details = self.aggregates_show(
+            aggregates=[aggregate["Name"] for aggregate in current_aggregates],
+            cumin_params=CuminParams(print_output=False, print_progress_bars=False),
+        )
+        return [
+            aggregate_details
+            for aggregate_details in all_aggregates_details
+            if name in aggregate_details.get("hosts", [])
+        ]
 
     def security_group_list(self, cumin_params: CuminParams | None = None) -> list[dict[str, Any]]:
-        """Retrieve the list of security groups."""
-        return self.run_formatted_as_list(
-            "security",
-            "group",
-            "list",
-            f"--project={self.project}",
+        """Retrieve the list of security groups.
+
+        Reuses the previous listing if it's recent enough, security groups created through this class invalidate it.
+        """
+        now = time.monotonic()
+        if (
+            self._security_group_list_cache is None
+            or now - self._security_group_list_cache[0] > SECURITY_GROUP_LIST_CACHE_TTL_SECONDS
+        ):
+            security_groups = self.run_formatted_as_list(
+                "security",
+                "group",
+                "list",
+                f"--project={self.project}",
+                cumin_params=CuminParams.as_safe(cumin_params),
+                with_env_var=False,
+            )
+            self._security_group_list_cache = (now, security_groups)
+
+        # a copy every time, so callers can't change the cached one
+        return copy.deepcopy(self._security_group_list_cache[1])
+
+    def _invalidate_security_group_list_cache(self) -> None:
+        self._security_group_list_cache = None
+
+    def _run_formatted_chained(self, *commands: tuple[str, ...], cumin_params: CuminParams | None = None) -> list[Any]:
+        """Run the given read only commands with a single remote command, and return their parsed json outputs.
+
+        Saves the remote connection round trip per command when several listings/details are needed in a row. Relies
+        on the json output not being indented, so each command outputs a single line.
+        """
+        raw_output = run_one_raw(
+            command=self._chain_commands(*(self._get_full_command(*command) for command in commands)),
+            node=self.control_node,
             cumin_params=CuminParams.as_safe(cumin_params),
-            with_env_var=False,
         )
+        try:
+            outputs = [json.loads(line) for line in raw_output.splitlines() if line.strip()]
+        except json.JSONDecodeError as error:
+            # cumin mixes stderr in the output, ex. warnings from the client
+            raise OpenstackError(
+                f"Unable to parse the output of the chained commands ({error}):\n{raw_output}"
+            ) from error
+
+        if len(outputs) != len(commands):
+            raise OpenstackError(
+                f"Was expecting the output of {len(commands)} commands, got {len(outputs)}:\n{raw_output}"
+            )
+
+        return outputs
+
+    def _get_security_group_create_command(self, name: OpenstackName, description: str) -> list[str]:
+        return self._get_full_command("security", "group", "create", name, "--description", shlex.quote(description))
 
     def security_group_create(self, name: OpenstackName, description: str) -> None:
         """Create a security group."""
-        self.run_raw("security", "group", "create", name, "--description", _quote(description))
+        self._invalidate_security_group_list_cache()
+        run_one_raw(command=self._get_security_group_create_command(name, description), node=self.control_node)
 
-    def security_group_rule_create(
+    def _get_security_group_rule_create_command(
         self, direction: OpenstackRuleDirection, remote_group: OpenstackName, security_group: OpenstackName
-    ) -> None:
-        """Create a rule inside the given security group."""
-        self.run_raw(
+    ) -> list[str]:
+        return self._get_full_command(
             "security",
             "group",
             "rule",
@@ -899,27 +1079,47 @@ class OpenstackAPI(CommandRunnerMixin):
             security_group,
         )
 
+    def security_group_rule_create(
+        self, direction: OpenstackRuleDirection, remote_group: OpenstackName, security_group: OpenstackName
+    ) -> None:
+        """Create a rule inside the given security group."""
+        run_one_raw(
+            command=self._get_security_group_rule_create_command(direction, remote_group, security_group),
+            node=self.control_node,
+        )
+
     def security_group_ensure(
         self, security_group: OpenstackName, description: str = "Security group created from spicerack."
-    ) -> None:
-        """Make sure that the given security group exists, create it if not there."""
+    ) -> dict[str, Any]:
+        """Make sure that the given security group exists, create it if not there.
+
+        Returns the security group info, so callers don't have to look it up again.
+        """
         try:
-            self.security_group_by_name(name=security_group, cumin_params=CuminParams(print_output=False))
+            existing_security_group = self.security_group_by_name(
+                name=security_group, cumin_params=CuminParams(print_output=False)
+            )
             LOGGER.info("Security group %s already exists, not creating.", security_group)
+            return existing_security_group
 
         except OpenstackNotFound:
             LOGGER.info("Creating security group %s...", security_group)
-            self.security_group_create(name=security_group, description=description)
-            self.security_group_rule_create(
-                direction=OpenstackRuleDirection.EGRESS, remote_group=security_group, security_group=security_group
-            )
-            self.security_group_rule_create(
-                direction=OpenstackRuleDirection.INGRESS, remote_group=security_group, security_group=security_group
+            self._invalidate_security_group_list_cache()
+            # the group and its rules in a single remote command
+            command = self._chain_commands(
+                self._get_security_group_create_command(name=security_group, description=description),
+                *(
+                    self._get_security_group_rule_create_command(
+                        direction=direction, remote_group=security_group, security_group=security_group
+                    )
+                    for direction in (OpenstackRuleDirection.EGRESS, OpenstackRuleDirection.INGRESS)
+                ),
             )
+            run_one_raw(command=command, node=self.control_node)
+
+        return self.security_group_by_name(name=security_group, cumin_params=CuminParams(print_output=False))
 
-    def security_group_by_name(
-        self, name: OpenstackName, cumin_params: CuminParams | None = None
-    ) -> dict[str, Any] | None:
+    def security_group_by_name(self, name: OpenstackName, cumin_params: CuminParams | None = None) -> dict[str, Any]:
         """Retrieve the security group info given a name.
 
         Raises OpenstackNotFound if there's no security group found for the given name in the current project.
@@ -960,17 +1160,23 @@ class OpenstackAPI(CommandRunnerMixin):
 
     def server_group_ensure(
         self, server_group: OpenstackName, policy: OpenstackServerGroupPolicy = OpenstackServerGroupPolicy.ANTI_AFFINITY
-    ) -> None:
-        """Make sure that the given server group exists, create it if not there."""
+    ) -> dict[str, Any]:
+        """Make sure that the given server group exists, create it if not there.
+
+        Returns the server group info, so callers don't have to look it up again.
+        """
         try:
-            self.server_group_by_name(name=server_group, cumin_params=CuminParams(print_output=False))
+            existing_server_group = self.server_group_by_name(
+                name=server_group, cumin_params=CuminParams(print_output=False)
+            )
             LOGGER.info("Server group %s already exists, not creating.", server_group)
+            return existing_server_group
         except OpenstackNotFound:
             self.server_group_create(policy=policy, name=server_group)
 
-    def server_group_by_name(
-        self, name: OpenstackName, cumin_params: CuminParams | None = None
-    ) -> dict[str, Any] | None:
+        return self.server_group_by_name(name=server_group, cumin_params=CuminParams(print_output=False))
+
+    def server_group_by_name(self, name: OpenstackName, cumin_params: CuminParams | None = None) -> dict[str, Any]:
         """Retrieve the server group info given a name.
 
         Raises OpenstackNotFound if there's no server group found with the given name.
@@ -983,17 +1189,78 @@ class OpenstackAPI(CommandRunnerMixin):
         raise OpenstackNotFound(f"Unable to find a server group with name {name}")
 
     def aggregate_list(self, cumin_params: CuminParams | None = None) -> list[dict[str, Any]]:
-        """Get the simplified list of aggregates."""
-        return self.run_formatted_as_list("aggregate", "list", "--long", cumin_params=CuminParams.as_safe(cumin_params))
+        """Get the simplified list of aggregates.
+
+        Reuses the previous listing if it's recent enough, hosts added or removed through this class invalidate it.
+        """
+        now = time.monotonic()
+        if self._aggregate_list_cache is None or now - self._aggregate_list_cache[0] > AGGREGATE_CACHE_TTL_SECONDS:
+            aggregates = self.run_formatted_as_list(
+                "aggregate", "list", "--long", cumin_params=CuminParams.as_safe(cumin_params)
+            )
+            self._aggregate_list_cache = (now, aggregates)
+
+        # a copy every time, so callers can't change the cached one
+        return copy.deepcopy(self._aggregate_list_cache[1])
 
     def aggregate_show(self, aggregate: OpenstackIdentifier, cumin_params: CuminParams | None) -> dict[str, Any]:
-        """Get the details of a given aggregate."""
-        return self.run_formatted_as_dict(
-            "aggregate", "show", aggregate, cumin_params=CuminParams.as_safe(cumin_params)
-        )
+        """Get the details of a given aggregate.
+
+        Reuses the previous details if they are recent enough, hosts added or removed through this class invalidate
+        them.
+        """
+        now = time.monotonic()
+        cached = self._aggregate_details_cache.get(aggregate)
+        if cached is None or now - cached[0] > AGGREGATE_CACHE_TTL_SECONDS:
+            details = self.run_formatted_as_dict(
+                "aggregate", "show", aggregate, cumin_params=CuminParams.as_safe(cumin_params)
+            )
+            cached = (now, details)
+            self._aggregate_details_cache[aggregate] = cached
+
+        return copy.deepcopy(cached[1])
+
+    def aggregates_show(
+        self, aggregates: list[OpenstackIdentifier], cumin_params: CuminParams | None
+    ) -> list[dict[str, Any]]:
+        """Get the details of the given aggregates, in the same order.
+
+        The ones that are not cached are all fetched in one go, with a single remote command that runs the cli for each
+        of them, one json document per line.
+        """
+        now = time.monotonic()
+        to_fetch = [
+            aggregate
+            for aggregate in dict.fromkeys(aggregates)
+            if aggregate not in self._aggregate_details_cache
+            or now - self._aggregate_details_cache[aggregate][0] > AGGREGATE_CACHE_TTL_SECONDS
+        ]
+        if to_fetch:
+            all_details = self._run_formatted_chained(
+                *(("aggregate", "show", shlex.quote(aggregate)) for aggregate in to_fetch), cumin_params=cumin_params
+            )
+            for aggregate, details in zip(to_fetch, all_details):
+                self._aggregate_details_cache[aggregate] = (now, details)
+
+        return [copy.deepcopy(self._aggregate_details_cache[aggregate][1]) for aggregate in aggregates]
+
+    def _invalidate_aggregate_cache(self) -> None:
+        self._aggregate_list_cache = None
+        self._aggregate_details_cache.clear()
+
+    @staticmethod
+    def _raise_if_aggregate_host_not_found(
+        result: str, aggregate_name: OpenstackName, host_name: OpenstackName
+    ) -> None:
+        if NOT_FOUND_ERROR_MARKER in result:
+            raise OpenstackNotFound(
+                f"Node {host_name} was not found in aggregate {aggregate_name}, did you try using the hostname "
+                "instead of the fqdn?"
+            )
 
     def aggregate_remove_host(self, aggregate_name: OpenstackName, host_name: OpenstackName) -> None:
         """Remove the given host from the aggregate."""
+        self._invalidate_aggregate_cache()
         result = self.run_raw(
             "aggregate",
             "remove",
@@ -1003,20 +1270,13 @@ class OpenstackAPI(CommandRunnerMixin):
             capture_errors=True,
             cumin_params=CuminParams(print_output=False, print_progress_bars=False),
         )
-        if "HTTP 404" in result:
-            raise OpenstackNotFound(
-                f"Node {host_name} was not found in aggregate {aggregate_name}, did you try using the hostname "
-                "instead of the fqdn?"
-            )
+        self._raise_if_aggregate_host_not_found(result, aggregate_name=aggregate_name, host_name=host_name)
 
     def aggregate_add_host(self, aggregate_name: OpenstackName, host_name: OpenstackName) -> None:
         """Add the given host to the aggregate."""
+        self._invalidate_aggregate_cache()
         result = self.run_raw("aggregate", "add", "host", aggregate_name, host_name, capture_errors=True)
-        if "HTTP 404" in result:
-            raise OpenstackNotFound(
-                f"Node {host_name} was not found in aggregate {aggregate_name}, did you try using the hostname "
-                "instead of the fqdn?"
-            )
+        self._raise_if_aggregate_host_not_found(result, aggregate_name=aggregate_name, host_name=host_name)
 
     def aggregate_persist_on_host(self, host: RemoteHosts, current_aggregates: list[dict[str, Any]]) -> None:
         """Creates a file in the host with its current list of aggregates.
@@ -1070,9 +1330,13 @@ class OpenstackAPI(CommandRunnerMixin):
         raw_quotas = self.run_formatted_as_list(
             "quota", "show", project_as_arg=True, cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT
         )
+        return self._quotas_from_raw(raw_quotas)
+
+    @staticmethod
+    def _quotas_from_raw(raw_quotas: list[dict[str, Any]]) -> dict[str | OpenstackQuotaName, Any]:
         final_quotas: dict[str | OpenstackQuotaName, Any] = {}
-        for quota_entry in raw_quotas:
-            quota_name, quota_value = quota_entry["Resource"], quota_entry["Limit"]
+        for raw_quota in raw_quotas:
+            quota_name, quota_value = raw_quota["Resource"], raw_quota["Limit"]
             try:
                 quota_entry = OpenstackQuotaEntry(name=OpenstackQuotaName(quota_name), value=quota_value)
                 final_quotas[quota_entry.name] = quota_entry
@@ -1111,10 +1375,17 @@ class OpenstackAPI(CommandRunnerMixin):
             new_value = new_quota.value + current_quotas[new_quota.name].value
             increased_quotas.append(OpenstackQuotaEntry(name=new_quota.name, value=new_value))
 
-        self.quota_set(*increased_quotas)
+        # 'quota set' does not output anything, so set and read back the quotas in a single remote command
+        set_command = self._get_full_command(
+            "quota", "set", *(quota.to_cli() for quota in increased_quotas), json_output=False, project_as_arg=True
+        )
+        show_command = self._get_full_command("quota", "show", project_as_arg=True)
+        raw_new_quotas = run_one_formatted_as_list(
+            command=self._chain_commands(set_command, show_command), node=self.control_node
+        )
 
         # Validate quota was updated as expected
-        new_quotas = self.quota_show()
+        new_quotas = self._quotas_from_raw(raw_new_quotas)
         for new_quota in increased_quotas:
             if new_quota.value != new_quotas[new_quota.name].value:
                 raise OpenstackError(
@@ -1157,19 +1428,36 @@ class OpenstackAPI(CommandRunnerMixin):
             with_env_var=False,
         )
 
-    def get_vm_proxy_recordsets(self) -> list[dict[str, Any]]:
+    def get_vm_proxy_recordsets(self, name: str | None = None) -> list[dict[str, Any]]:
+        """Get the recordsets of the web proxies, only the ones with the given name if passed.
+
+        Filtering by name is done by designate, so there's no need to fetch all of them (there can be thousands).
+        """
         proxy_domain = "wmcloud.org."
         if self.cluster_name == OpenstackClusterName.CODFW1DEV:
             proxy_domain = "codfw1dev.wmcloud.org."
 
+        name_filter = ["--name", shlex.quote(name)] if name else []
         return self.run_formatted_as_list(
-            "recordset", "list", "--all-projects", proxy_domain, cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT
+            "recordset", "list", "--all-projects", *name_filter, proxy_domain, cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT
         )
 
     def get_all_users(self) -> list[dict[str, Any]]:
-        return self.run_formatted_as_list("user", "list", cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT)
+        """Get all the users.
+
+        Reuses the previous listing if it's recent enough, the users come from ldap so nothing in this class changes
+        them.
+        """
+        now = time.monotonic()
+        if self._all_users_cache is None or now - self._all_users_cache[0] > USER_LIST_CACHE_TTL_SECONDS:
+            users = self.run_formatted_as_list("user", "list", cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT)
+            self._all_users_cache = (now, users)
+
+        # a copy every time, so callers can't change the cached one
+        return copy.deepcopy(self._all_users_cache[1])
 
 
+@lru_cache(maxsize=None)
 def get_node_cluster_name(node: str) -> OpenstackClusterName:
     """Wrapper casting to the specific openstack type."""
     return cast(OpenstackClusterName, generic_get_node_cluster_name(node))
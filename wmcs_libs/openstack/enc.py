@@ -15,6 +15,7 @@ from wmcs_libs.common import (
     CUMIN_UNSAFE_WITHOUT_OUTPUT,
     CommandRunnerMixin,
     OutputFormat,
+    SafeLoader,
     run_one_as_dict,
     with_temporary_file,
 )
@@ -58,7 +59,7 @@ class EncPrefix(CommandRunnerMixin):
             cumin_params=CUMIN_SAFE_WITHOUT_OUTPUT,
         )
 
-        return yaml.safe_load(result["hiera"])
+        return yaml.load(result["hiera"], Loader=SafeLoader)
 
     def replace_hiera(self, hiera: dict[str, Any]) -> None:
         """Replaces the hieradata with the given argument."""
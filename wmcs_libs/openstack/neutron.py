@@ -46,18 +46,18 @@ class NeutronController:
     def cloudnet_set_admin_down(self, cloudnet_host: str) -> None:
         """Given a cloudnet hostname, set all it's agents down, usually for maintenance or reboot."""
         cloudnet_agents = self.openstack_api.get_neutron_agents(host=cloudnet_host)
-        for agent in cloudnet_agents:
-            if agent.admin_state_up:
-                self.openstack_api.neutron_agent_set_admin_down(agent_id=agent.agent_id)
+        self.openstack_api.neutron_agents_set_admin_state(
+            agent_ids=[agent.agent_id for agent in cloudnet_agents if agent.admin_state_up], admin_state_up=False
+        )
 
         self.wait_for_cloudnet_admin_down(cloudnet_host=cloudnet_host)
 
     def cloudnet_set_admin_up(self, cloudnet_host: str) -> None:
         """Given a cloudnet hostname, set all it's agents up, usually after maintenance or reboot."""
         cloudnet_agents = self.openstack_api.get_neutron_agents(host=cloudnet_host)
-        for agent in cloudnet_agents:
-            if not agent.admin_state_up:
-                self.openstack_api.neutron_agent_set_admin_up(agent_id=agent.agent_id)
+        self.openstack_api.neutron_agents_set_admin_state(
+            agent_ids=[agent.agent_id for agent in cloudnet_agents if not agent.admin_state_up], admin_state_up=True
+        )
 
         self.wait_for_cloudnet_admin_up(cloudnet_host=cloudnet_host)
 
@@ -65,8 +65,8 @@ class NeutronController:
         """Wait until the given cloudnet is set as admin down."""
 
         def cloudnet_admin_down():
-            all_agents = self.openstack_api.get_neutron_agents()
-            cloudnet_agents = [agent for agent in all_agents if agent.host == cloudnet_host]
+            # let neutron filter them, instead of fetching and parsing all the agents on every check
+            cloudnet_agents = self.openstack_api.get_neutron_agents(host=cloudnet_host)
             return all(not agent.admin_state_up for agent in cloudnet_agents)
 
         wait_for_it(
@@ -80,8 +80,7 @@ class NeutronController:
         """Wait until the given cloudnet is set as admin up."""
 
         def cloudnet_admin_up():
-            all_agents = self.openstack_api.get_neutron_agents()
-            cloudnet_agents = [agent for agent in all_agents if agent.host == cloudnet_host]
+            cloudnet_agents = self.openstack_api.get_neutron_agents(host=cloudnet_host)
             return all(agent.admin_state_up for agent in cloudnet_agents)
 
         wait_for_it(